@@ -5,17 +5,56 @@ Consolida as implementações duplicadas e padroniza a interface para todas
 as casas de apostas, removendo redundâncias entre diferentes adapters.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from functools import partial
 import logging
 import os
 import random
+import threading
+import time
 from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
-from .sportradar_api import SportRadarAPI
+from concurrent.futures import ThreadPoolExecutor
+from .bookmakers import BUILTIN_BOOKMAKERS, DEFAULT_FIELDS, BookmakerConfig, discover_bookmakers
+from .radar_api import SportRadarAPI
+from config import settings as app_settings
+from backend.core.content_hash import content_hash
+from backend.core.rate_limit import get_guard
+from backend.core.single_flight import SingleFlight
+from backend.services.catalog import SportCatalog, get_catalog
+from backend.services.models import MarketBook
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+# Valor de um campo ausente no item de `doc` (os demais campos viram '')
+FIELD_DEFAULTS = {'markets': []}
+
+
+# Pool compartilhado das buscas de vários esportes (`get_*_odds_many`)
+_batch_executor: Optional[ThreadPoolExecutor] = None
+_batch_lock = threading.Lock()
+
+
+def _batch_pool() -> ThreadPoolExecutor:
+    global _batch_executor
+    if _batch_executor is None:
+        with _batch_lock:
+            if _batch_executor is None:
+                _batch_executor = ThreadPoolExecutor(max_workers=max(app_settings.BOOKMAKER_BATCH_WORKERS, 1),
+                                                     thread_name_prefix='odds-batch')
+    return _batch_executor
+
+
+def _pluck(item: Dict[str, Any], path: str, default: Any) -> Any:
+    """Valor do caminho pontuado `path` (ex.: 'teams.home') em `item`."""
+    value = item
+    for part in path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return value
+
 
 class UnifiedBookmakerAdapter(ABC):
     """
@@ -24,18 +63,31 @@ class UnifiedBookmakerAdapter(ABC):
     entre diferentes implementações de adaptadores.
     """
 
+    # Campo unificado do evento -> caminho no item de `doc`
+    fields: Dict[str, str] = DEFAULT_FIELDS
+
     def __init__(self, bookmaker_name: str, bookmaker_id: int):
         self.bookmaker_name = bookmaker_name
         self.bookmaker_id = bookmaker_id
         self.is_mock_mode = os.getenv('MOCK_BOOKMAKER_DATA', 'true').lower() == 'true'
         self.base_settings = {
-            'timeout': int(os.getenv('BOOKMAKER_TIMEOUT', '30')),
-            'max_retries': int(os.getenv('BOOKMAKER_MAX_RETRIES', '3')),
-            'rate_limit': float(os.getenv('BOOKMAKER_RATE_LIMIT', '1.0')),
-            'min_odds': float(os.getenv('GLOBAL_MIN_ODDS', '1.01')),
-            'max_odds': float(os.getenv('GLOBAL_MAX_ODDS', '1000')),
+            'timeout': app_settings.BOOKMAKER_TIMEOUT,
+            'max_retries': app_settings.BOOKMAKER_MAX_RETRIES,
+            'rate_limit': app_settings.BOOKMAKER_RATE_LIMIT,
+            'min_odds': app_settings.GLOBAL_MIN_ODDS,
+            'max_odds': app_settings.GLOBAL_MAX_ODDS,
         }
         self.custom_settings = {}
+        # Catálogo de IDs da SportRadar; None usa o catálogo global compartilhado
+        self._catalog: Optional[SportCatalog] = None
+        self._warned_sport_id = set()
+        # Buscas reais idênticas em andamento (mesmo esporte/limite) são compartilhadas
+        self._flights = SingleFlight()
+        # (status, esporte) -> hash do item bruto -> evento convertido na última coleta
+        self._parsed: Dict[Tuple[str, Optional[str]], Dict[int, Dict[str, Any]]] = {}
+        # Taxa e novas tentativas da casa valem para todas as suas requisições à SportRadar
+        get_guard(bookmaker_name, rate_limit=self.base_settings['rate_limit'],
+                  max_retries=self.base_settings['max_retries'])
         logger.info(f"Inicializando adaptador unificado para {bookmaker_name}")
         if self.is_mock_mode:
             logger.warning(f"Modo MOCK ativado para {bookmaker_name}")
@@ -56,13 +108,46 @@ class UnifiedBookmakerAdapter(ABC):
         settings.update(self.get_custom_settings())
         return settings
 
+    @property
+    def catalog(self) -> SportCatalog:
+        """Catálogo de esportes usado na resolução de IDs."""
+        return self._catalog if self._catalog is not None else get_catalog()
+
+    def sport_id(self, sport_name: str) -> str:
+        """
+        ID do esporte na SportRadar, consultado no catálogo compartilhado (sem
+        requisição por coleta; só a primeira espera o catálogo carregar). Se
+        o esporte não estiver no catálogo, usa o fallback '1' (futebol).
+        """
+        self.catalog.ensure_loaded()
+        sport_id = self.catalog.sport_id(sport_name)
+        if sport_id is not None:
+            return sport_id
+        # Evita logar fallback repetidamente
+        key = sport_name.lower()
+        if key not in self._warned_sport_id:
+            logger.warning(f"Não foi possível encontrar o ID do esporte '{sport_name}' no catálogo. Usando fallback.")
+            self._warned_sport_id.add(key)
+        return '1'  # fallback seguro para futebol/soccer
+
+    @property
+    def soccer_id(self) -> str:
+        return self.sport_id('soccer')
+
+    def resolve_sport_ids(self) -> threading.Thread:
+        """
+        Carrega o catálogo de esportes numa thread em segundo plano e devolve
+        a thread, para quem quiser aguardar.
+        """
+        return self.catalog.load_in_background()
+
     def get_live_odds(self, sport: str = "soccer", limit: int = 50) -> List[Dict[str, Any]]:
         """
         Busca odds ao vivo unificadas.
         """
         if self.is_mock_mode:
             return self._generate_mock_live_odds(sport, limit)
-        return self._fetch_real_live_odds(sport, limit)
+        return self._flights.do(('live', sport, limit), lambda: self._fetch_real_live_odds(sport, limit))
 
     def get_upcoming_odds(self, sport: str = "soccer", limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -70,7 +155,86 @@ class UnifiedBookmakerAdapter(ABC):
         """
         if self.is_mock_mode:
             return self._generate_mock_upcoming_odds(sport, limit)
-        return self._fetch_real_upcoming_odds(sport, limit)
+        return self._flights.do(('upcoming', sport, limit), lambda: self._fetch_real_upcoming_odds(sport, limit))
+
+    def get_live_odds_many(self, sports: Iterable[str], limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Odds ao vivo de vários esportes numa só chamada: as buscas por esporte
+        rodam em paralelo e o resultado vem combinado, sem eventos repetidos.
+        """
+        return self._fetch_many(self.get_live_odds, sports, limit)
+
+    def get_upcoming_odds_many(self, sports: Iterable[str], limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Odds de eventos futuros de vários esportes (ver `get_live_odds_many`).
+        """
+        return self._fetch_many(self.get_upcoming_odds, sports, limit)
+
+    def _fetch_many(self, fetch: Callable[[str, int], List[Dict[str, Any]]], sports: Iterable[str],
+                    limit: int) -> List[Dict[str, Any]]:
+        sports = list(dict.fromkeys(sport.lower() for sport in sports))
+        if not self.is_mock_mode:
+            # Uma carga do catálogo para todos os esportes; nomes que resolvem
+            # para o mesmo ID (ou para o fallback) geram uma única busca
+            self.catalog.ensure_loaded()
+            by_id = {}
+            for sport in sports:
+                by_id.setdefault(self.sport_id(sport), sport)
+            sports = list(by_id.values())
+
+        def run(sport: str) -> List[Dict[str, Any]]:
+            try:
+                return fetch(sport, limit)
+            except Exception as e:
+                logger.error(f"Erro ao buscar odds de {sport} em {self.bookmaker_name}: {e}")
+                return []
+
+        if len(sports) > 1:
+            results = list(_batch_pool().map(run, sports))
+        else:
+            results = [run(sport) for sport in sports]
+
+        events, seen = [], set()
+        for batch in results:
+            for event in batch:
+                event_id = event.get('id')
+                if event_id not in (None, ''):
+                    if event_id in seen:
+                        continue
+                    seen.add(event_id)
+                events.append(event)
+        return events
+
+    def get_live_books(self, sport: str = "soccer", limit: int = 50) -> List[MarketBook]:
+        """
+        Odds ao vivo no modelo compacto: um `MarketBook` por evento e mercado.
+        """
+        return self._build_books(self.get_live_odds(sport, limit))
+
+    def get_upcoming_books(self, sport: str = "soccer", limit: int = 50) -> List[MarketBook]:
+        """
+        Odds de eventos futuros no modelo compacto.
+        """
+        return self._build_books(self.get_upcoming_odds(sport, limit))
+
+    def _build_books(self, events: List[Dict[str, Any]]) -> List[MarketBook]:
+        """
+        Converte eventos do adaptador em livros de mercado com nomes internados.
+        Os metadados do evento são compartilhados entre os livros do evento.
+        """
+        books = []
+        for event in events:
+            info = {key: event.get(key) for key in ('id', 'name', 'sport', 'status', 'start_time')}
+            for market in event.get('markets', []):
+                books.append(MarketBook.from_selections(
+                    event.get('id'),
+                    market.get('type') or market.get('name', ''),
+                    market.get('selections', []),
+                    bookmaker=self.bookmaker_name,
+                    label=market.get('name'),
+                    info=info
+                ))
+        return books
 
     def get_markets(self, event_id: str) -> List[Dict[str, Any]]:
         """
@@ -78,7 +242,7 @@ class UnifiedBookmakerAdapter(ABC):
         """
         if self.is_mock_mode:
             return self._generate_mock_markets(event_id)
-        return self._fetch_real_markets(event_id)
+        return self._flights.do(('markets', event_id), lambda: self._fetch_real_markets(event_id))
 
     def _generate_mock_live_odds(self, sport: str, limit: int) -> List[Dict[str, Any]]:
         """
@@ -230,14 +394,7 @@ class UnifiedBookmakerAdapter(ABC):
         Retorna multiplicador de odds específico do bookmaker.
         Permite simular diferenças entre casas de apostas.
         """
-        multipliers = {
-            'bet365': 1.0,      # Odds padrão
-            'pinnacle': 1.05,   # Odds ligeiramente melhores
-            'betfair': 1.02,    # Odds de exchange
-            'superodds': 0.98   # Odds ligeiramente piores
-        }
-
-        return multipliers.get(self.bookmaker_name, 1.0)
+        return 1.0
 
     def _fetch_real_live_odds(self, sport: str, limit: int) -> List[Dict[str, Any]]:
         """
@@ -263,6 +420,39 @@ class UnifiedBookmakerAdapter(ABC):
         logger.warning(f"Integração real não implementada para {self.bookmaker_name}")
         return []
 
+    def _parse_odds_data(self, data: Optional[Dict[str, Any]], limit: int, status: str = 'live',
+                         sport: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Converte os itens de `doc` em eventos unificados. Cada evento leva o
+        hash do item bruto (`content_hash`), usado pelo snapshot da coleta para
+        descartar eventos inalterados antes da detecção.
+
+        O hash é calculado antes da conversão: um item igual ao da coleta
+        anterior do mesmo feed (status + esporte) reaproveita o evento já
+        convertido, sem extrair os campos de novo. Os eventos devolvidos são
+        compartilhados entre coletas e não devem ser alterados.
+        """
+        events = []
+        if not data or 'doc' not in data:
+            return events
+        fields = self.fields
+        feed = (status, sport)
+        previous = self._parsed.get(feed, {})
+        parsed = {}
+        for item in data['doc'][:limit]:
+            digest = content_hash(item)
+            event = previous.get(digest)
+            if event is None:
+                event = {key: _pluck(item, path, FIELD_DEFAULTS.get(key, '')) for key, path in fields.items()}
+                event['status'] = status
+                event['bookmaker'] = self.bookmaker_name
+                event['content_hash'] = digest
+            parsed[digest] = event
+            events.append(event)
+        # Só os itens da coleta atual ficam guardados
+        self._parsed[feed] = parsed
+        return events
+
     def get_name(self) -> str:
         """Retorna o nome do bookmaker."""
         return self.bookmaker_name
@@ -272,370 +462,161 @@ class UnifiedBookmakerAdapter(ABC):
         return self.bookmaker_id
 
 
-# Implementações específicas para cada bookmaker
-class Bet365UnifiedAdapter(UnifiedBookmakerAdapter):
-    """Adaptador unificado para Bet365."""
+class ConfiguredBookmakerAdapter(UnifiedBookmakerAdapter):
+    """
+    Adaptador guiado por configuração: o mesmo código de busca e parse para
+    qualquer casa descrita por um `BookmakerConfig` (ver `bookmakers.py`).
+    """
 
-    def __init__(self):
-        super().__init__("bet365", 1)
-        self.api = SportRadarAPI('bet365')
+    def __init__(self, config: BookmakerConfig, api: Optional[SportRadarAPI] = None):
+        super().__init__(config.name, config.id)
+        self.config = config
+        self.fields = config.fields
+        self.api = api or SportRadarAPI(config.house)
         self.is_mock_mode = False  # Força modo produção
-        self.soccer_id = self._get_sport_id('soccer')
-
-    def _get_sport_id(self, sport_name: str) -> str:
-        # Evita logar fallback repetidamente
-        if not hasattr(self, '_warned_sport_id'):
-            self._warned_sport_id = set()
-        try:
-            ids = self.api.get_sports_ids()
-            if ids and 'doc' in ids and ids['doc'] and 'data' in ids['doc'][0]:
-                for sport in ids['doc'][0]['data']:
-                    if sport_name.lower() in sport.get('name', '').lower():
-                        return str(sport.get('id'))
-            if sport_name not in self._warned_sport_id:
-                logger.warning(f"Não foi possível encontrar o ID do esporte '{sport_name}' na resposta da API. Usando fallback.")
-                self._warned_sport_id.add(sport_name)
-        except Exception as e:
-            logger.error(f"Erro ao buscar ID do esporte '{sport_name}': {e}")
-        return '1'  # fallback seguro para futebol/soccer
+        # Só os campos usados pelo mapeamento são lidos do stream
+        self._source_fields = config.source_fields()
 
     def get_custom_settings(self) -> Dict[str, Any]:
-        return {
-            'min_odds': float(os.getenv("BET365_MIN_ODDS", "1.01")),
-            'max_odds': float(os.getenv("BET365_MAX_ODDS", "1000")),
-            'filter_inplay': os.getenv("BET365_FILTER_INPLAY", "true").lower() == "true"
-        }
-
-    def _fetch_real_live_odds(self, sport: str = None, limit: int = 50) -> List[Dict[str, Any]]:
-        try:
-            sport_id = self.soccer_id if not sport else self._get_sport_id(sport)
-            data = self.api.modal_data(sport_id, method='all')
-            if not data:
-                logger.error(f"Resposta vazia da API ao buscar odds ao vivo para {self.bookmaker_name} (sport_id={sport_id})")
-                return []
-            return self._parse_odds_data(data, limit)
-        except Exception as e:
-            if hasattr(e, 'response') and getattr(e.response, 'status_code', None) == 404:
-                logger.error(f"404 Not Found ao buscar odds ao vivo para {self.bookmaker_name} (sport_id={sport_id})")
-            else:
-                logger.error(f"Erro ao buscar odds reais {self.bookmaker_name}: {e}")
-            return []
-
-    def _fetch_real_upcoming_odds(self, sport: str = None, limit: int = 50) -> List[Dict[str, Any]]:
-        try:
-            sport_id = self.soccer_id if not sport else self._get_sport_id(sport)
-            data = self.api.modal_data(sport_id, method='all')
-            if not data:
-                logger.error(f"Resposta vazia da API ao buscar odds futuras para {self.bookmaker_name} (sport_id={sport_id})")
-                return []
-            return self._parse_odds_data(data, limit, status='upcoming')
-        except Exception as e:
-            if hasattr(e, 'response') and getattr(e.response, 'status_code', None) == 404:
-                logger.error(f"404 Not Found ao buscar odds futuras para {self.bookmaker_name} (sport_id={sport_id})")
-            else:
-                logger.error(f"Erro ao buscar odds futuras {self.bookmaker_name}: {e}")
-            return []
+        return self.config.settings()
 
-    def _fetch_real_markets(self, event_id: str) -> List[Dict[str, Any]]:
-        try:
-            data = self.api.local_data(self.soccer_id, event_id, method='all')
-            return data.get('markets', []) if data else []
-        except Exception as e:
-            logger.error(f"Erro ao buscar mercados Bet365: {e}")
-            return []
-
-    def _parse_odds_data(self, data, limit, status='live'):
-        events = []
-        if not data or 'doc' not in data:
-            return events
-        for item in data['doc'][:limit]:
-            event = {
-                'id': item.get('id', ''),
-                'name': item.get('name', ''),
-                'sport': item.get('sport', ''),
-                'status': status,
-                'start_time': item.get('start_time', ''),
-                'bookmaker': self.bookmaker_name,
-                'markets': item.get('markets', [])
-            }
-            events.append(event)
-        return events
-
-
-class PinnacleUnifiedAdapter(UnifiedBookmakerAdapter):
-    """Adaptador unificado para Pinnacle."""
-    def __init__(self):
-        super().__init__("pinnacle", 2)
-        self.api = SportRadarAPI('pinnacle')
-        self.is_mock_mode = False
-        self.soccer_id = self._get_sport_id('soccer')
-
-    def _get_sport_id(self, sport_name: str) -> str:
-        # Evita logar fallback repetidamente
-        if not hasattr(self, '_warned_sport_id'):
-            self._warned_sport_id = set()
-        try:
-            ids = self.api.get_sports_ids()
-            if ids and 'doc' in ids and ids['doc'] and 'data' in ids['doc'][0]:
-                for sport in ids['doc'][0]['data']:
-                    if sport_name.lower() in sport.get('name', '').lower():
-                        return str(sport.get('id'))
-            if sport_name not in self._warned_sport_id:
-                logger.warning(f"Não foi possível encontrar o ID do esporte '{sport_name}' na resposta da API. Usando fallback.")
-                self._warned_sport_id.add(sport_name)
-        except Exception as e:
-            logger.error(f"Erro ao buscar ID do esporte '{sport_name}': {e}")
-        return '1'
-
-    def get_custom_settings(self) -> Dict[str, Any]:
-        return {
-            'min_odds': float(os.getenv("PINNACLE_MIN_ODDS", "1.01")),
-            'max_odds': float(os.getenv("PINNACLE_MAX_ODDS", "2000")),
-            'asian_handicap': os.getenv("PINNACLE_ASIAN_HANDICAP", "true").lower() == "true",
-            'market_types': os.getenv("PINNACLE_MARKET_TYPES", "1_1,1_2,1_3").split(",")
-        }
+    def _get_bookmaker_odds_multiplier(self) -> float:
+        return self.config.mock_odds_multiplier
 
-    def _fetch_real_live_odds(self, sport: str = None, limit: int = 50) -> List[Dict[str, Any]]:
-        try:
-            sport_id = self.soccer_id if not sport else self._get_sport_id(sport)
-            data = self.api.modal_data(sport_id, method='all')
-            if not data:
-                logger.error(f"Resposta vazia da API ao buscar odds ao vivo para {self.bookmaker_name} (sport_id={sport_id})")
-                return []
-            return self._parse_odds_data(data, limit)
-        except Exception as e:
-            if hasattr(e, 'response') and getattr(e.response, 'status_code', None) == 404:
-                logger.error(f"404 Not Found ao buscar odds ao vivo para {self.bookmaker_name} (sport_id={sport_id})")
-            else:
-                logger.error(f"Erro ao buscar odds reais {self.bookmaker_name}: {e}")
-            return []
+    def _endpoint(self, operation: str) -> Callable[..., Any]:
+        return getattr(self.api, self.config.endpoints[operation])
 
-    def _fetch_real_upcoming_odds(self, sport: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+    def _fetch_events(self, sport: Optional[str], limit: int, status: str) -> List[Dict[str, Any]]:
+        label = 'ao vivo' if status == 'live' else 'futuras'
+        sport_id = None
         try:
-            sport_id = self.soccer_id if not sport else self._get_sport_id(sport)
-            data = self.api.modal_data(sport_id, method='all')
+            sport_id = self.sport_id(sport or 'soccer')
+            data = self._endpoint('events')(sport_id, limit=limit, fields=self._source_fields,
+                                            region=self.config.region)
             if not data:
-                logger.error(f"Resposta vazia da API ao buscar odds futuras para {self.bookmaker_name} (sport_id={sport_id})")
+                logger.error(f"Resposta vazia da API ao buscar odds {label} para {self.bookmaker_name} (sport_id={sport_id})")
                 return []
-            return self._parse_odds_data(data, limit, status='upcoming')
+            return self._parse_odds_data(data, limit, status=status, sport=sport or 'soccer')
         except Exception as e:
             if hasattr(e, 'response') and getattr(e.response, 'status_code', None) == 404:
-                logger.error(f"404 Not Found ao buscar odds futuras para {self.bookmaker_name} (sport_id={sport_id})")
+                logger.error(f"404 Not Found ao buscar odds {label} para {self.bookmaker_name} (sport_id={sport_id})")
             else:
-                logger.error(f"Erro ao buscar odds futuras {self.bookmaker_name}: {e}")
+                logger.error(f"Erro ao buscar odds {label} {self.bookmaker_name}: {e}")
             return []
 
-    def _fetch_real_markets(self, event_id: str) -> List[Dict[str, Any]]:
-        try:
-            data = self.api.local_data(self.soccer_id, event_id, method='all')
-            return data.get('markets', []) if data else []
-        except Exception as e:
-            logger.error(f"Erro ao buscar mercados Pinnacle: {e}")
-            return []
-
-    def _parse_odds_data(self, data, limit, status='live'):
-        events = []
-        if not data or 'doc' not in data:
-            return events
-        for item in data['doc'][:limit]:
-            event = {
-                'id': item.get('id', ''),
-                'name': item.get('name', ''),
-                'sport': item.get('sport', ''),
-                'status': status,
-                'start_time': item.get('start_time', ''),
-                'bookmaker': self.bookmaker_name,
-                'markets': item.get('markets', [])
-            }
-            events.append(event)
-        return events
-
-
-class BetfairUnifiedAdapter(UnifiedBookmakerAdapter):
-    """Adaptador unificado para Betfair."""
-
-    def __init__(self):
-        super().__init__("betfair", 3)
-        self.api = SportRadarAPI('betfair')
-        self.is_mock_mode = False
-        self.soccer_id = self._get_sport_id('soccer')
-
-    def _get_sport_id(self, sport_name: str) -> str:
-        # Evita logar fallback repetidamente
-        if not hasattr(self, '_warned_sport_id'):
-            self._warned_sport_id = set()
-        try:
-            ids = self.api.get_sports_ids()
-            if ids and 'doc' in ids and ids['doc'] and 'data' in ids['doc'][0]:
-                for sport in ids['doc'][0]['data']:
-                    if sport_name.lower() in sport.get('name', '').lower():
-                        return str(sport.get('id'))
-            if sport_name not in self._warned_sport_id:
-                logger.warning(f"Não foi possível encontrar o ID do esporte '{sport_name}' na resposta da API. Usando fallback.")
-                self._warned_sport_id.add(sport_name)
-        except Exception as e:
-            logger.error(f"Erro ao buscar ID do esporte '{sport_name}': {e}")
-        return '1'
-
-    def get_custom_settings(self) -> Dict[str, Any]:
-        return {
-            'min_odds': float(os.getenv("BETFAIR_MIN_ODDS", "1.01")),
-            'max_odds': float(os.getenv("BETFAIR_MAX_ODDS", "1000")),
-            'exchange_mode': os.getenv("BETFAIR_EXCHANGE_MODE", "true").lower() == "true",
-            'commission_rate': float(os.getenv("BETFAIR_COMMISSION", "0.05"))
-        }
-
     def _fetch_real_live_odds(self, sport: str = None, limit: int = 50) -> List[Dict[str, Any]]:
-        try:
-            sport_id = self.soccer_id if not sport else self._get_sport_id(sport)
-            data = self.api.modal_data(sport_id, method='all')
-            if not data:
-                logger.error(f"Resposta vazia da API ao buscar odds ao vivo para {self.bookmaker_name} (sport_id={sport_id})")
-                return []
-            return self._parse_odds_data(data, limit)
-        except Exception as e:
-            if hasattr(e, 'response') and getattr(e.response, 'status_code', None) == 404:
-                logger.error(f"404 Not Found ao buscar odds ao vivo para {self.bookmaker_name} (sport_id={sport_id})")
-            else:
-                logger.error(f"Erro ao buscar odds reais {self.bookmaker_name}: {e}")
-            return []
+        return self._fetch_events(sport, limit, 'live')
 
     def _fetch_real_upcoming_odds(self, sport: str = None, limit: int = 50) -> List[Dict[str, Any]]:
-        try:
-            sport_id = self.soccer_id if not sport else self._get_sport_id(sport)
-            data = self.api.modal_data(sport_id, method='all')
-            if not data:
-                logger.error(f"Resposta vazia da API ao buscar odds futuras para {self.bookmaker_name} (sport_id={sport_id})")
-                return []
-            return self._parse_odds_data(data, limit, status='upcoming')
-        except Exception as e:
-            if hasattr(e, 'response') and getattr(e.response, 'status_code', None) == 404:
-                logger.error(f"404 Not Found ao buscar odds futuras para {self.bookmaker_name} (sport_id={sport_id})")
-            else:
-                logger.error(f"Erro ao buscar odds futuras {self.bookmaker_name}: {e}")
-            return []
+        return self._fetch_events(sport, limit, 'upcoming')
 
     def _fetch_real_markets(self, event_id: str) -> List[Dict[str, Any]]:
         try:
-            data = self.api.local_data(self.soccer_id, event_id, method='all')
+            data = self._endpoint('markets')(self.soccer_id, event_id, method='all')
             return data.get('markets', []) if data else []
         except Exception as e:
-            logger.error(f"Erro ao buscar mercados Betfair: {e}")
+            logger.error(f"Erro ao buscar mercados {self.bookmaker_name}: {e}")
             return []
 
-    def _parse_odds_data(self, data, limit, status='live'):
-        events = []
-        if not data or 'doc' not in data:
-            return events
-        for item in data['doc'][:limit]:
-            event = {
-                'id': item.get('id', ''),
-                'name': item.get('name', ''),
-                'sport': item.get('sport', ''),
-                'status': status,
-                'start_time': item.get('start_time', ''),
-                'bookmaker': self.bookmaker_name,
-                'markets': item.get('markets', [])
-            }
-            events.append(event)
-        return events
-
-
-class SuperOddsUnifiedAdapter(UnifiedBookmakerAdapter):
-    """Adaptador unificado para Super Odds."""
-    def __init__(self):
-        super().__init__("superodds", 4)
-        self.api = SportRadarAPI('superodds')
-        self.is_mock_mode = False
-        self.soccer_id = self._get_sport_id('soccer')
-
-    def _get_sport_id(self, sport_name: str) -> str:
-        # Evita logar fallback repetidamente
-        if not hasattr(self, '_warned_sport_id'):
-            self._warned_sport_id = set()
-        try:
-            ids = self.api.get_sports_ids()
-            if ids and 'doc' in ids and ids['doc'] and 'data' in ids['doc'][0]:
-                for sport in ids['doc'][0]['data']:
-                    if sport_name.lower() in sport.get('name', '').lower():
-                        return str(sport.get('id'))
-            if sport_name not in self._warned_sport_id:
-                logger.warning(f"Não foi possível encontrar o ID do esporte '{sport_name}' na resposta da API. Usando fallback.")
-                self._warned_sport_id.add(sport_name)
-        except Exception as e:
-            logger.error(f"Erro ao buscar ID do esporte '{sport_name}': {e}")
-        return '1'
 
-    def get_custom_settings(self) -> Dict[str, Any]:
-        return {
-            'min_odds': float(os.getenv("SUPERODDS_MIN_ODDS", "1.01")),
-            'max_odds': float(os.getenv("SUPERODDS_MAX_ODDS", "500")),
-            'bonus_markets': os.getenv("SUPERODDS_BONUS_MARKETS", "true").lower() == "true"
-        }
+class AdapterRegistry:
+    """
+    Registry preguiçoso e thread-safe de adaptadores.
 
-    def _fetch_real_live_odds(self, sport: str = None, limit: int = 50) -> List[Dict[str, Any]]:
-        try:
-            sport_id = self.soccer_id if not sport else self._get_sport_id(sport)
-            data = self.api.modal_data(sport_id, method='all')
-            if not data:
-                logger.error(f"Resposta vazia da API ao buscar odds ao vivo para {self.bookmaker_name} (sport_id={sport_id})")
-                return []
-            return self._parse_odds_data(data, limit)
-        except Exception as e:
-            if hasattr(e, 'response') and getattr(e.response, 'status_code', None) == 404:
-                logger.error(f"404 Not Found ao buscar odds ao vivo para {self.bookmaker_name} (sport_id={sport_id})")
-            else:
-                logger.error(f"Erro ao buscar odds reais {self.bookmaker_name}: {e}")
-            return []
+    Cada adaptador é criado no primeiro uso (nenhuma requisição de rede no
+    import) e, ao ser criado, começa a carregar o catálogo de esportes em
+    segundo plano. `warm_up()` cria os adaptadores de antemão, por exemplo na
+    inicialização de um worker, e pode aguardar o catálogo.
 
-    def _fetch_real_upcoming_odds(self, sport: str = None, limit: int = 50) -> List[Dict[str, Any]]:
-        try:
-            sport_id = self.soccer_id if not sport else self._get_sport_id(sport)
-            data = self.api.modal_data(sport_id, method='all')
-            if not data:
-                logger.error(f"Resposta vazia da API ao buscar odds futuras para {self.bookmaker_name} (sport_id={sport_id})")
-                return []
-            return self._parse_odds_data(data, limit, status='upcoming')
-        except Exception as e:
-            if hasattr(e, 'response') and getattr(e.response, 'status_code', None) == 404:
-                logger.error(f"404 Not Found ao buscar odds futuras para {self.bookmaker_name} (sport_id={sport_id})")
-            else:
-                logger.error(f"Erro ao buscar odds futuras {self.bookmaker_name}: {e}")
-            return []
+    `plugins`, se informado, é chamado uma vez no primeiro uso e devolve
+    configurações de casas extras (ver `discover_bookmakers`); uma casa de
+    plugin com o mesmo nome de uma nativa a substitui.
+    """
 
-    def _fetch_real_markets(self, event_id: str) -> List[Dict[str, Any]]:
-        try:
-            data = self.api.local_data(self.soccer_id, event_id, method='all')
-            return data.get('markets', []) if data else []
-        except Exception as e:
-            logger.error(f"Erro ao buscar mercados SuperOdds: {e}")
-            return []
+    def __init__(self, factories: Dict[str, Callable[[], UnifiedBookmakerAdapter]],
+                 plugins: Optional[Callable[[], Iterable[BookmakerConfig]]] = None):
+        self._factories = dict(factories)
+        self._adapters: Dict[str, UnifiedBookmakerAdapter] = {}
+        self._lock = threading.Lock()
+        self._plugins = plugins
+
+    @classmethod
+    def from_configs(cls, configs: Iterable[BookmakerConfig],
+                     plugins: Optional[Callable[[], Iterable[BookmakerConfig]]] = None) -> 'AdapterRegistry':
+        """Registry com um `ConfiguredBookmakerAdapter` por configuração."""
+        return cls({config.name: partial(ConfiguredBookmakerAdapter, config) for config in configs}, plugins)
+
+    def _load_plugins(self) -> None:
+        if self._plugins is None:
+            return
+        with self._lock:
+            plugins, self._plugins = self._plugins, None
+            if plugins is None:
+                return
+            for config in plugins():
+                self._factories[config.name] = partial(ConfiguredBookmakerAdapter, config)
+                self._adapters.pop(config.name, None)
+
+    def register_config(self, config: BookmakerConfig) -> None:
+        """Registra uma casa a partir da sua configuração declarativa."""
+        self.register(config.name, partial(ConfiguredBookmakerAdapter, config))
+
+    def register(self, name: str, factory: Callable[[], UnifiedBookmakerAdapter]) -> None:
+        """Registra (ou substitui) a fábrica de um adaptador."""
+        with self._lock:
+            self._factories[name.lower()] = factory
+            self._adapters.pop(name.lower(), None)
+
+    def names(self) -> List[str]:
+        """Nomes registrados, sem instanciar adaptadores."""
+        self._load_plugins()
+        return list(self._factories)
+
+    def __contains__(self, name: str) -> bool:
+        self._load_plugins()
+        return name.lower() in self._factories
+
+    def get(self, name: str) -> Optional[UnifiedBookmakerAdapter]:
+        """Adaptador `name`, criado na primeira chamada."""
+        self._load_plugins()
+        name = name.lower()
+        adapter = self._adapters.get(name)
+        if adapter is not None or name not in self._factories:
+            return adapter
+        with self._lock:
+            adapter = self._adapters.get(name)
+            if adapter is None:
+                adapter = self._factories[name]()
+                adapter.resolve_sport_ids()
+                self._adapters[name] = adapter
+        return adapter
+
+    def all(self) -> Dict[str, UnifiedBookmakerAdapter]:
+        """Todos os adaptadores, criando os que faltam."""
+        return {name: self.get(name) for name in self.names()}
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, wait: bool = False,
+                timeout: Optional[float] = None) -> Dict[str, UnifiedBookmakerAdapter]:
+        """
+        Cria os adaptadores (todos, ou só `names`). Com `wait`, aguarda o
+        carregamento do catálogo de esportes por até `timeout` segundos no total.
+        """
+        adapters = {name: self.get(name) for name in (names or self.names()) if name in self}
+        if wait:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            for adapter in adapters.values():
+                resolver = adapter.resolve_sport_ids()
+                resolver.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        return adapters
 
-    def _parse_odds_data(self, data, limit, status='live'):
-        events = []
-        if not data or 'doc' not in data:
-            return events
-        for item in data['doc'][:limit]:
-            event = {
-                'id': item.get('id', ''),
-                'name': item.get('name', ''),
-                'sport': item.get('sport', ''),
-                'status': status,
-                'start_time': item.get('start_time', ''),
-                'bookmaker': self.bookmaker_name,
-                'markets': item.get('markets', [])
-            }
-            events.append(event)
-        return events
+    def reset(self) -> None:
+        """Descarta os adaptadores criados (recriados no próximo uso)."""
+        with self._lock:
+            self._adapters.clear()
 
 
-# Registry unificado de adaptadores
-UNIFIED_BOOKMAKER_ADAPTERS = {
-    'bet365': Bet365UnifiedAdapter(),
-    'pinnacle': PinnacleUnifiedAdapter(),
-    'betfair': BetfairUnifiedAdapter(),
-    'superodds': SuperOddsUnifiedAdapter(),
-}
+# Registry unificado de adaptadores: casas nativas e as publicadas por plugins
+ADAPTER_REGISTRY = AdapterRegistry.from_configs(BUILTIN_BOOKMAKERS, plugins=discover_bookmakers)
 
 def get_adapter(bookmaker_name: str) -> Optional[UnifiedBookmakerAdapter]:
     """
@@ -647,7 +628,7 @@ def get_adapter(bookmaker_name: str) -> Optional[UnifiedBookmakerAdapter]:
     Returns:
         Adaptador unificado ou None se não encontrado
     """
-    return UNIFIED_BOOKMAKER_ADAPTERS.get(bookmaker_name.lower())
+    return ADAPTER_REGISTRY.get(bookmaker_name)
 
 def get_all_adapters() -> Dict[str, UnifiedBookmakerAdapter]:
     """
@@ -656,7 +637,7 @@ def get_all_adapters() -> Dict[str, UnifiedBookmakerAdapter]:
     Returns:
         Dicionário com todos os adaptadores
     """
-    return UNIFIED_BOOKMAKER_ADAPTERS.copy()
+    return ADAPTER_REGISTRY.all()
 
 def get_bookmaker_names() -> List[str]:
     """
@@ -665,4 +646,17 @@ def get_bookmaker_names() -> List[str]:
     Returns:
         Lista de nomes dos bookmakers
     """
-    return list(UNIFIED_BOOKMAKER_ADAPTERS.keys())
+    return ADAPTER_REGISTRY.names()
+
+def warm_up_adapters(wait: bool = False, timeout: Optional[float] = None) -> Dict[str, UnifiedBookmakerAdapter]:
+    """
+    Cria todos os adaptadores e dispara a resolução dos IDs de esporte.
+
+    Args:
+        wait: Aguarda a resolução antes de retornar
+        timeout: Espera máxima em segundos quando `wait` é True
+
+    Returns:
+        Dicionário com todos os adaptadores
+    """
+    return ADAPTER_REGISTRY.warm_up(wait=wait, timeout=timeout)
@@ -16,8 +16,18 @@ from typing import Dict, List, Any
 # Importar módulos unificados
 from config import settings, security
 from backend.services.notification import notify_all
-from backend.apps.adapters import get_all_adapters
+from backend.services.arbitrage import EffectiveOddsTransform
+from backend.services.models import MarketBook
+from backend.services.catalog import get_catalog
+from backend.services.ingest import (
+    STATUS_LIVE, STATUS_UPCOMING, SnapshotMemo, get_arbitrage_index, get_ingest_scheduler
+)
+from backend.services.parallel import get_parallel_detector
+from backend.services.cross_market import CrossMarketDetector
+from backend.services.signals import SignalEngine
+from backend.apps.adapters import get_all_adapters, warm_up_adapters
 from backend.core.i18n import get_text
+from backend.core.json_codec import CodecJSONProvider
 from database.database import DatabaseManager
 from backend.core.auth import AuthManager, ROLE_ADMIN, ROLE_OPERATOR, ROLE_VIEWER, ROLE_PERMISSIONS
 from backend.core.validation import (
@@ -45,8 +55,14 @@ logger = logging.getLogger(__name__)
 
 # Inicializar Flask
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
 app.secret_key = settings.SECRET_KEY
 
+# Oportunidades detectadas por combinação de filtros e revisão dos feeds
+OPPORTUNITIES_MEMO = SnapshotMemo()
+# Surebets entre mercados (ex.: Casa + X2); a tabela de coberturas é compartilhada entre requisições
+CROSS_MARKET_DETECTOR = CrossMarketDetector()
+
 # Inicializar AuthManager e JWT
 jwt_auth = AuthManager(app)
 
@@ -741,55 +757,121 @@ def get_opportunities():
         # Dados de URL já validados
         search_params = getattr(request, 'validated_args', {})
         
-        data = request.get_json() or {}
-        sports = data.get('sports', ['soccer'])
-        min_profit = float(data.get('min_profit', 2.0))
-        bookmakers = data.get('bookmakers', [])
-        search = search_params.get('query', '').lower()
+        data = request.get_json(silent=True) or {}
+        # JSON null vale o mesmo que o campo ausente
+        sports = data.get('sports') or ['soccer']
+        bookmakers = data.get('bookmakers') or []
+        search = (search_params.get('query') or '').lower()
+        
+        for field, values in (('sports', sports), ('bookmakers', bookmakers)):
+            if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                return jsonify({'error': f'{field} deve ser uma lista de nomes'}), 400
         
         # Validar min_profit
+        try:
+            min_profit = float(data.get('min_profit', 2.0))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'min_profit deve ser numérico'}), 400
         if min_profit < 0 or min_profit > 100:
             return jsonify({'error': 'min_profit deve estar entre 0 e 100'}), 400
         
-        opportunities = []
+        # Inclui surebets entre mercados diferentes do mesmo evento
+        cross_market = data.get('cross_market', False)
+        if not isinstance(cross_market, bool):
+            return jsonify({'error': 'cross_market deve ser booleano'}), 400
+        
+        limit = data.get('limit')
+        if limit is not None:
+            try:
+                limit = int(limit)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'limit deve ser um número inteiro'}), 400
+            if limit < 1 or limit > 1000:
+                return jsonify({'error': 'limit deve estar entre 1 e 1000'}), 400
+        
         adapters = get_all_adapters()
+        # Comissão e limites de odds por casa, resolvidos uma vez por requisição
+        odds_transform = EffectiveOddsTransform.from_adapters(adapters)
+        
+        # Odds já coletadas em segundo plano; só feeds nunca coletados vão à
+        # SportRadar, em paralelo e com prazo (INGEST_READ_DEADLINE)
+        scheduler = get_ingest_scheduler()
+        signature, events = scheduler.view(STATUS_LIVE, sports, bookmakers, limit=20)
         
-        for adapter_name, adapter in adapters.items():
-            if not bookmakers or adapter_name in bookmakers:
-                for sport in sports:
-                    try:
-                        live_odds = adapter.get_live_odds(sport, limit=20)
-                        
-                        for event in live_odds:
-                            for market in event.get('markets', []):
-                                selections = market.get('selections', [])
-                                if len(selections) >= 2:
-                                    profit = calculate_surebet_profit(selections)
-                                    
-                                    if profit >= min_profit:
-                                        opportunity = {
-                                            'id': f"{adapter_name}_{event['id']}",
-                                            'event': sanitize_text(event['name']),
-                                            'market': sanitize_text(market['name']),
-                                            'profit': round(profit, 2),
-                                            'bookmaker': adapter_name,
-                                            'selections': selections,
-                                            'sport': sport,
-                                            'status': event['status'],
-                                            'detected_at': datetime.now().isoformat()
-                                        }
-                                        
-                                        if (not search or 
-                                            search in opportunity['event'].lower() or 
-                                            search in opportunity['market'].lower()):
-                                            opportunities.append(opportunity)
-                    except Exception as adapter_error:
-                        logger.warning(f"Erro no adapter {adapter_name}: {adapter_error}")
+        def detect() -> List[Dict[str, Any]]:
+            # Cotações de todas as casas agrupadas por evento e mercado
+            books = {(book.event_id, book.market): book for book in MarketBook.from_adapter_events(events)}
+        
+            def matches_search(book: MarketBook) -> bool:
+                return search in book.info['name'].lower() or search in book.label.lower()
+        
+            # Acima de DETECTION_PARALLEL_MIN_EVENTS livros, a detecção é particionada entre processos
+            surebets = get_parallel_detector().best_surebets(
+                list(books.values()),
+                min_profit=min_profit,
+                limit=limit,
+                bookmakers=bookmakers or None,
+                predicate=matches_search if search else None,
+                transform=odds_transform
+            )
+        
+            opportunities = []
+            for surebet in surebets:
+                book = books[surebet['event_id'], surebet['market']]
+                selections = [quote.to_dict() for quote in surebet['selections']]
+                opportunities.append({
+                    'id': f"{book.event_id}_{book.market}",
+                    'event': sanitize_text(book.info['name']),
+                    'market': sanitize_text(book.label),
+                    'profit': round(surebet['profit_percent'], 2),
+                    'bookmaker': ', '.join(dict.fromkeys(s['bookmaker'] for s in selections)),
+                    'selections': selections,
+                    'sport': book.info['sport'],
+                    'status': book.info['status'],
+                    'detected_at': datetime.now().isoformat()
+                })
+            
+            if cross_market:
+                markets = []
+                for book in books.values():
+                    if search and not matches_search(book):
                         continue
+                    market = book.to_dict()
+                    if bookmakers:
+                        market['selections'] = [s for s in market['selections'] if s['bookmaker'] in bookmakers]
+                    markets.append(market)
+                for surebet in CROSS_MARKET_DETECTOR.find_surebets(markets, transform=odds_transform):
+                    if surebet['profit_percent'] < min_profit:
+                        break
+                    selections = [dict(s) for s in surebet['selections']]
+                    legs = [books[surebet['event_id'], s['market']] for s in selections]
+                    info = legs[0].info
+                    opportunities.append({
+                        'id': f"{surebet['event_id']}_{surebet['market']}",
+                        'event': sanitize_text(info['name']),
+                        'market': sanitize_text(' + '.join(dict.fromkeys(book.label for book in legs))),
+                        'profit': round(surebet['profit_percent'], 2),
+                        'bookmaker': ', '.join(dict.fromkeys(s['bookmaker'] for s in selections)),
+                        'selections': selections,
+                        'sport': info['sport'],
+                        'status': info['status'],
+                        'cross_market': True,
+                        'detected_at': datetime.now().isoformat()
+                    })
+                opportunities.sort(key=lambda o: o['profit'], reverse=True)
+                if limit is not None:
+                    opportunities = opportunities[:limit]
+            return opportunities
+        
+        # A detecção só roda de novo quando algum feed lido mudou de conteúdo
+        opportunities = OPPORTUNITIES_MEMO.get(
+            (signature, tuple(sports), tuple(bookmakers), min_profit, limit, search, cross_market), detect
+        )
         
         return jsonify({
             'opportunities': opportunities,
             'total': len(opportunities),
+            'bookmakers': scheduler.bookmaker_status(STATUS_LIVE, sports, bookmakers),
             'timestamp': datetime.now().isoformat()
         }), 200
         
@@ -797,44 +879,29 @@ def get_opportunities():
         logger.error(f"Erro ao buscar oportunidades: {e}")
         return jsonify({'error': str(e)}), 500
 
-def calculate_surebet_profit(selections: List[Dict[str, Any]]) -> float:
-    """
-    Calcula o lucro potencial de uma surebet.
-    Implementação simplificada para demonstração.
-    """
-    if len(selections) < 2:
-        return 0.0
-    
-    inverse_sum = sum(1/selection['odds'] for selection in selections)
-    
-    if inverse_sum < 1:
-        return (1 - inverse_sum) * 100
-    
-    return 0.0
-
 @app.route('/api/games/live', methods=['GET'])
 def get_live_games():
     """Busca jogos ao vivo."""
     try:
         sport = request.args.get('sport', 'soccer')
-        limit = int(request.args.get('limit', 20))
-        
-        all_games = []
-        adapters = get_all_adapters()
+        try:
+            limit = int(request.args.get('limit', 20))
+        except ValueError:
+            return jsonify({'error': 'limit deve ser um número inteiro'}), 400
         
-        for adapter_name, adapter in adapters.items():
-            games = adapter.get_live_odds(sport, limit=limit//len(adapters))
-            for game in games:
-                all_games.append({
-                    'id': game['id'],
-                    'name': game['name'],
-                    'sport': game['sport'],
-                    'status': game['status'],
-                    'start_time': game['start_time'],
-                    'bookmaker': adapter_name
-                })
+        per_bookmaker = limit // max(len(get_all_adapters()), 1)
+        scheduler = get_ingest_scheduler()
+        games = scheduler.read(STATUS_LIVE, [sport], limit=per_bookmaker)
+        all_games = [{
+            'id': game['id'],
+            'name': game['name'],
+            'sport': game['sport'],
+            'status': game['status'],
+            'start_time': game['start_time'],
+            'bookmaker': game['bookmaker']
+        } for game in games]
         
-        return jsonify({'games': all_games}), 200
+        return jsonify({'games': all_games, 'bookmakers': scheduler.bookmaker_status(STATUS_LIVE, [sport])}), 200
         
     except Exception as e:
         logger.error(f"Erro ao buscar jogos ao vivo: {e}")
@@ -845,29 +912,82 @@ def get_upcoming_games():
     """Busca jogos futuros."""
     try:
         sport = request.args.get('sport', 'soccer')
-        limit = int(request.args.get('limit', 20))
-        
-        all_games = []
-        adapters = get_all_adapters()
+        try:
+            limit = int(request.args.get('limit', 20))
+        except ValueError:
+            return jsonify({'error': 'limit deve ser um número inteiro'}), 400
         
-        for adapter_name, adapter in adapters.items():
-            games = adapter.get_upcoming_odds(sport, limit=limit//len(adapters))
-            for game in games:
-                all_games.append({
-                    'id': game['id'],
-                    'name': game['name'],
-                    'sport': game['sport'],
-                    'status': game['status'],
-                    'start_time': game['start_time'],
-                    'bookmaker': adapter_name
-                })
+        per_bookmaker = limit // max(len(get_all_adapters()), 1)
+        scheduler = get_ingest_scheduler()
+        games = scheduler.read(STATUS_UPCOMING, [sport], limit=per_bookmaker)
+        all_games = [{
+            'id': game['id'],
+            'name': game['name'],
+            'sport': game['sport'],
+            'status': game['status'],
+            'start_time': game['start_time'],
+            'bookmaker': game['bookmaker']
+        } for game in games]
         
-        return jsonify({'games': all_games}), 200
+        return jsonify({'games': all_games, 'bookmakers': scheduler.bookmaker_status(STATUS_UPCOMING, [sport])}), 200
         
     except Exception as e:
         logger.error(f"Erro ao buscar jogos futuros: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/surebets/<string:status>', methods=['GET'])
+def get_indexed_surebets(status: str):
+    """
+    Surebets abertas no índice incremental alimentado pela coleta (odds
+    brutas, todas as casas), lidas sem rodar a detecção.
+    """
+    try:
+        if status not in (STATUS_LIVE, STATUS_UPCOMING):
+            return jsonify({'error': 'status deve ser live ou upcoming'}), 400
+        try:
+            limit = int(request.args.get('limit', 50))
+        except ValueError:
+            return jsonify({'error': 'limit deve ser um número inteiro'}), 400
+        
+        surebets = get_arbitrage_index(status).surebets()[:max(limit, 0)]
+        return jsonify({
+            'surebets': surebets,
+            'total': len(surebets),
+            'timestamp': datetime.now().isoformat()
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Erro ao ler surebets do índice: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/signals/<string:status>', methods=['GET'])
+def get_signals(status: str):
+    """
+    Surebets, value bets e middles numa passada pelo índice incremental da
+    coleta. Aceita `min_edge` (fração, ex.: 0.02), `max_middle_loss` (%) e
+    `limit` por tipo de sinal.
+    """
+    try:
+        if status not in (STATUS_LIVE, STATUS_UPCOMING):
+            return jsonify({'error': 'status deve ser live ou upcoming'}), 400
+        try:
+            min_edge = float(request.args.get('min_edge', 0.02))
+            max_middle_loss = float(request.args.get('max_middle_loss', 2.0))
+        except ValueError:
+            return jsonify({'error': 'min_edge e max_middle_loss devem ser numéricos'}), 400
+        try:
+            limit = int(request.args.get('limit', 50))
+        except ValueError:
+            return jsonify({'error': 'limit deve ser um número inteiro'}), 400
+        
+        engine = SignalEngine(get_arbitrage_index(status), min_edge=min_edge, max_middle_loss=max_middle_loss)
+        signals = {kind: found[:max(limit, 0)] for kind, found in engine.scan().items()}
+        return jsonify(dict(signals, timestamp=datetime.now().isoformat())), 200
+        
+    except Exception as e:
+        logger.error(f"Erro ao calcular sinais: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/status', methods=['GET'])
 def api_status():
     """Status da API."""
@@ -878,6 +998,8 @@ def api_status():
         'services': {
             'database': 'connected',
             'adapters': list(get_all_adapters().keys()),
+            'ingest': get_ingest_scheduler().snapshot.status(),
+            'catalog': get_catalog().status(),
             'mock_mode': os.getenv('MOCK_BOOKMAKER_DATA', 'true') == 'true'
         }
     }), 200
@@ -897,6 +1019,7 @@ if __name__ == '__main__':
             exit(1)
     
     logger.info("Iniciando API administrativa consolidada")
+    warm_up_adapters()
     app.run(
         host='0.0.0.0',
         port=int(os.getenv("ADMIN_API_PORT", 5000)),
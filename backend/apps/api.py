@@ -1,9 +1,12 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import os
-from backend.apps.radar_api import SportRadarAPI
+from backend.apps.radar_api import SportRadarAPI, fetch_all_bookmakers
+from backend.core.http_cache import get_response_cache
+from backend.core.json_codec import CodecJSONProvider
 
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
 CORS(app)
 
 
@@ -43,6 +46,15 @@ class UnifiedBookmakerAPI:
             )
         return api.modal_data(sport_id, method)
 
+    def get_odds_all(self, sport_id, region=None, method='all'):
+        """
+        Odds de todas as casas consultadas em paralelo (cliente assíncrono):
+        a latência é a da casa mais lenta, e não a soma das quatro.
+        """
+        if region:
+            return fetch_all_bookmakers(self.bookmakers, 'modal_data_region', sport_id, region, method)
+        return fetch_all_bookmakers(self.bookmakers, 'modal_data', sport_id, method)
+
     def get_league(self, house, league_id, region=None):
         api = self.get_api(house)
         if not api:
@@ -81,13 +93,15 @@ def get_bookmakers():
 
 @app.route('/api/odds', methods=['GET'])
 def get_odds():
-    """Retorna odds para um bookmaker e esporte."""
+    """Retorna odds para um bookmaker (ou 'all' para todas as casas) e esporte."""
     house = request.args.get('bookmaker')
     sport_id = request.args.get('sport_id')
     region = request.args.get('region')
     method = request.args.get('method', 'all')
     if not house or not sport_id:
         return jsonify({'error': 'Parâmetros obrigatórios: bookmaker, sport_id'}), 400
+    if house == 'all':
+        return jsonify({'odds': unified_api.get_odds_all(sport_id, region, method)})
     odds = unified_api.get_odds(house, sport_id, region, method)
     return jsonify({'odds': odds})
 
@@ -129,7 +143,8 @@ def api_status():
         'status': 'running',
         'version': '2.0.0-unified',
         'timestamp': __import__('datetime').datetime.now().isoformat(),
-        'bookmakers': unified_api.bookmakers
+        'bookmakers': unified_api.bookmakers,
+        'cache': get_response_cache().stats()
     })
 
 
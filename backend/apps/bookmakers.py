@@ -0,0 +1,173 @@
+"""
+Configuração declarativa das casas de apostas.
+
+Cada casa é descrita por um `BookmakerConfig`: ID, casa/região na
+SportRadar, endpoints usados para eventos e mercados, faixa de odds,
+comissão, opções extras e o mapeamento de campos do evento. O
+`ConfiguredBookmakerAdapter` (em `adapters.py`) é o único motor de
+busca/parse e atende a qualquer configuração, então melhorias de cache,
+pooling ou lotes valem para todas as casas de uma vez.
+
+Casas adicionais são descobertas pelo grupo de entry points
+`settings.BOOKMAKER_PLUGIN_GROUP` ('surebets.bookmakers'). Cada entry point
+aponta para um `BookmakerConfig`, um dicionário no mesmo formato, uma lista
+deles ou uma função sem argumentos que devolva um desses.
+
+Valores de faixa, comissão e opções podem ser sobrepostos por variáveis de
+ambiente `<PREFIXO>_MIN_ODDS`, `<PREFIXO>_MAX_ODDS`, `<PREFIXO>_COMMISSION` e
+`<PREFIXO>_<OPÇÃO>`, com o prefixo padrão igual ao nome em maiúsculas.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Campo unificado do evento -> caminho no item de `doc` da SportRadar
+DEFAULT_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'sport': 'sport',
+    'start_time': 'start_time',
+    'markets': 'markets',
+}
+
+# Operação -> método do cliente SportRadar
+DEFAULT_ENDPOINTS = {
+    'events': 'modal_docs',
+    'markets': 'local_data',
+}
+
+
+def _coerce(raw: str, default: Any) -> Any:
+    """Converte o valor de uma variável de ambiente para o tipo do padrão."""
+    if isinstance(default, bool):
+        return raw.strip().lower() == 'true'
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    if isinstance(default, (list, tuple)):
+        return [item.strip() for item in raw.split(',') if item.strip()]
+    return raw
+
+
+class BookmakerConfig:
+    """Descrição declarativa de uma casa de apostas."""
+
+    __slots__ = ('name', 'id', 'house', 'region', 'endpoints', 'min_odds', 'max_odds',
+                 'commission', 'options', 'fields', 'mock_odds_multiplier', 'env_prefix')
+
+    def __init__(self, name: str, id: int, house: Optional[str] = None, region: str = 'Europe:Berlin',
+                 endpoints: Optional[Mapping[str, str]] = None, min_odds: float = 1.01,
+                 max_odds: float = 1000.0, commission: Optional[float] = None,
+                 options: Optional[Mapping[str, Any]] = None, fields: Optional[Mapping[str, str]] = None,
+                 mock_odds_multiplier: float = 1.0, env_prefix: Optional[str] = None):
+        self.name = name.lower()
+        self.id = int(id)
+        self.house = house or self.name
+        self.region = region
+        self.endpoints = dict(DEFAULT_ENDPOINTS, **(endpoints or {}))
+        self.min_odds = float(min_odds)
+        self.max_odds = float(max_odds)
+        self.commission = None if commission is None else float(commission)
+        self.options = dict(options or {})
+        self.fields = dict(DEFAULT_FIELDS, **(fields or {}))
+        self.mock_odds_multiplier = float(mock_odds_multiplier)
+        self.env_prefix = env_prefix or self.name.upper()
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'BookmakerConfig':
+        """Cria a configuração a partir de um dicionário (ex.: carregado de JSON)."""
+        unknown = set(data) - set(cls.__slots__)
+        if unknown:
+            raise ValueError(f"Campos desconhecidos na configuração de casa: {sorted(unknown)}")
+        return cls(**data)
+
+    def _env(self, key: str, default: Any) -> Any:
+        raw = os.getenv(f'{self.env_prefix}_{key.upper()}')
+        if raw is None:
+            return default
+        try:
+            return _coerce(raw, default)
+        except ValueError:
+            logger.warning(f"Valor inválido em {self.env_prefix}_{key.upper()}: {raw!r}; usando {default!r}")
+            return default
+
+    def settings(self) -> Dict[str, Any]:
+        """Configurações específicas da casa, com as sobreposições do ambiente."""
+        result = {
+            'min_odds': self._env('min_odds', self.min_odds),
+            'max_odds': self._env('max_odds', self.max_odds),
+        }
+        for key, default in self.options.items():
+            result[key] = self._env(key, default)
+        if self.commission is not None:
+            result['commission_rate'] = self._env('commission', self.commission)
+        return result
+
+    def source_fields(self) -> tuple:
+        """Campos de primeiro nível de `doc` que o mapeamento usa (projeção do stream)."""
+        return tuple(dict.fromkeys(path.split('.', 1)[0] for path in self.fields.values()))
+
+
+# Casas nativas
+BUILTIN_BOOKMAKERS = [
+    BookmakerConfig('bet365', 1, options={'filter_inplay': True}),
+    BookmakerConfig('pinnacle', 2, max_odds=2000, mock_odds_multiplier=1.05, options={
+        'asian_handicap': True,
+        'market_types': ['1_1', '1_2', '1_3'],
+    }),
+    BookmakerConfig('betfair', 3, commission=0.05, mock_odds_multiplier=1.02,
+                    options={'exchange_mode': True}),
+    BookmakerConfig('superodds', 4, max_odds=500, mock_odds_multiplier=0.98,
+                    options={'bonus_markets': True}),
+]
+
+
+def _as_configs(obj: Any) -> List[BookmakerConfig]:
+    if callable(obj) and not isinstance(obj, (BookmakerConfig, Mapping)):
+        obj = obj()
+    if isinstance(obj, BookmakerConfig):
+        return [obj]
+    if isinstance(obj, Mapping):
+        return [BookmakerConfig.from_dict(obj)]
+    if isinstance(obj, Iterable) and not isinstance(obj, (str, bytes)):
+        return [config for item in obj for config in _as_configs(item)]
+    raise TypeError(f"Entry point de casa deve fornecer BookmakerConfig ou dict, não {type(obj).__name__}")
+
+
+def _entry_points(group: str) -> List[Any]:
+    from importlib.metadata import entry_points
+    found = entry_points()
+    if hasattr(found, 'select'):
+        return list(found.select(group=group))
+    return list(found.get(group, []))  # pragma: no cover - Python < 3.10
+
+
+def discover_bookmakers(group: Optional[str] = None) -> List[BookmakerConfig]:
+    """
+    Configurações publicadas por pacotes instalados no grupo de entry points
+    `group`. Plugins com erro são ignorados (e logados).
+    """
+    group = settings.BOOKMAKER_PLUGIN_GROUP if group is None else group
+    configs = []
+    if not group:
+        return configs
+    try:
+        points = _entry_points(group)
+    except Exception as e:
+        logger.error(f"Erro ao listar plugins de casas ({group}): {e}")
+        return configs
+    for point in points:
+        try:
+            loaded = _as_configs(point.load())
+        except Exception as e:
+            logger.error(f"Plugin de casa '{point.name}' ignorado: {e}")
+            continue
+        logger.info(f"Plugin '{point.name}' registrou: {', '.join(c.name for c in loaded)}")
+        configs.extend(loaded)
+    return configs
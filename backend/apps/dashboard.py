@@ -26,7 +26,11 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 # Importar módulos unificados
 from backend.core.i18n import get_text, get_language_dict, I18n, DEFAULT_LANGUAGE
-from backend.apps.adapters import get_all_adapters, get_bookmaker_names
+from backend.apps.adapters import get_all_adapters, get_bookmaker_names, warm_up_adapters
+from backend.services.arbitrage import EffectiveOddsTransform
+from backend.services.models import MarketBook
+from backend.services.ingest import STATUS_LIVE, STATUS_UPCOMING, SnapshotMemo, get_ingest_scheduler
+from backend.services.parallel import get_parallel_detector
 from config import settings
 
 # Configuração de logging
@@ -39,8 +43,9 @@ logger = logging.getLogger(__name__)
 # Inicializar sistema de internacionalização
 i18n = I18n()
 
-# Configurar lista de bookmakers centralizada
-BOOKMAKER_ADAPTERS = get_all_adapters()
+# Configurar lista de bookmakers centralizada (os adaptadores só são criados no primeiro uso)
+OPPORTUNITIES_TABLE_LIMIT = 50
+OPPORTUNITIES_MEMO = SnapshotMemo()
 BOOKMAKERS = [
     {"label": name.title(), "value": name} 
     for name in get_bookmaker_names()
@@ -497,33 +502,42 @@ app.layout = dbc.Container([
 def update_opportunities_table(n_intervals, n_clicks, sports, min_profit, bookmakers, search):
     """Atualiza a tabela de oportunidades com dados unificados."""
     try:
-        # Coletar dados de todos os adaptadores
-        all_opportunities = []
+        # Odds de todas as casas a partir do snapshot da coleta em segundo plano
+        sports = sports or ['soccer']
+        signature, events = get_ingest_scheduler().view(STATUS_LIVE, sports, bookmakers, limit=20)
+        term = (search or '').lower()
+        # Comissão e limites de odds por casa, resolvidos a cada atualização
+        odds_transform = EffectiveOddsTransform.from_adapters(get_all_adapters())
         
-        for adapter_name, adapter in BOOKMAKER_ADAPTERS.items():
-            if not bookmakers or adapter_name in bookmakers:
-                for sport in (sports or ['soccer']):
-                    live_odds = adapter.get_live_odds(sport, limit=20)
-                    
-                    for event in live_odds:
-                        for market in event.get('markets', []):
-                            # Calcular surebet mock (simplificado)
-                            selections = market.get('selections', [])
-                            if len(selections) >= 2:
-                                profit = calculate_mock_profit(selections)
-                                
-                                if profit >= min_profit:
-                                    opportunity = {
-                                        'event': f"🏟️ {event['name']}",
-                                        'market': market['name'],
-                                        'profit': f"{profit:.2f}%",
-                                        'bookmakers': adapter_name.title(),
-                                        'actions': f"[📊 Detalhes](#{event['id']})"
-                                    }
-                                    
-                                    # Filtro de busca
-                                    if not search or search.lower() in opportunity['event'].lower() or search.lower() in opportunity['market'].lower():
-                                        all_opportunities.append(opportunity)
+        def detect() -> List[Dict[str, Any]]:
+            books = {(book.event_id, book.market): book for book in MarketBook.from_adapter_events(events)}
+            
+            # Filtros aplicados durante a varredura; só as melhores entram na tabela
+            surebets = get_parallel_detector().best_surebets(
+                list(books.values()),
+                min_profit=min_profit or 0,
+                limit=OPPORTUNITIES_TABLE_LIMIT,
+                bookmakers=bookmakers or None,
+                predicate=(lambda book: term in book.info['name'].lower() or term in book.label.lower()) if term else None,
+                transform=odds_transform
+            )
+            
+            rows = []
+            for surebet in surebets:
+                book = books[surebet['event_id'], surebet['market']]
+                rows.append({
+                    'event': f"🏟️ {book.info['name']}",
+                    'market': book.label,
+                    'profit': f"{surebet['profit_percent']:.2f}%",
+                    'bookmakers': ', '.join(dict.fromkeys(q.bookmaker.title() for q in surebet['selections'])),
+                    'actions': f"[📊 Detalhes](#{book.event_id})"
+                })
+            return rows
+        
+        # Refeito só quando algum feed lido mudou de conteúdo
+        all_opportunities = OPPORTUNITIES_MEMO.get(
+            (signature, tuple(bookmakers or ()), min_profit, term), detect
+        )
         
         # Estatísticas
         total_ops = len(all_opportunities)
@@ -535,17 +549,6 @@ def update_opportunities_table(n_intervals, n_clicks, sports, min_profit, bookma
         logger.error(f"Erro ao atualizar oportunidades: {e}")
         return [], dbc.Alert(f"Erro: {str(e)}", color="danger"), "0", "0%"
 
-def calculate_mock_profit(selections: List[Dict[str, Any]]) -> float:
-    """Calcula lucro mock para demonstração."""
-    if len(selections) < 2:
-        return 0
-    
-    # Fórmula simplificada de surebet
-    inverse_sum = sum(1/selection['odds'] for selection in selections[:2])
-    if inverse_sum < 1:
-        return (1 - inverse_sum) * 100
-    return 0
-
 @app.callback(
     [Output('live-games-table', 'data'),
      Output('upcoming-games-table', 'data')],
@@ -558,26 +561,25 @@ def update_games_tables(n_intervals):
         live_games = []
         upcoming_games = []
         
-        for adapter_name, adapter in BOOKMAKER_ADAPTERS.items():
-            # Jogos ao vivo
-            live_data = adapter.get_live_odds('soccer', limit=5)
-            for game in live_data:
-                live_games.append({
-                    'name': game['name'],
-                    'status': 'AO VIVO',
-                    'start_time': datetime.fromisoformat(game['start_time'].replace('Z', '+00:00')).strftime('%H:%M'),
-                    'bookmaker': adapter_name.title()
-                })
-            
-            # Jogos futuros
-            upcoming_data = adapter.get_upcoming_odds('soccer', limit=5)
-            for game in upcoming_data:
-                upcoming_games.append({
-                    'name': game['name'],
-                    'status': 'PROGRAMADO',
-                    'start_time': datetime.fromisoformat(game['start_time'].replace('Z', '+00:00')).strftime('%d/%m %H:%M'),
-                    'bookmaker': adapter_name.title()
-                })
+        scheduler = get_ingest_scheduler()
+        
+        # Jogos ao vivo
+        for game in scheduler.read(STATUS_LIVE, ['soccer'], limit=5):
+            live_games.append({
+                'name': game['name'],
+                'status': 'AO VIVO',
+                'start_time': datetime.fromisoformat(game['start_time'].replace('Z', '+00:00')).strftime('%H:%M'),
+                'bookmaker': game['bookmaker'].title()
+            })
+        
+        # Jogos futuros
+        for game in scheduler.read(STATUS_UPCOMING, ['soccer'], limit=5):
+            upcoming_games.append({
+                'name': game['name'],
+                'status': 'PROGRAMADO',
+                'start_time': datetime.fromisoformat(game['start_time'].replace('Z', '+00:00')).strftime('%d/%m %H:%M'),
+                'bookmaker': game['bookmaker'].title()
+            })
         
         return live_games[:10], upcoming_games[:10]
     
@@ -654,6 +656,7 @@ def admin_login(n_clicks, password, session_data):
 
 if __name__ == '__main__':
     logger.info("Iniciando dashboard consolidado do Surebets Hunter Pro")
+    warm_up_adapters()
     app.run_server(
         debug=settings.DEBUG,
         host='0.0.0.0',
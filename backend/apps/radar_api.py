@@ -1,126 +1,201 @@
-import requests
-from typing import Any, Dict, Optional
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
 
-class SportRadarAPI:
-    def __init__(self, betting_house: str):
+from backend.core.http_cache import CacheEntry, ResponseCache, get_response_cache
+from backend.core.http_transport import HttpTransport, get_transport
+from backend.core.json_codec import get_codec
+from backend.core.json_stream import project_doc, stream_doc
+from backend.core.rate_limit import FetchGuard, get_guard
+from backend.core.single_flight import AsyncSingleFlight, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# TTL em segundos por endpoint; os ausentes usam settings.CACHE_TIMEOUT. Odds
+# (config_tree) têm TTL 0: nunca são servidas sem consultar a origem, mas
+# ETag/Last-Modified ainda evitam baixar o corpo quando nada mudou.
+ENDPOINT_TTLS = {
+    'all_definitions': 24 * 3600,
+    'sports_ids': 6 * 3600,
+    'league': 3600,
+    'league_summary': 600,
+    'season_goals': 600,
+    'league_fixtures': 300,
+    'modal_data': 0,
+    'local_data': 0,
+}
+
+# Buscas idênticas simultâneas (mesma URL) compartilham uma única chamada à origem
+_FLIGHTS = SingleFlight()
+_ASYNC_FLIGHTS = AsyncSingleFlight()
+
+
+class _SportRadarRoutes:
+    """
+    Montagem de URLs e recorte das respostas da SportRadar, compartilhados
+    pelos clientes síncrono e assíncrono. As conexões vêm do transporte
+    HTTP compartilhado, as respostas passam pelo cache compartilhado e cada
+    requisição pela guarda da casa (taxa, novas tentativas, circuit breaker),
+    salvo se outros forem informados; `ttls` sobrepõe `ENDPOINT_TTLS`.
+    """
+
+    def __init__(self, betting_house: str, transport: Optional[HttpTransport] = None,
+                 cache: Optional[ResponseCache] = None, ttls: Optional[Dict[str, float]] = None,
+                 guard: Optional[FetchGuard] = None):
         self.betting_house = betting_house
+        self.guard = guard or get_guard(betting_house)
         self.base_url = 'https://s5.sir.sportradar.com/'
-        self.session = requests.Session()
-        self.session.headers.update({
-            'accept': 'application/json, text/plain, */*',
-            'user-agent': 'Mozilla/5.0 (compatible; SurebetsSystem/1.0)'
-        })
+        self.transport = transport or get_transport()
+        self.cache = cache if cache is not None else get_response_cache()
+        self.ttls = dict(ENDPOINT_TTLS, **(ttls or {}))
 
-    def all_definitions(self, id: str = '5bc333c9e86aeb31125b4b35e9038eb5') -> Optional[Dict[str, Any]]:
-        url = f'https://s5.sir.sportradar.com/translations/common/en.{id}.json'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        return resp.json()
+    def _ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.cache.default_ttl)
 
-    def modal_data(self, sport_id: str, method: str = 'all') -> Optional[Dict[str, Any]]:
-        url = f'{self.base_url}{self.betting_house}/en/Europe:Berlin/gismo/config_tree_mini/41/0/{sport_id}'
-        resp = self.session.get(url)
-        # Log da resposta bruta para debug
-        try:
-            logger = __import__('logging').getLogger(__name__)
-            logger.debug(f"[SportRadarAPI] URL: {url} | Status: {resp.status_code} | Conteúdo: {resp.text[:500]}")
-        except Exception as log_exc:
-            pass
+    def _finish(self, url: str, endpoint: Optional[str], resp: Any, entry: Optional[CacheEntry]) -> Any:
+        """Trata 304 (dados do cache), valida o status e guarda a resposta nova."""
+        if entry is not None and resp.status_code == 304:
+            return self.cache.revalidated(url, entry, self._ttl(endpoint))
         resp.raise_for_status()
-        data = resp.json()
+        data = get_codec().loads(resp.content)
+        if endpoint is not None:
+            self.cache.store(url, data, self._ttl(endpoint), resp.headers)
+        return data
+
+    def _definitions_url(self, id: str) -> str:
+        return f'https://s5.sir.sportradar.com/translations/common/en.{id}.json'
+
+    def _config_tree_url(self, sport_id: str, local_id: Optional[str] = None, region: str = 'Europe:Berlin') -> str:
+        url = f'{self.base_url}{self.betting_house}/en/{region}/gismo/config_tree_mini/41/0/{sport_id}'
+        return f'{url}/{local_id}' if local_id is not None else url
+
+    def _season_url(self, endpoint: str, league_id: str, region: str = 'America:Argentina:Buenos_Aires') -> str:
+        return f'{self.base_url}{self.betting_house}/en/{region}/gismo/{endpoint}/{league_id}'
+
+    def _league_summary_url(self, league_id: str) -> str:
+        return f'{self.base_url}common/en/Europe:Berlin/gismo/stats_season_leaguesummary/{league_id}/main'
+
+    def _sports_ids_urls(self) -> List[str]:
+        # Tenta com e sem o prefixo da casa
+        return [
+            f'{self.base_url}{self.betting_house}/en/Europe:Berlin/gismo/config_tree_mini/41/0',
+            f'{self.base_url}en/Europe:Berlin/gismo/config_tree_mini/41/0'
+        ]
+
+    def _absolute_url(self, path: str) -> str:
+        # Corrige para sempre usar URL absoluta
+        return path if path.startswith('http') else f'{self.base_url}{path}'
+
+    def _info_url(self, region: str, method: str, values: str, configs: Dict[str, Any]) -> str:
+        if configs.get('getCommonContents', False) and method == 'common':
+            return self._definitions_url(configs.get('languageId', '514d1e14ad5c11eeebf17ba7f5dc97ad'))
+        lang = configs.get('lang', 'en')
+        server = configs.get('server', 'gismo')
+        return f'{self.base_url}{self.betting_house}/{lang}/{region}/{server}/{method}/{values}'
+
+    @staticmethod
+    def _select_modal(data: Dict[str, Any], method: str) -> Optional[Dict[str, Any]]:
         if method == 'all':
             return data
         if method == 'categories':
             return data['doc'][0]['data'][0]
         return None
 
-    def local_data(self, sport_id: str, local_id: str, method: str = 'all') -> Optional[Dict[str, Any]]:
-        url = f'{self.base_url}{self.betting_house}/en/Europe:Berlin/gismo/config_tree_mini/41/0/{sport_id}/{local_id}'
-        resp = self.session.get(url)
-        # Log da resposta bruta para debug
-        try:
-            logger = __import__('logging').getLogger(__name__)
+    @staticmethod
+    def _select_info(data: Dict[str, Any], method: str, configs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if configs.get('getCommonContents', False) and method == 'common':
+            return data
+        return data.get('doc', [{}])[0]
+
+
+class SportRadarAPI(_SportRadarRoutes):
+    def __init__(self, betting_house: str, transport: Optional[HttpTransport] = None,
+                 cache: Optional[ResponseCache] = None, ttls: Optional[Dict[str, float]] = None,
+                 guard: Optional[FetchGuard] = None):
+        super().__init__(betting_house, transport, cache, ttls, guard)
+        self.session = self.transport.session
+
+    def _get(self, url: str, endpoint: Optional[str] = None, debug: bool = False) -> Any:
+        """
+        GET com cache: `endpoint` escolhe o TTL; sem ele a resposta não é
+        guardada. Chamadas simultâneas à mesma URL fazem uma só requisição.
+        """
+        entry = None
+        if endpoint is not None:
+            entry, fresh = self.cache.lookup(url)
+            if fresh:
+                return entry.data
+        return _FLIGHTS.do(url, lambda: self._fetch(url, endpoint, entry, debug))
+
+    def _fetch(self, url: str, endpoint: Optional[str], entry: Optional[CacheEntry], debug: bool) -> Any:
+        headers = entry.validators() if entry else None
+        resp = self.guard.call(lambda: self.transport.get(url, headers=headers))
+        if debug and logger.isEnabledFor(logging.DEBUG):
+            # Log da resposta bruta para debug (o corpo só é formatado com DEBUG ativo)
             logger.debug(f"[SportRadarAPI] URL: {url} | Status: {resp.status_code} | Conteúdo: {resp.text[:500]}")
-        except Exception as log_exc:
-            pass
-        resp.raise_for_status()
-        if method == 'all':
-            return resp.json()
-        return None
+        return self._finish(url, endpoint, resp, entry)
+
+    def all_definitions(self, id: str = '5bc333c9e86aeb31125b4b35e9038eb5') -> Optional[Dict[str, Any]]:
+        return self._get(self._definitions_url(id), 'all_definitions')
+
+    def modal_data(self, sport_id: str, method: str = 'all') -> Optional[Dict[str, Any]]:
+        return self._select_modal(self._get(self._config_tree_url(sport_id), 'modal_data', debug=True), method)
+
+    def modal_docs(self, sport_id: str, limit: Optional[int] = None, fields: Optional[Iterable[str]] = None,
+                   region: str = 'Europe:Berlin') -> Dict[str, Any]:
+        """
+        Árvore do esporte reduzida a {'doc': [...]}: só os primeiros `limit`
+        itens, cada um apenas com os campos `fields`. O corpo é lido de forma
+        incremental (ver `backend.core.json_stream`) e a leitura para no limite;
+        por isso a resposta não passa pelo cache.
+        """
+        url = self._config_tree_url(sport_id, region=region)
+        fields = tuple(fields) if fields is not None else None
+        return _FLIGHTS.do((url, limit, fields), lambda: self._stream(url, fields, limit))
+
+    def _stream(self, url: str, fields: Optional[Iterable[str]], limit: Optional[int]) -> Dict[str, Any]:
+        resp = self.guard.call(lambda: self.transport.get(url, stream=True))
+        try:
+            resp.raise_for_status()
+            resp.raw.decode_content = True
+            return stream_doc(resp.raw, fields, limit)
+        finally:
+            resp.close()
+
+    def local_data(self, sport_id: str, local_id: str, method: str = 'all') -> Optional[Dict[str, Any]]:
+        data = self._get(self._config_tree_url(sport_id, local_id), 'local_data', debug=True)
+        return data if method == 'all' else None
 
     def league(self, league_id: str) -> Optional[Dict[str, Any]]:
-        url = f'{self.base_url}{self.betting_house}/en/America:Argentina:Buenos_Aires/gismo/stats_season_meta/{league_id}'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get(self._season_url('stats_season_meta', league_id), 'league')
 
     def league_summary(self, league_id: str) -> Optional[Dict[str, Any]]:
-        url = f'{self.base_url}common/en/Europe:Berlin/gismo/stats_season_leaguesummary/{league_id}/main'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get(self._league_summary_url(league_id), 'league_summary')
 
     def season_goals(self, league_id: str) -> Optional[Dict[str, Any]]:
-        url = f'{self.base_url}{self.betting_house}/en/America:Argentina:Buenos_Aires/gismo/stats_season_goals/{league_id}/main'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get(self._season_url('stats_season_goals', league_id) + '/main', 'season_goals')
 
     def league_fixtures(self, league_id: str) -> Optional[Dict[str, Any]]:
-        url = f'{self.base_url}{self.betting_house}/en/America:Argentina:Buenos_Aires/gismo/stats_season_fixtures2/{league_id}/1'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get(self._season_url('stats_season_fixtures2', league_id) + '/1', 'league_fixtures')
 
     def get_by_path(self, path: str) -> Optional[Dict[str, Any]]:
-        # Corrige para sempre usar URL absoluta
-        if path.startswith('http'):
-            url = path
-        else:
-            url = f'{self.base_url}{path}'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get(self._absolute_url(path))
 
     def get_by_url(self, url: str) -> Optional[Dict[str, Any]]:
-        # Garante que a URL é absoluta
-        if not url.startswith('http'):
-            url = f'{self.base_url}{url}'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get(self._absolute_url(url))
 
     def get_info(self, region: str, method: str, values: str, configs: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         configs = configs or {}
-        get_common = configs.get('getCommonContents', False)
-        language_id = configs.get('languageId', '514d1e14ad5c11eeebf17ba7f5dc97ad')
-        lang = configs.get('lang', 'en')
-        server = configs.get('server', 'gismo')
-        if get_common and method == 'common':
-            url = f'https://s5.sir.sportradar.com/translations/common/en.{language_id}.json'
-            resp = self.session.get(url)
-            resp.raise_for_status()
-            return resp.json()
-        else:
-            url = f'{self.base_url}{self.betting_house}/{lang}/{region}/{server}/{method}/{values}'
-            resp = self.session.get(url)
-            resp.raise_for_status()
-            return resp.json().get('doc', [{}])[0]
+        return self._select_info(self._get(self._info_url(region, method, values, configs), 'info'), method, configs)
 
     def get_sports_ids(self) -> Optional[Dict[str, Any]]:
         """
         Busca a lista de esportes e seus IDs disponíveis na API.
         Tenta com e sem o prefixo da casa. Retorna None se ambos falharem.
         """
-        urls = [
-            f'{self.base_url}{self.betting_house}/en/Europe:Berlin/gismo/config_tree_mini/41/0',
-            f'{self.base_url}en/Europe:Berlin/gismo/config_tree_mini/41/0'
-        ]
-        for url in urls:
+        for url in self._sports_ids_urls():
             try:
-                resp = self.session.get(url)
-                resp.raise_for_status()
-                data = resp.json()
+                data = self._get(url, 'sports_ids')
                 if data and 'doc' in data:
                     return data
             except Exception as e:
@@ -131,35 +206,17 @@ class SportRadarAPI:
         """
         Busca dados do esporte para uma região específica.
         """
-        url = f'{self.base_url}{self.betting_house}/en/{region}/gismo/config_tree_mini/41/0/{sport_id}'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        data = resp.json()
-        if method == 'all':
-            return data
-        if method == 'categories':
-            return data['doc'][0]['data'][0]
-        return None
+        return self._select_modal(self._get(self._config_tree_url(sport_id, region=region), 'modal_data'), method)
 
     def local_data_region(self, sport_id: str, local_id: str, region: str = 'Europe:Berlin', method: str = 'all') -> Optional[Dict[str, Any]]:
-        url = f'{self.base_url}{self.betting_house}/en/{region}/gismo/config_tree_mini/41/0/{sport_id}/{local_id}'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        if method == 'all':
-            return resp.json()
-        return None
+        data = self._get(self._config_tree_url(sport_id, local_id, region), 'local_data')
+        return data if method == 'all' else None
 
     def league_region(self, league_id: str, region: str = 'America:Argentina:Buenos_Aires') -> Optional[Dict[str, Any]]:
-        url = f'{self.base_url}{self.betting_house}/en/{region}/gismo/stats_season_meta/{league_id}'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get(self._season_url('stats_season_meta', league_id, region), 'league')
 
     def league_fixtures_region(self, league_id: str, region: str = 'America:Argentina:Buenos_Aires') -> Optional[Dict[str, Any]]:
-        url = f'{self.base_url}{self.betting_house}/en/{region}/gismo/stats_season_fixtures2/{league_id}/1'
-        resp = self.session.get(url)
-        resp.raise_for_status()
-        return resp.json()
+        return self._get(self._season_url('stats_season_fixtures2', league_id, region) + '/1', 'league_fixtures')
 
     # Estrutura para integração WebSocket (exemplo, implementação real depende do endpoint)
     def connect_websocket(self, ws_url: str, on_message=None, on_error=None, on_close=None):
@@ -179,3 +236,122 @@ class SportRadarAPI:
     # 1. ids = api.get_sports_ids()
     # 2. Use ids['doc'][0]['data'] para encontrar o ID do esporte desejado (ex: futebol/soccer)
     # 3. Passe esse ID para os outros métodos (ex: modal_data(sport_id=1))
+
+
+class AsyncSportRadarAPI(_SportRadarRoutes):
+    """
+    Versão assíncrona de `SportRadarAPI`, com os mesmos métodos como corrotinas.
+
+    As requisições passam por `HttpTransport.aget`: `httpx.AsyncClient` do
+    transporte quando o pacote está instalado; sem ele, o pool síncrono numa
+    thread, o que mantém as chamadas concorrentes entre si.
+    """
+
+    async def _get(self, url: str, endpoint: Optional[str] = None) -> Any:
+        entry = None
+        if endpoint is not None:
+            entry, fresh = self.cache.lookup(url)
+            if fresh:
+                return entry.data
+        return await _ASYNC_FLIGHTS.do(url, lambda: self._fetch(url, endpoint, entry))
+
+    async def _fetch(self, url: str, endpoint: Optional[str], entry: Optional[CacheEntry]) -> Any:
+        headers = entry.validators() if entry else None
+        resp = await self.guard.acall(lambda: self.transport.aget(url, headers=headers))
+        return self._finish(url, endpoint, resp, entry)
+
+    async def all_definitions(self, id: str = '5bc333c9e86aeb31125b4b35e9038eb5') -> Optional[Dict[str, Any]]:
+        return await self._get(self._definitions_url(id), 'all_definitions')
+
+    async def modal_data(self, sport_id: str, method: str = 'all') -> Optional[Dict[str, Any]]:
+        return self._select_modal(await self._get(self._config_tree_url(sport_id), 'modal_data'), method)
+
+    async def modal_docs(self, sport_id: str, limit: Optional[int] = None, fields: Optional[Iterable[str]] = None,
+                         region: str = 'Europe:Berlin') -> Dict[str, Any]:
+        """Mesmo resultado de `SportRadarAPI.modal_docs`, projetado sobre a resposta completa."""
+        data = await self._get(self._config_tree_url(sport_id, region=region), 'modal_data')
+        return project_doc(data, fields, limit)
+
+    async def local_data(self, sport_id: str, local_id: str, method: str = 'all') -> Optional[Dict[str, Any]]:
+        data = await self._get(self._config_tree_url(sport_id, local_id), 'local_data')
+        return data if method == 'all' else None
+
+    async def league(self, league_id: str) -> Optional[Dict[str, Any]]:
+        return await self._get(self._season_url('stats_season_meta', league_id), 'league')
+
+    async def league_summary(self, league_id: str) -> Optional[Dict[str, Any]]:
+        return await self._get(self._league_summary_url(league_id), 'league_summary')
+
+    async def season_goals(self, league_id: str) -> Optional[Dict[str, Any]]:
+        return await self._get(self._season_url('stats_season_goals', league_id) + '/main', 'season_goals')
+
+    async def league_fixtures(self, league_id: str) -> Optional[Dict[str, Any]]:
+        return await self._get(self._season_url('stats_season_fixtures2', league_id) + '/1', 'league_fixtures')
+
+    async def get_by_path(self, path: str) -> Optional[Dict[str, Any]]:
+        return await self._get(self._absolute_url(path))
+
+    async def get_by_url(self, url: str) -> Optional[Dict[str, Any]]:
+        return await self._get(self._absolute_url(url))
+
+    async def get_info(self, region: str, method: str, values: str,
+                       configs: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        configs = configs or {}
+        return self._select_info(await self._get(self._info_url(region, method, values, configs), 'info'), method, configs)
+
+    async def get_sports_ids(self) -> Optional[Dict[str, Any]]:
+        """Mesmo contrato de `SportRadarAPI.get_sports_ids`."""
+        for url in self._sports_ids_urls():
+            try:
+                data = await self._get(url, 'sports_ids')
+                if data and 'doc' in data:
+                    return data
+            except Exception:
+                continue
+        return None
+
+    async def modal_data_region(self, sport_id: str, region: str = 'Europe:Berlin',
+                                method: str = 'all') -> Optional[Dict[str, Any]]:
+        return self._select_modal(await self._get(self._config_tree_url(sport_id, region=region), 'modal_data'), method)
+
+    async def local_data_region(self, sport_id: str, local_id: str, region: str = 'Europe:Berlin',
+                                method: str = 'all') -> Optional[Dict[str, Any]]:
+        data = await self._get(self._config_tree_url(sport_id, local_id, region), 'local_data')
+        return data if method == 'all' else None
+
+    async def league_region(self, league_id: str,
+                            region: str = 'America:Argentina:Buenos_Aires') -> Optional[Dict[str, Any]]:
+        return await self._get(self._season_url('stats_season_meta', league_id, region), 'league')
+
+    async def league_fixtures_region(self, league_id: str,
+                                     region: str = 'America:Argentina:Buenos_Aires') -> Optional[Dict[str, Any]]:
+        return await self._get(self._season_url('stats_season_fixtures2', league_id, region) + '/1', 'league_fixtures')
+
+
+async def gather_bookmakers(clients: Dict[str, AsyncSportRadarAPI],
+                            call: Callable[[AsyncSportRadarAPI], Awaitable[Any]]) -> Dict[str, Any]:
+    """
+    Executa `call` em todas as casas ao mesmo tempo com `asyncio.gather`; a
+    latência total é a da casa mais lenta, não a soma. Uma casa que falha
+    não derruba as demais: seu resultado é None e o erro é registrado.
+    """
+    houses = list(clients)
+    results = await asyncio.gather(*(call(clients[house]) for house in houses), return_exceptions=True)
+    merged = {}
+    for house, result in zip(houses, results):
+        if isinstance(result, Exception):
+            logger.error(f"Erro ao consultar {house} na SportRadar: {result}")
+            result = None
+        merged[house] = result
+    return merged
+
+
+def fetch_all_bookmakers(houses: Iterable[str], method: str, *args, **kwargs) -> Dict[str, Any]:
+    """
+    Ponto de entrada síncrono (rotas Flask, adaptadores): chama o método
+    `method` de `AsyncSportRadarAPI` para todas as casas em paralelo, no loop
+    de segundo plano do transporte compartilhado (conexões reaproveitadas).
+    """
+    transport = get_transport()
+    clients = {house: AsyncSportRadarAPI(house, transport) for house in houses}
+    return transport.run(gather_bookmakers(clients, lambda api: getattr(api, method)(*args, **kwargs)))
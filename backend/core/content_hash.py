@@ -0,0 +1,31 @@
+"""
+Hash de conteúdo para detectar eventos inalterados entre coletas.
+
+Usa xxhash (XXH3 de 64 bits) quando o pacote está instalado e BLAKE2b com
+digest de 8 bytes da biblioteca padrão caso contrário. O hash de um evento
+é calculado sobre o sub-documento serializado pelo codec JSON ativo: a
+SportRadar devolve os mesmos campos na mesma ordem quando nada mudou, então
+documentos iguais produzem bytes iguais.
+"""
+
+import hashlib
+from typing import Any
+
+from backend.core.json_codec import dumps_bytes
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - depende do ambiente
+    xxhash = None
+
+
+def digest(data: bytes) -> int:
+    """Hash de 64 bits de `data`."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def content_hash(doc: Any) -> int:
+    """Hash de 64 bits de um documento JSON (ex.: um item de `doc` da SportRadar)."""
+    return digest(dumps_bytes(doc))
@@ -0,0 +1,134 @@
+"""
+Cache de respostas HTTP com TTL, revalidação condicional e LRU.
+
+Cada entrada guarda o JSON decodificado, o instante de expiração e os
+validadores da resposta (ETag / Last-Modified). Entradas frescas são
+servidas sem ir à rede; entradas vencidas com validador são revalidadas com
+If-None-Match / If-Modified-Since, e um 304 renova a entrada sem baixar o
+corpo de novo. O número de entradas é limitado, descartando a usada há mais
+tempo. Os dados em cache são compartilhados: quem os recebe não deve alterá-los.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from config import settings
+
+
+class CacheEntry:
+    """Resposta em cache: dados, expiração e validadores."""
+
+    __slots__ = ('data', 'expires_at', 'etag', 'last_modified')
+
+    def __init__(self, data: Any, expires_at: float, etag: Optional[str], last_modified: Optional[str]):
+        self.data = data
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Cabeçalhos de requisição condicional."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Cache LRU de respostas por URL, seguro para múltiplas threads.
+
+    `ttl` 0 não serve a entrada sem consultar a origem, mas ainda guarda os
+    validadores: a resposta é sempre revalidada e um 304 evita baixar o corpo.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, default_ttl: Optional[float] = None):
+        self.max_entries = max_entries or settings.HTTP_CACHE_MAX_ENTRIES
+        self.default_ttl = settings.CACHE_TIMEOUT if default_ttl is None else default_ttl
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def lookup(self, url: str) -> Tuple[Optional[CacheEntry], bool]:
+        """(entrada, fresca?) para a URL; entradas vencidas voltam para revalidação."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(url)
+            if entry.is_fresh(now):
+                self.hits += 1
+                return entry, True
+            self.misses += 1
+            return entry, False
+
+    def store(self, url: str, data: Any, ttl: Optional[float] = None,
+              headers: Optional[Mapping[str, str]] = None) -> None:
+        """Guarda a resposta se ela tiver TTL positivo ou algum validador."""
+        headers = headers or {}
+        ttl = self.default_ttl if ttl is None else ttl
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        if ttl <= 0 and not etag and not last_modified:
+            return
+        entry = CacheEntry(data, time.monotonic() + ttl, etag, last_modified)
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidated(self, url: str, entry: CacheEntry, ttl: Optional[float] = None) -> Any:
+        """Renova a entrada após um 304 e devolve os dados guardados."""
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            entry.expires_at = time.monotonic() + ttl
+            self.revalidations += 1
+        return entry.data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de acerto/erro e ocupação."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Cache global de respostas, criado sob demanda."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,145 @@
+"""
+Transporte HTTP compartilhado pelos clientes das casas de apostas.
+
+Todos os `SportRadarAPI` (síncronos e assíncronos) pegam conexões do mesmo
+transporte em vez de abrir uma `requests.Session` cada um: um pool por host
+com tamanho configurável, keep-alive entre chamadas e timeouts padrão de
+conexão/leitura ligados a `settings.BOOKMAKER_TIMEOUT`. Para o cliente
+assíncrono, mantém um `httpx.AsyncClient` (HTTP/2 quando o pacote `h2` está
+instalado) por event loop e um loop próprio em segundo plano para rotas
+síncronas, de modo que as conexões sobrevivem entre requisições.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+from typing import Any, Coroutine, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import settings
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - depende do ambiente
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Erros de rede (conexão, timeout) dos dois clientes HTTP
+TRANSPORT_ERRORS = (requests.ConnectionError, requests.Timeout) + ((httpx.TransportError,) if httpx else ())
+
+DEFAULT_HEADERS = {
+    'accept': 'application/json, text/plain, */*',
+    'user-agent': 'Mozilla/5.0 (compatible; SurebetsSystem/1.0)'
+}
+
+
+class HttpTransport:
+    """
+    Pool de conexões HTTP compartilhado.
+
+    `pool_hosts` é o número de hosts com pool mantido e `pool_maxsize` o
+    número de conexões keep-alive por host. Os timeouts padrão valem para
+    toda requisição que não informar `timeout`.
+    """
+
+    def __init__(self, pool_hosts: Optional[int] = None, pool_maxsize: Optional[int] = None,
+                 timeout: Optional[float] = None, connect_timeout: Optional[float] = None,
+                 http2: Optional[bool] = None, headers: Optional[Dict[str, str]] = None):
+        self.pool_hosts = pool_hosts or settings.HTTP_POOL_HOSTS
+        self.pool_maxsize = pool_maxsize or settings.HTTP_POOL_MAXSIZE
+        self.timeout = settings.BOOKMAKER_TIMEOUT if timeout is None else timeout
+        self.connect_timeout = settings.HTTP_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        wants_http2 = settings.HTTP2_ENABLED if http2 is None else http2
+        self.http2 = wants_http2 and importlib.util.find_spec('h2') is not None
+        self.headers = dict(headers or DEFAULT_HEADERS)
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=self.pool_hosts, pool_maxsize=self.pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._async_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def timeouts(self) -> Tuple[float, float]:
+        """(conexão, leitura) no formato aceito pelo requests."""
+        return self.connect_timeout, self.timeout
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET síncrono pelo pool compartilhado."""
+        kwargs.setdefault('timeout', self.timeouts)
+        return self.session.get(url, **kwargs)
+
+    def async_client(self) -> Any:
+        """
+        `httpx.AsyncClient` do event loop corrente, criado na primeira chamada.
+        Requer o pacote httpx.
+        """
+        if httpx is None:
+            raise RuntimeError("httpx não está instalado")
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.pool_hosts * self.pool_maxsize,
+                                    max_keepalive_connections=self.pool_maxsize),
+                http2=self.http2
+            )
+        return client
+
+    async def aget(self, url: str, headers: Optional[Dict[str, str]] = None) -> Any:
+        """GET assíncrono: httpx quando disponível, senão o pool síncrono numa thread."""
+        if httpx is not None:
+            return await self.async_client().get(url, headers=headers)
+        return await asyncio.to_thread(self.get, url, headers=headers)
+
+    def run(self, coro: Coroutine) -> Any:
+        """
+        Executa uma corrotina no loop de segundo plano do transporte e espera o
+        resultado. Usado por código síncrono (rotas Flask) para reaproveitar o
+        cliente assíncrono e suas conexões entre chamadas.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._background_loop()).result()
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='http-transport-loop', daemon=True).start()
+                logger.info(f"Transporte HTTP: loop assíncrono iniciado (http2={self.http2})")
+            return self._loop
+
+    def close(self) -> None:
+        """Fecha o pool síncrono, os clientes assíncronos do loop próprio e o loop."""
+        self.session.close()
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            client = self._async_clients.pop(loop, None)
+            if client is not None:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Transporte global, criado sob demanda com as configurações de `settings`."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HttpTransport()
+    return _transport
@@ -0,0 +1,151 @@
+"""
+Codec JSON plugável do sistema.
+
+Um único ponto de serialização para as respostas da SportRadar, as rotas
+Flask, as colunas `*_json` do banco e as notificações WebSocket. Usa orjson
+quando o pacote está instalado e o módulo `json` da biblioteca padrão caso
+contrário; `settings.JSON_CODEC` ('auto', 'orjson' ou 'json') ou
+`set_codec()` permitem escolher outro. Os dois codecs aceitam os mesmos
+tipos: datetime/date, Decimal, conjuntos, arrays e escalares numpy e
+objetos com `to_dict()` (como `Quote` e `MarketBook`).
+"""
+
+import datetime
+import decimal
+import json
+import logging
+import threading
+from typing import Any, Optional, Union
+
+from flask.json.provider import DefaultJSONProvider
+
+from config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende do ambiente
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+def _default(obj: Any) -> Any:
+    """Conversão dos tipos que nenhum dos codecs serializa nativamente."""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
+
+
+class StdlibCodec:
+    """Codec baseado no módulo `json` da biblioteca padrão."""
+
+    name = 'json'
+
+    def dumps(self, obj: Any) -> str:
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self.dumps(obj).encode('utf-8')
+
+    def loads(self, data: Union[str, bytes, bytearray, memoryview]) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    """Codec baseado em orjson (serializa direto para bytes UTF-8)."""
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("orjson não está instalado")
+        self._options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> str:
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=self._options)
+
+    def loads(self, data: Union[str, bytes, bytearray, memoryview]) -> Any:
+        return orjson.loads(data)
+
+
+_CODECS = {'json': StdlibCodec, 'orjson': OrjsonCodec}
+
+_codec: Optional[Any] = None
+_codec_lock = threading.Lock()
+
+
+def _create(name: str) -> Any:
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+    if name not in _CODECS:
+        raise ValueError(f"Codec JSON desconhecido: {name}")
+    return _CODECS[name]()
+
+
+def get_codec() -> Any:
+    """Codec ativo, escolhido na primeira chamada por `settings.JSON_CODEC`."""
+    global _codec
+    if _codec is None:
+        with _codec_lock:
+            if _codec is None:
+                _codec = _create(settings.JSON_CODEC)
+                logger.info(f"Codec JSON: {_codec.name}")
+    return _codec
+
+
+def set_codec(codec: Union[str, Any]) -> Any:
+    """Troca o codec ativo por nome ('auto', 'orjson', 'json') ou por instância."""
+    global _codec
+    _codec = _create(codec) if isinstance(codec, str) else codec
+    return _codec
+
+
+def dumps(obj: Any) -> str:
+    return get_codec().dumps(obj)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return get_codec().dumps_bytes(obj)
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    return get_codec().loads(data)
+
+
+class CodecJSONProvider(DefaultJSONProvider):
+    """
+    Provider JSON do Flask (2.2+) que usa o codec ativo em `jsonify`,
+    `request.get_json()` e afins. `sort_keys` e indentação do provider padrão
+    não são aplicados.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps(obj)
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Any:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,59 @@
+"""
+Leitura incremental de documentos JSON da SportRadar com projeção de campos.
+
+Os documentos `config_tree_mini` trazem uma lista `doc` grande, da qual os
+adaptadores usam só alguns campos dos primeiros `limit` itens. Com o pacote
+ijson instalado, `stream_doc` lê o corpo da resposta aos poucos, materializa
+um item por vez, guarda apenas os campos pedidos e para de ler ao atingir
+`limit`. Sem ijson, o corpo é decodificado inteiro pelo codec ativo (`backend.core.json_codec`) e
+a mesma projeção é aplicada, de modo que o resultado é idêntico.
+"""
+
+from typing import Any, BinaryIO, Dict, Iterable, Optional
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - depende do ambiente
+    ijson = None
+
+from backend.core.json_codec import get_codec
+
+
+def loads(body: bytes) -> Any:
+    return get_codec().loads(body)
+
+
+def project(item: Dict[str, Any], fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Apenas os campos pedidos do item (todos, se `fields` for None)."""
+    if fields is None or not isinstance(item, dict):
+        return item
+    return {key: item[key] for key in fields if key in item}
+
+
+def project_doc(data: Optional[Dict[str, Any]], fields: Optional[Iterable[str]] = None,
+                limit: Optional[int] = None) -> Dict[str, Any]:
+    """Projeção de um documento já decodificado: {'doc': [itens projetados]}."""
+    items = (data or {}).get('doc') or []
+    if limit is not None:
+        items = items[:max(limit, 0)]
+    return {'doc': [project(item, fields) for item in items]}
+
+
+def stream_doc(raw: BinaryIO, fields: Optional[Iterable[str]] = None,
+               limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Lê `doc` de um corpo binário (ex.: `resp.raw`) com projeção de campos,
+    parando após `limit` itens quando a leitura é incremental.
+    """
+    if ijson is None:
+        return project_doc(loads(raw.read()), fields, limit)
+
+    fields = tuple(fields) if fields is not None else None
+    items = []
+    if limit is not None and limit <= 0:
+        return {'doc': items}
+    for item in ijson.items(raw, 'doc.item', use_float=True):
+        items.append(project(item, fields))
+        if limit is not None and len(items) >= limit:
+            break
+    return {'doc': items}
@@ -0,0 +1,289 @@
+"""
+Controle de taxa, novas tentativas e circuit breaker por casa de apostas.
+
+Cada casa tem um `FetchGuard` com:
+- um token bucket (`BOOKMAKER_RATE_LIMIT` requisições/s, rajada de
+  `BOOKMAKER_RATE_BURST`), que limita o ritmo sem serializar as chamadas:
+  com tokens disponíveis as requisições saem em paralelo;
+- novas tentativas com backoff exponencial e jitter completo para erros de
+  rede, 429 e 5xx, respeitando o cabeçalho Retry-After quando presente
+  (até `BOOKMAKER_MAX_RETRIES` tentativas extras);
+- um circuit breaker que abre após `BOOKMAKER_BREAKER_THRESHOLD` falhas
+  seguidas (404 ou 5xx) e rejeita chamadas por `BOOKMAKER_BREAKER_RESET`
+  segundos, liberando então uma única chamada de teste (as demais seguem
+  rejeitadas até ela terminar).
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import settings
+from backend.core.http_transport import TRANSPORT_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# Estados do circuit breaker
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Chamada rejeitada porque o circuito da casa está aberto."""
+    pass
+
+
+class TokenBucket:
+    """Token bucket com reserva: `reserve()` devolve quanto esperar pelo token."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Consome um token (podendo ficar negativo) e devolve a espera necessária em segundos."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class CircuitBreaker:
+    """Circuit breaker por contagem de falhas consecutivas."""
+
+    def __init__(self, threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        # Chamada de teste do estado semiaberto em andamento
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """
+        Levanta `CircuitOpenError` enquanto o circuito estiver aberto. No
+        estado semiaberto só uma chamada de teste passa por vez; devolve True
+        para ela, que deve terminar com `record_success`, `record_failure` ou
+        `release_probe`.
+        """
+        with self._lock:
+            if self.state == CIRCUIT_OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Circuito aberto")
+                self.state = CIRCUIT_HALF_OPEN
+            if self.state == CIRCUIT_HALF_OPEN:
+                if self._probe_in_flight:
+                    raise CircuitOpenError("Circuito aberto (chamada de teste em andamento)")
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def release_probe(self) -> None:
+        """Libera a chamada de teste que terminou sem resultado (ex.: 429 ou exceção)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CIRCUIT_CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Registra uma falha; devolve True se o circuito abriu agora."""
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == CIRCUIT_HALF_OPEN or (self.state == CIRCUIT_CLOSED and self.failures >= self.threshold):
+                self.state = CIRCUIT_OPEN
+                self._opened_at = self.clock()
+                return True
+            return False
+
+
+class FetchGuard:
+    """
+    Envolve as requisições de uma casa com limite de taxa, novas tentativas e
+    circuit breaker. `call`/`acall` recebem uma função que faz a requisição e
+    devolvem a resposta final (que ainda pode ter status de erro, para o
+    chamador tratar com `raise_for_status`).
+    """
+
+    def __init__(self, name: str, rate_limit: Optional[float] = None, burst: Optional[float] = None,
+                 max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None, breaker_threshold: Optional[int] = None,
+                 breaker_reset: Optional[float] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.name = name
+        self.max_retries = settings.BOOKMAKER_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = settings.BOOKMAKER_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = settings.BOOKMAKER_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.bucket = TokenBucket(
+            settings.BOOKMAKER_RATE_LIMIT if rate_limit is None else rate_limit,
+            settings.BOOKMAKER_RATE_BURST if burst is None else burst,
+            clock
+        )
+        self.breaker = CircuitBreaker(
+            settings.BOOKMAKER_BREAKER_THRESHOLD if breaker_threshold is None else breaker_threshold,
+            settings.BOOKMAKER_BREAKER_RESET if breaker_reset is None else breaker_reset,
+            clock
+        )
+        self.sleep = sleep
+
+    def configure(self, rate_limit: Optional[float] = None, burst: Optional[float] = None,
+                  max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                  backoff_max: Optional[float] = None, breaker_threshold: Optional[int] = None,
+                  breaker_reset: Optional[float] = None) -> None:
+        """Aplica numa guarda existente as opções informadas (as demais ficam como estão)."""
+        with self.bucket._lock:
+            if rate_limit is not None:
+                self.bucket.rate = rate_limit
+            if burst is not None:
+                self.bucket.burst = max(burst, 1.0)
+                self.bucket._tokens = min(self.bucket._tokens, self.bucket.burst)
+        with self.breaker._lock:
+            if breaker_threshold is not None:
+                self.breaker.threshold = breaker_threshold
+            if breaker_reset is not None:
+                self.breaker.reset_timeout = breaker_reset
+        if max_retries is not None:
+            self.max_retries = max_retries
+        if backoff_base is not None:
+            self.backoff_base = backoff_base
+        if backoff_max is not None:
+            self.backoff_max = backoff_max
+
+    def call(self, send: Callable[[], Any]) -> Any:
+        """Executa `send()` com as políticas da casa (versão síncrona)."""
+        attempt = 0
+        while True:
+            probe = self.breaker.before_call()
+            try:
+                self.sleep(self.bucket.reserve())
+                try:
+                    resp = send()
+                except TRANSPORT_ERRORS as e:
+                    delay = self._after_error(e, attempt)
+                else:
+                    delay = self._after_response(resp, attempt)
+                    if delay is None:
+                        return resp
+                    _discard(resp)
+            finally:
+                if probe:
+                    self.breaker.release_probe()
+            self.sleep(delay)
+            attempt += 1
+
+    async def acall(self, send: Callable[[], Awaitable[Any]]) -> Any:
+        """Mesmo que `call`, para requisições assíncronas."""
+        attempt = 0
+        while True:
+            probe = self.breaker.before_call()
+            try:
+                await asyncio.sleep(self.bucket.reserve())
+                try:
+                    resp = await send()
+                except TRANSPORT_ERRORS as e:
+                    delay = self._after_error(e, attempt)
+                else:
+                    delay = self._after_response(resp, attempt)
+                    if delay is None:
+                        return resp
+                    _discard(resp)
+            finally:
+                if probe:
+                    self.breaker.release_probe()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Espera antes da próxima tentativa: Retry-After ou backoff exponencial com jitter completo."""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _after_error(self, error: Exception, attempt: int) -> float:
+        """Erro de rede: conta como falha e tenta de novo, ou propaga na última tentativa."""
+        self._failure()
+        if attempt >= self.max_retries:
+            raise error
+        logger.warning(f"[{self.name}] Erro de rede ({error}); nova tentativa {attempt + 1}/{self.max_retries}")
+        return self.backoff(attempt)
+
+    def _after_response(self, resp: Any, attempt: int) -> Optional[float]:
+        """None para devolver a resposta; senão a espera antes da próxima tentativa."""
+        status = resp.status_code
+        retryable = status == 429 or status >= 500
+        if status == 404 or status >= 500:
+            self._failure()
+        elif status != 429:
+            self.breaker.record_success()
+
+        if not retryable or attempt >= self.max_retries:
+            return None
+        logger.warning(f"[{self.name}] HTTP {status}; nova tentativa {attempt + 1}/{self.max_retries}")
+        return self.backoff(attempt, parse_retry_after(resp.headers.get('Retry-After')))
+
+    def _failure(self) -> None:
+        if self.breaker.record_failure():
+            logger.error(f"[{self.name}] Circuito aberto após {self.breaker.failures} falhas seguidas")
+
+
+def _discard(resp: Any) -> None:
+    """Libera a conexão de uma resposta descartada antes de nova tentativa."""
+    close = getattr(resp, 'close', None)
+    if callable(close):
+        close()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After em segundos, aceitando número ou data HTTP."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+_guards: Dict[str, FetchGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(name: str, **options) -> FetchGuard:
+    """
+    Guarda da casa `name`, criada na primeira chamada. `options` (taxa,
+    tentativas...) valem também para uma guarda já criada — por exemplo pelo
+    cliente SportRadar do catálogo, sem opções —, então a configuração do
+    adaptador não depende da ordem de criação.
+    """
+    guard = _guards.get(name)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(name)
+            if guard is None:
+                return _guards.setdefault(name, FetchGuard(name, **options))
+    if options:
+        guard.configure(**options)
+    return guard
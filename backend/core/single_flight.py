@@ -0,0 +1,92 @@
+"""
+Coalescência de chamadas idênticas em andamento (single-flight).
+
+Quando várias threads (ou corrotinas) pedem a mesma chave ao mesmo tempo,
+só a primeira executa a função; as demais esperam e recebem o mesmo
+resultado — ou a mesma exceção. Assim que a chamada termina a chave é
+liberada: não há cache, apenas deduplicação do que está em voo. O resultado
+é compartilhado entre os chamadores e não deve ser alterado por eles.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Single-flight para código síncrono, seguro para múltiplas threads."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Executa `fn` uma única vez por chave em voo e devolve o resultado a todos."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Single-flight para corrotinas. As chamadas são agrupadas por event loop,
+    já que uma tarefa só pode ser aguardada no loop em que foi criada.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self.executed = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Aguarda a chamada em voo para a chave ou inicia uma com `factory()`."""
+        loop_key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(loop_key)
+        if task is None:
+            task = self._tasks[loop_key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda _: self._tasks.pop(loop_key, None))
+            self.executed += 1
+        else:
+            self.shared += 1
+        # shield: o cancelamento de um chamador não cancela a busca dos demais
+        return await asyncio.shield(task)
@@ -13,6 +13,14 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional, Union
 from contextlib import contextmanager
 
+try:
+    from backend.core.json_codec import dumps as json_dumps
+except ImportError:  # pragma: no cover - módulo usado fora da raiz do projeto
+    import json
+
+    def json_dumps(obj: Any) -> str:
+        return json.dumps(obj, default=str)
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +32,18 @@ logger = logging.getLogger(__name__)
 DATABASE_PATH = os.getenv("SQLITE_DATABASE_PATH", "data/surebets.db")
 DATABASE_TIMEOUT = int(os.getenv("DATABASE_TIMEOUT", "30"))
 
+
+def _column_values(data: Dict[str, Any]) -> List[Any]:
+    """
+    Valores na ordem das colunas; dicts e listas em colunas `*_json`
+    (ex.: stakes_json, selections_json) são serializados pelo codec JSON.
+    """
+    return [
+        json_dumps(value) if key.endswith('_json') and isinstance(value, (dict, list, tuple)) else value
+        for key, value in data.items()
+    ]
+
+
 class DatabaseManager:
     """
     Classe principal para gerenciamento de conexões SQLite.
@@ -240,7 +260,7 @@ class DatabaseManager:
         """
         columns = ', '.join(data.keys())
         placeholders = ', '.join(['?' for _ in data])
-        values = list(data.values())
+        values = _column_values(data)
 
         query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
 
@@ -267,7 +287,7 @@ class DatabaseManager:
             Número de registros atualizados
         """
         set_clause = ', '.join([f"{key} = ?" for key in data.keys()])
-        values = list(data.values())
+        values = _column_values(data)
 
         if isinstance(where_params, dict):
             values.extend(where_params.values())
@@ -1,5 +1,108 @@
-from typing import List, Dict, Any
-import itertools
+"""
+Motor de detecção de arbitragem (surebets).
+
+Em vez de gerar o produto cartesiano de todas as cotações de todas as casas
+(O(B^k) por evento), o detector agrupa as cotações por seleção, calcula a
+melhor odd de cada resultado em O(B·k) e só parte para uma busca com
+poda (branch-and-bound) ou para uma atribuição seleção -> casa quando o
+limite inferior indica que ainda existe arbitragem possível.
+"""
+
+import heapq
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+from backend.services.models import MarketBook
+
+# Cotação interna: (odd, probabilidade implícita, seleção original)
+_Quote = Tuple[float, float, Dict[str, Any]]
+
+
+class EffectiveOddsTransform:
+    """
+    Converte a odd publicada por uma casa na odd efetivamente recebida.
+
+    Os parâmetros de cada casa (faixa `min_odds`/`max_odds` e, para exchanges,
+    fator 1 - `commission_rate` sobre o ganho líquido) são pré-calculados uma
+    única vez, de modo que na ingestão cada cotação custa uma comparação e
+    uma multiplicação. Cotações fora da faixa da casa são descartadas antes de
+    chegarem ao detector.
+
+    `bookmaker_settings` segue o formato de `get_effective_settings()` dos
+    adaptadores; casas desconhecidas usam `default_settings`.
+    """
+
+    def __init__(self, bookmaker_settings: Dict[str, Dict[str, Any]], default_settings: Optional[Dict[str, Any]] = None):
+        self._default = self._compile(default_settings or {})
+        self._profiles: Dict[str, Tuple[float, float, float]] = {
+            name: self._compile(settings) for name, settings in bookmaker_settings.items()
+        }
+
+    @classmethod
+    def from_adapters(cls, adapters: Dict[str, Any]) -> 'EffectiveOddsTransform':
+        """Cria a transformação a partir de `get_effective_settings()` de cada adaptador."""
+        return cls({name: adapter.get_effective_settings() for name, adapter in adapters.items()})
+
+    @staticmethod
+    def _compile(settings: Dict[str, Any]) -> Tuple[float, float, float]:
+        """Reduz as configurações de uma casa a (odd mínima, odd máxima, fator sobre o ganho)."""
+        commission = float(settings.get('commission_rate') or 0.0)
+        if not settings.get('exchange_mode', 'commission_rate' in settings):
+            commission = 0.0
+        return (
+            float(settings.get('min_odds') or 1.0),
+            float(settings.get('max_odds') or float('inf')),
+            1.0 - commission
+        )
+
+    def profile(self, bookmaker: str) -> Tuple[float, float, float]:
+        return self._profiles.get(bookmaker, self._default)
+
+    def apply(self, bookmaker: str, odds: Optional[float]) -> Optional[float]:
+        """Odd efetiva de uma cotação, ou None se estiver fora dos limites da casa."""
+        if not odds:
+            return None
+        min_odds, max_odds, keep = self._profiles.get(bookmaker, self._default)
+        if odds < min_odds or odds > max_odds:
+            return None
+        return 1.0 + (odds - 1.0) * keep
+
+    def apply_selections(self, bookmaker: str, selections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Aplica a transformação às seleções de um mercado de uma única casa,
+        devolvendo cópias com 'odds' efetiva e 'raw_odds' publicada. Seleções
+        com odd fora dos limites são removidas.
+        """
+        transformed = []
+        for selection in selections:
+            effective = self.apply(bookmaker, selection.get('odds'))
+            if effective is not None:
+                transformed.append(dict(selection, odds=effective, raw_odds=selection.get('odds')))
+        return transformed
+
+    def apply_tensor(self, odds: np.ndarray, bookmakers: List[str]) -> np.ndarray:
+        """Versão vetorizada para o tensor de `SurebetDetector.build_odds_tensor` (casas no último eixo)."""
+        profiles = np.array([self.profile(b) for b in bookmakers], dtype=float).reshape(-1, 3)
+        min_odds, max_odds, keep = profiles[:, 0], profiles[:, 1], profiles[:, 2]
+        odds = np.asarray(odds, dtype=float)
+        in_range = (odds >= min_odds) & (odds <= max_odds)
+        return np.where(in_range, 1.0 + (odds - 1.0) * keep, np.nan)
+
+
+class _BookmakerFilter:
+    """Restringe as cotações a um conjunto de casas, encadeando outra transformação."""
+
+    def __init__(self, bookmakers: Iterable[str], transform: Optional[EffectiveOddsTransform] = None):
+        self.bookmakers = set(bookmakers)
+        self.transform = transform
+
+    def apply(self, bookmaker: str, odds: Optional[float]) -> Optional[float]:
+        if bookmaker not in self.bookmakers:
+            return None
+        if self.transform is not None:
+            return self.transform.apply(bookmaker, odds)
+        return odds
+
 
 class SurebetDetector:
     """
@@ -16,10 +119,12 @@ class SurebetDetector:
         return sum(1/o for o in odds)
 
     @staticmethod
-    def find_surebets(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def find_surebets(events: List[Dict[str, Any]],
+                      transform: Optional[EffectiveOddsTransform] = None) -> List[Dict[str, Any]]:
         """
         Recebe uma lista de eventos, cada um com odds de diferentes casas e seleções.
-        Retorna oportunidades de surebet encontradas.
+        Retorna todas as combinações lucrativas (uma odd por seleção, casas
+        distintas), ordenadas por lucro decrescente.
         events: [
             {
                 'event_id': str,
@@ -31,30 +136,576 @@ class SurebetDetector:
             },
             ...
         ]
+
+        Cotações com odd ausente ou <= 1 nunca participam de uma surebet, e
+        mercados com menos de duas seleções distintas são ignorados. Com
+        `transform`, o índice é calculado sobre as odds efetivas (comissão e
+        limites por casa), avaliadas uma vez por cotação.
         """
         surebets = []
         for event in events:
-            selections = event['selections']
-            # Agrupa seleções por nome (ex: Home, Draw, Away)
-            selection_names = list({s['name'] for s in selections})
-            # Gera todas as combinações possíveis, uma odd por seleção, de casas diferentes
-            combos = list(itertools.product(*[
-                [s for s in selections if s['name'] == sel] for sel in selection_names
-            ]))
-            for combo in combos:
-                # Garante que cada odd vem de uma casa diferente
-                bookmakers = [s['bookmaker'] for s in combo]
-                if len(set(bookmakers)) != len(bookmakers):
-                    continue
-                odds = [s['odds'] for s in combo]
-                arb_index = SurebetDetector.calculate_arbitrage(odds)
-                if arb_index < 1:
-                    profit_percent = (1-arb_index)*100
-                    surebets.append({
-                        'event_id': event['event_id'],
-                        'market': event['market'],
-                        'selections': combo,
-                        'arbitrage_index': arb_index,
-                        'profit_percent': profit_percent
-                    })
+            outcomes = SurebetDetector._event_outcomes(event, transform)
+            if outcomes is None:
+                continue
+            for arb_index, combo in SurebetDetector._search(outcomes):
+                surebets.append(SurebetDetector._build_surebet(event, combo, arb_index))
+        surebets.sort(key=lambda s: s['profit_percent'], reverse=True)
+        return surebets
+
+    @staticmethod
+    def find_best_surebets(events: List[Dict[str, Any]], top_n: Optional[int] = None,
+                           transform: Optional[EffectiveOddsTransform] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna no máximo uma surebet por evento/mercado: a de maior lucro.
+
+        Caso comum (melhores odds de cada seleção em casas distintas) é resolvido
+        em O(B·k). Quando a mesma casa tem a melhor odd em mais de uma seleção,
+        resolve uma atribuição seleção -> casa de custo mínimo (algoritmo
+        húngaro, O(k²·N)) sobre as `top_n` melhores cotações de cada seleção.
+        Com `top_n` igual ao número de seleções (padrão) a resposta é exata, já
+        que no máximo k-1 casas podem estar ocupadas pelas demais.
+        """
+        surebets = []
+        for event in events:
+            surebet = SurebetDetector._best_surebet(event, top_n, transform)
+            if surebet is not None:
+                surebets.append(surebet)
+        surebets.sort(key=lambda s: s['profit_percent'], reverse=True)
         return surebets
+
+    @staticmethod
+    def stream_surebets(events: Iterable[Any], min_profit: float = 0.0, limit: Optional[int] = None,
+                        sports: Optional[Iterable[str]] = None, bookmakers: Optional[Iterable[str]] = None,
+                        predicate: Optional[Callable[[Any], bool]] = None, top_n: Optional[int] = None,
+                        transform: Optional[EffectiveOddsTransform] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Versão em gerador de `find_best_surebets` com os filtros aplicados
+        durante a varredura, e não depois dela.
+
+        - `sports`/`predicate` descartam o mercado antes de agrupar cotações
+          (`sports` compara o campo `sport` do evento, sem caixa; quem lê do
+          snapshot já recebe só os feeds dos esportes pedidos);
+        - `bookmakers` restringe as cotações consideradas às casas informadas;
+        - `min_profit` vira um teto para o índice de arbitragem, e livros
+          (`MarketBook`) cujo limite inferior pelas melhores odds já não o
+          alcança são pulados sem materializar nenhuma cotação;
+        - com `limit`, um heap limitado guarda as `limit` melhores e o teto
+          sobe para o lucro da pior delas assim que o heap enche. Os
+          resultados saem em ordem de lucro decrescente ao fim da varredura.
+
+        Sem `limit`, cada surebet é produzida assim que encontrada, na ordem
+        dos eventos.
+        """
+        if limit is not None and limit <= 0:
+            return
+        if bookmakers:
+            transform = _BookmakerFilter(bookmakers, transform)
+        sports = {sport.strip().lower() for sport in sports} if sports else None
+        max_index = 1 - min_profit / 100
+
+        heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        for seq, event in enumerate(events):
+            if sports is not None and (SurebetDetector._event_sport(event) or '').strip().lower() not in sports:
+                continue
+            if predicate is not None and not predicate(event):
+                continue
+            if isinstance(event, MarketBook) and event.best_implied_sum() > max_index:
+                continue
+
+            surebet = SurebetDetector._best_surebet(event, top_n, transform, max_index)
+            if surebet is None:
+                continue
+            if limit is None:
+                yield surebet
+                continue
+
+            # Empates mantêm o que foi encontrado primeiro
+            entry = (surebet['profit_percent'], -seq, surebet)
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heappushpop(heap, entry)
+            if len(heap) == limit:
+                max_index = 1 - heap[0][0] / 100
+
+        for _, _, surebet in sorted(heap, key=lambda entry: entry[:2], reverse=True):
+            yield surebet
+
+    @staticmethod
+    def _best_surebet(event: Any, top_n: Optional[int] = None,
+                      transform: Optional[EffectiveOddsTransform] = None,
+                      max_index: float = 1.0) -> Optional[Dict[str, Any]]:
+        """Melhor surebet de um mercado com índice <= `max_index`, ou None."""
+        if isinstance(event, MarketBook):
+            # Livro em colunas: só agrupa tudo se houver conflito de casas
+            outcomes = None
+            best = event.best_quotes(transform)
+            if best is None:
+                return None
+        else:
+            outcomes = SurebetDetector._event_outcomes(event, transform)
+            if outcomes is None:
+                return None
+            best = [quotes[0] for quotes in outcomes]
+
+        arb_index = sum(q[1] for q in best)
+        if arb_index >= 1 or arb_index > max_index:
+            return None
+
+        bookmakers = {q[2]['bookmaker'] for q in best}
+        if len(bookmakers) == len(best):
+            return SurebetDetector._build_surebet(event, [q[2] for q in best], arb_index)
+
+        limit = top_n or len(best)
+        if outcomes is None:
+            outcomes = event.group_outcomes(transform, limit)
+        found = SurebetDetector._assign_bookmakers([quotes[:limit] for quotes in outcomes])
+        if found is None or found[0] >= 1 or found[0] > max_index:
+            return None
+        return SurebetDetector._build_surebet(event, found[1], found[0])
+
+    @staticmethod
+    def _event_sport(event: Any) -> Optional[str]:
+        if isinstance(event, MarketBook):
+            return event.info.get('sport') if event.info else None
+        return event.get('sport')
+
+    @staticmethod
+    def build_odds_tensor(events: List[Dict[str, Any]],
+                          transform: Optional[EffectiveOddsTransform] = None) -> Tuple[np.ndarray, Dict[str, List[str]]]:
+        """
+        Converte eventos no formato de `find_surebets` num tensor denso
+        (eventos x mercados x seleções x casas), com NaN nas cotações ausentes.
+        Com `transform`, o tensor já sai com as odds efetivas de cada casa.
+        Retorna o tensor e os rótulos de cada eixo ('events', 'markets',
+        'selections' por par evento/mercado em ordem de aparição, 'bookmakers').
+        """
+        event_ids: Dict[Any, int] = {}
+        markets: Dict[Any, int] = {}
+        bookmakers: Dict[str, int] = {}
+        selection_index: Dict[Tuple[int, int], Dict[str, int]] = {}
+        cells = []
+        for event in events:
+            e = event_ids.setdefault(event['event_id'], len(event_ids))
+            m = markets.setdefault(event['market'], len(markets))
+            names = selection_index.setdefault((e, m), {})
+            for s in event['selections']:
+                o = names.setdefault(s['name'], len(names))
+                b = bookmakers.setdefault(s['bookmaker'], len(bookmakers))
+                cells.append((e, m, o, b, s.get('odds')))
+
+        n_outcomes = max((len(names) for names in selection_index.values()), default=0)
+        tensor = np.full((len(event_ids), len(markets), n_outcomes, len(bookmakers)), np.nan)
+        for e, m, o, b, odds in cells:
+            current = tensor[e, m, o, b]
+            if odds and (np.isnan(current) or odds > current):
+                tensor[e, m, o, b] = odds
+
+        if transform is not None:
+            tensor = transform.apply_tensor(tensor, list(bookmakers))
+
+        labels = {
+            'events': list(event_ids),
+            'markets': list(markets),
+            'selections': {key: list(names) for key, names in selection_index.items()},
+            'bookmakers': list(bookmakers),
+        }
+        return tensor, labels
+
+    @staticmethod
+    def scan_odds_tensor(odds: np.ndarray, total_stake: float = 100.0,
+                         n_outcomes: Optional[np.ndarray] = None,
+                         distinct_bookmakers: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Varre milhares de mercados de uma vez sobre um tensor de odds
+        (eventos x mercados x seleções x casas), com NaN para cotação ausente.
+
+        `n_outcomes` (eventos x mercados) informa quantas seleções cada mercado
+        realmente tem; sem ele, seleções sem nenhuma cotação são tratadas como
+        preenchimento. Mercados com seleção real sem cotação ou com menos de
+        duas seleções ficam com `implied_sum` NaN.
+
+        O cálculo principal é vetorizado; apenas os mercados lucrativos cuja
+        melhor odd de duas seleções vem da mesma casa são refeitos pela
+        atribuição exata de `find_best_surebets` (desligável com
+        `distinct_bookmakers=False`).
+
+        Retorna arrays: 'best_odds' e 'best_bookmaker' (-1 se ausente) por
+        seleção, 'implied_sum', 'profit_percent' e 'is_surebet' por mercado e
+        'stakes' por seleção para o valor `total_stake`.
+        """
+        odds = np.asarray(odds, dtype=float)
+        valid = odds > 1  # NaN nunca é válido
+        filled = np.where(valid, odds, 0.0)
+        best_bookmaker = filled.argmax(axis=-1)
+        best_odds = np.take_along_axis(filled, best_bookmaker[..., None], axis=-1)[..., 0]
+        quoted = valid.any(axis=-1)
+
+        if n_outcomes is None:
+            present = quoted
+        else:
+            present = np.arange(odds.shape[-2]) < np.asarray(n_outcomes)[..., None]
+
+        best_odds = np.where(quoted & present, best_odds, np.nan)
+        best_bookmaker = np.where(quoted & present, best_bookmaker, -1)
+        usable = (present.sum(axis=-1) >= 2) & ~(present & ~quoted).any(axis=-1)
+        implied_sum = np.where(usable, np.nansum(1.0 / best_odds, axis=-1), np.nan)
+
+        if distinct_bookmakers and odds.size:
+            # Marca mercados em que duas seleções presentes dividem a mesma casa
+            slots = np.where(present, best_bookmaker, -1 - np.arange(odds.shape[-2]))
+            ordered = np.sort(slots, axis=-1)
+            conflict = (np.diff(ordered, axis=-1) == 0).any(axis=-1) & (implied_sum < 1)
+            for e, m in np.argwhere(conflict):
+                SurebetDetector._reassign_tensor_market(
+                    odds[e, m], present[e, m], best_odds[e, m], best_bookmaker[e, m], implied_sum, (e, m)
+                )
+
+        with np.errstate(invalid='ignore'):
+            is_surebet = implied_sum < 1
+            profit_percent = (1.0 - implied_sum) * 100.0
+            stakes = total_stake / best_odds / implied_sum[..., None]
+
+        return {
+            'best_odds': best_odds,
+            'best_bookmaker': best_bookmaker,
+            'implied_sum': implied_sum,
+            'profit_percent': profit_percent,
+            'is_surebet': is_surebet,
+            'stakes': stakes,
+        }
+
+    @staticmethod
+    def _reassign_tensor_market(market_odds: np.ndarray, present: np.ndarray, best_odds: np.ndarray,
+                                best_bookmaker: np.ndarray, implied_sum: np.ndarray, key: Tuple[int, int]) -> None:
+        """Refaz um mercado do tensor com casas distintas, atualizando os arrays no lugar."""
+        rows = np.flatnonzero(present)
+        outcomes = []
+        for o in rows:
+            quotes = [
+                (float(x), 1.0 / float(x), {'name': int(o), 'odds': float(x), 'bookmaker': int(b)})
+                for b, x in enumerate(market_odds[o]) if x > 1
+            ]
+            quotes.sort(key=lambda q: q[0], reverse=True)
+            outcomes.append(quotes[:len(rows)])
+
+        found = SurebetDetector._assign_bookmakers(outcomes)
+        if found is None:
+            implied_sum[key] = np.nan
+            return
+        implied_sum[key] = found[0]
+        for selection in found[1]:
+            best_odds[selection['name']] = selection['odds']
+            best_bookmaker[selection['name']] = selection['bookmaker']
+
+    @staticmethod
+    def _event_outcomes(event: Any, transform: Optional[EffectiveOddsTransform] = None) -> Optional[List[List[_Quote]]]:
+        """Agrupa as cotações de um mercado, seja dict de seleções ou `MarketBook`."""
+        if isinstance(event, MarketBook):
+            # Livros sem arbitragem possível nem chegam a criar objetos Quote
+            if event.best_implied_sum() >= 1:
+                return None
+            return event.group_outcomes(transform)
+        return SurebetDetector._group_outcomes(event['selections'], transform)
+
+    @staticmethod
+    def _group_outcomes(selections: List[Dict[str, Any]],
+                        transform: Optional[EffectiveOddsTransform] = None) -> Optional[List[List[_Quote]]]:
+        """
+        Agrupa as cotações válidas por nome de seleção, na ordem de aparição,
+        com cada grupo ordenado da maior para a menor odd (efetiva, se houver
+        `transform`). Retorna None se o mercado não tiver ao menos duas
+        seleções cotadas.
+        """
+        groups: Dict[str, List[_Quote]] = {}
+        names = []
+        for s in selections:
+            name = s['name']
+            if name not in groups:
+                groups[name] = []
+                names.append(name)
+            odds = s.get('odds')
+            if transform is not None:
+                odds = transform.apply(s['bookmaker'], odds)
+            if odds and odds > 1:
+                groups[name].append((odds, 1 / odds, s))
+
+        if len(names) < 2 or any(not groups[name] for name in names):
+            return None
+        outcomes = [groups[name] for name in names]
+        for quotes in outcomes:
+            quotes.sort(key=lambda q: q[0], reverse=True)
+        return outcomes
+
+    @staticmethod
+    def _search(outcomes: List[List[_Quote]]) -> List[Tuple[float, List[Dict[str, Any]]]]:
+        """
+        Busca em profundidade com poda sobre as cotações de cada seleção.
+
+        O limite inferior de um ramo é a soma parcial mais a soma das melhores
+        probabilidades implícitas das seleções restantes; como as cotações estão
+        ordenadas, ao estourar o limite o laço pode ser interrompido. O custo é
+        proporcional ao número de combinações lucrativas, não a B^k.
+        """
+        k = len(outcomes)
+        suffix = [0.0] * (k + 1)
+        for i in range(k - 1, -1, -1):
+            suffix[i] = suffix[i + 1] + outcomes[i][0][1]
+        if suffix[0] >= 1:
+            return []
+
+        results: List[Tuple[float, List[Dict[str, Any]]]] = []
+        chosen: List[Dict[str, Any]] = []
+        used = set()
+
+        def visit(i: int, partial: float) -> None:
+            if i == k:
+                results.append((partial, list(chosen)))
+                return
+            rest = suffix[i + 1]
+            for odds, inv, selection in outcomes[i]:
+                total = partial + inv
+                if total + rest >= 1:
+                    break
+                bookmaker = selection['bookmaker']
+                if bookmaker in used:
+                    continue
+                used.add(bookmaker)
+                chosen.append(selection)
+                visit(i + 1, total)
+                chosen.pop()
+                used.discard(bookmaker)
+
+        visit(0, 0.0)
+        return results
+
+    @staticmethod
+    def _assign_bookmakers(outcomes: List[List[_Quote]]) -> Optional[Tuple[float, List[Dict[str, Any]]]]:
+        """
+        Escolhe uma casa distinta por seleção minimizando a soma das
+        probabilidades implícitas (problema de atribuição retangular k x B,
+        resolvido pelo algoritmo húngaro com potenciais).
+        Retorna (índice, seleções) ou None se não houver casas suficientes.
+        """
+        columns: Dict[str, int] = {}
+        for quotes in outcomes:
+            for q in quotes:
+                columns.setdefault(q[2]['bookmaker'], len(columns))
+        n, m = len(outcomes), len(columns)
+        if m < n:
+            return None
+
+        # Custo "infinito" finito para manter a aritmética dos potenciais estável
+        missing = float(n + 1)
+        cost = [[missing] * m for _ in range(n)]
+        picks: List[List[Optional[Dict[str, Any]]]] = [[None] * m for _ in range(n)]
+        for i, quotes in enumerate(outcomes):
+            for odds, inv, selection in quotes:
+                j = columns[selection['bookmaker']]
+                if inv < cost[i][j]:
+                    cost[i][j] = inv
+                    picks[i][j] = selection
+
+        inf = float('inf')
+        u = [0.0] * (n + 1)
+        v = [0.0] * (m + 1)
+        p = [0] * (m + 1)
+        way = [0] * (m + 1)
+        for i in range(1, n + 1):
+            p[0] = i
+            j0 = 0
+            minv = [inf] * (m + 1)
+            used = [False] * (m + 1)
+            while True:
+                used[j0] = True
+                i0 = p[j0]
+                row = cost[i0 - 1]
+                delta = inf
+                j1 = 0
+                for j in range(1, m + 1):
+                    if not used[j]:
+                        cur = row[j - 1] - u[i0] - v[j]
+                        if cur < minv[j]:
+                            minv[j] = cur
+                            way[j] = j0
+                        if minv[j] < delta:
+                            delta = minv[j]
+                            j1 = j
+                for j in range(m + 1):
+                    if used[j]:
+                        u[p[j]] += delta
+                        v[j] -= delta
+                    else:
+                        minv[j] -= delta
+                j0 = j1
+                if p[j0] == 0:
+                    break
+            while j0:
+                j1 = way[j0]
+                p[j0] = p[j1]
+                j0 = j1
+
+        combo: List[Optional[Dict[str, Any]]] = [None] * n
+        arb_index = 0.0
+        for j in range(1, m + 1):
+            if p[j]:
+                combo[p[j] - 1] = picks[p[j] - 1][j - 1]
+                arb_index += cost[p[j] - 1][j - 1]
+        if any(selection is None for selection in combo):
+            return None
+        return arb_index, combo
+
+    @staticmethod
+    def _build_surebet(event: Dict[str, Any], combo: List[Dict[str, Any]], arb_index: float) -> Dict[str, Any]:
+        return {
+            'event_id': event['event_id'],
+            'market': event['market'],
+            'selections': tuple(combo),
+            'arbitrage_index': arb_index,
+            'profit_percent': (1 - arb_index) * 100
+        }
+
+
+class StakeCalculator:
+    """
+    Calcula stakes de lucro igual para muitas oportunidades de uma vez.
+
+    Trabalha sobre matrizes (oportunidades x seleções), com NaN nas seleções
+    inexistentes, e considera comissão de exchange sobre o ganho líquido,
+    limites mínimo/máximo de aposta por casa, teto de banca e arredondamento
+    para a unidade monetária. O lucro devolvido é o garantido após o
+    arredondamento.
+
+    `bookmaker_settings` mapeia casa -> {'commission_rate', 'min_stake',
+    'max_stake'} e é usado por `calculate_opportunities`.
+    """
+
+    def __init__(self, rounding: float = 0.01, bookmaker_settings: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.rounding = rounding
+        self.bookmaker_settings = bookmaker_settings or {}
+
+    @classmethod
+    def from_adapters(cls, adapters: Dict[str, Any], rounding: float = 0.01) -> 'StakeCalculator':
+        """Cria a calculadora a partir de `get_effective_settings()` de cada adaptador."""
+        bookmaker_settings = {}
+        for name, adapter in adapters.items():
+            settings = adapter.get_effective_settings()
+            bookmaker_settings[name] = {
+                key: settings[key] for key in ('commission_rate', 'min_stake', 'max_stake') if key in settings
+            }
+        return cls(rounding=rounding, bookmaker_settings=bookmaker_settings)
+
+    def calculate(self, odds: np.ndarray, total_stake: Any = 100.0, min_stakes: Optional[np.ndarray] = None,
+                  max_stakes: Optional[np.ndarray] = None, commission: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Calcula stakes para a matriz `odds` (N x k).
+
+        `total_stake` (escalar ou N) é a banca disponível por oportunidade; os
+        limites e a comissão aceitam qualquer formato que faça broadcast para
+        N x k (0 ou NaN = sem limite). Se o máximo de alguma casa obrigar, a
+        banca é reduzida proporcionalmente; se o mínimo não couber na banca a
+        oportunidade é marcada como inviável e recebe stakes NaN.
+
+        Retorna 'stakes', 'effective_odds', 'total_stake', 'guaranteed_return',
+        'profit', 'profit_percent', 'feasible' e 'is_surebet'.
+        """
+        odds = np.atleast_2d(np.asarray(odds, dtype=float))
+        shape = odds.shape
+        commission = np.broadcast_to(np.nan_to_num(np.asarray(0.0 if commission is None else commission, dtype=float)), shape)
+        effective = 1.0 + (odds - 1.0) * (1.0 - commission)
+        present = effective > 1  # NaN nunca é válido
+
+        inverse = np.where(present, 1.0 / np.where(present, effective, 1.0), 0.0)
+        implied_sum = inverse.sum(axis=1)
+        invalid = ~np.isnan(odds) & ~present
+        usable = (present.sum(axis=1) >= 2) & ~invalid.any(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weights = inverse / implied_sum[:, None]
+
+            upper = np.full(shape[0], np.inf)
+            if max_stakes is not None:
+                limit = np.broadcast_to(np.asarray(max_stakes, dtype=float), shape)
+                bounded = present & (limit > 0)
+                upper = np.where(bounded, limit / weights, np.inf).min(axis=1)
+            lower = np.zeros(shape[0])
+            min_limit = np.zeros(shape)
+            if min_stakes is not None:
+                min_limit = np.nan_to_num(np.broadcast_to(np.asarray(min_stakes, dtype=float), shape))
+                lower = np.where(present & (min_limit > 0), min_limit / weights, 0.0).max(axis=1)
+
+        bankroll = np.minimum(np.broadcast_to(np.asarray(total_stake, dtype=float), shape[:1]), upper)
+        feasible = usable & (bankroll >= lower) & (bankroll > 0)
+
+        stakes = bankroll[:, None] * weights
+        if self.rounding:
+            unit = self.rounding
+            stakes = np.round(stakes / unit) * unit
+            stakes = np.maximum(stakes, np.ceil(min_limit / unit - 1e-9) * unit)
+            if max_stakes is not None:
+                cap = np.broadcast_to(np.asarray(max_stakes, dtype=float), shape)
+                stakes = np.where(cap > 0, np.minimum(stakes, np.floor(cap / unit + 1e-9) * unit), stakes)
+        stakes = np.where(present & feasible[:, None], stakes, np.nan)
+
+        returns = np.where(present, stakes * effective, np.inf)
+        staked = np.nansum(stakes, axis=1)
+        guaranteed_return = np.where(feasible, returns.min(axis=1), np.nan)
+        profit = guaranteed_return - staked
+        with np.errstate(invalid='ignore', divide='ignore'):
+            profit_percent = profit / staked * 100.0
+
+        return {
+            'stakes': stakes,
+            'effective_odds': np.where(present, effective, np.nan),
+            'total_stake': np.where(feasible, staked, np.nan),
+            'guaranteed_return': guaranteed_return,
+            'profit': profit,
+            'profit_percent': profit_percent,
+            'feasible': feasible,
+            'is_surebet': feasible & (implied_sum < 1),
+        }
+
+    def calculate_opportunities(self, opportunities: List[Dict[str, Any]], total_stake: float = 100.0) -> List[Optional[Dict[str, Any]]]:
+        """
+        Calcula stakes para surebets no formato de `SurebetDetector` e devolve,
+        para cada uma, o dicionário gravado em `arbitrage_opportunities.stakes_json`
+        ({'stakes': [{'bookmaker', 'selection', 'amount', 'percentage'}], ...})
+        ou None quando os limites das casas tornam a aposta inviável.
+        """
+        if not opportunities:
+            return []
+        k = max(len(op['selections']) for op in opportunities)
+        shape = (len(opportunities), k)
+        odds = np.full(shape, np.nan)
+        commission = np.zeros(shape)
+        min_stakes = np.zeros(shape)
+        max_stakes = np.zeros(shape)
+        for i, op in enumerate(opportunities):
+            for j, selection in enumerate(op['selections']):
+                settings = self.bookmaker_settings.get(selection['bookmaker'], {})
+                odds[i, j] = selection['odds']
+                commission[i, j] = settings.get('commission_rate', 0.0)
+                min_stakes[i, j] = settings.get('min_stake', 0.0)
+                max_stakes[i, j] = settings.get('max_stake', 0.0)
+
+        result = self.calculate(odds, total_stake, min_stakes, max_stakes, commission)
+        allocations: List[Optional[Dict[str, Any]]] = []
+        for i, op in enumerate(opportunities):
+            if not result['feasible'][i]:
+                allocations.append(None)
+                continue
+            staked = float(result['total_stake'][i])
+            allocations.append({
+                'stakes': [
+                    {
+                        'bookmaker': selection['bookmaker'],
+                        'selection': selection['name'],
+                        'amount': round(float(result['stakes'][i, j]), 2),
+                        'percentage': round(float(result['stakes'][i, j]) / staked * 100, 2)
+                    }
+                    for j, selection in enumerate(op['selections'])
+                ],
+                'total_stake': round(staked, 2),
+                'guaranteed_profit': round(float(result['profit'][i]), 2),
+                'profit_percent': round(float(result['profit_percent'][i]), 4)
+            })
+        return allocations
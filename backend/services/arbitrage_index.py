@@ -0,0 +1,320 @@
+"""
+Índice incremental de arbitragem.
+
+Mantém, para cada mercado (evento + mercado), um heap de melhores odds por
+seleção e a soma corrente das probabilidades implícitas. Cada atualização de
+odd reavalia apenas o mercado tocado, em O(log B), e emite eventos de surebet
+aberta, fechada ou alterada.
+
+`FeedIndexer` alimenta o índice com os deltas da coleta em segundo plano
+(`IngestScheduler.subscribe`); os índices globais, um por status, vêm de
+`backend.services.ingest.get_arbitrage_index()` e são servidos em
+`/api/surebets/<status>`.
+"""
+
+import heapq
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.services.arbitrage import EffectiveOddsTransform, SurebetDetector
+
+logger = logging.getLogger(__name__)
+
+# Tipos de evento emitidos pelo índice
+SUREBET_OPENED = 'opened'
+SUREBET_CLOSED = 'closed'
+SUREBET_CHANGED = 'changed'
+
+# A cada N atualizações a soma incremental é recalculada para evitar deriva numérica
+_RESYNC_INTERVAL = 1024
+
+
+class _OutcomeBook:
+    """Cotações de uma seleção: odd atual por casa e max-heap com remoção preguiçosa."""
+
+    __slots__ = ('quotes', 'heap')
+
+    def __init__(self):
+        self.quotes: Dict[str, float] = {}
+        self.heap: List[Tuple[float, str]] = []
+
+    def set(self, bookmaker: str, odds: Optional[float]) -> None:
+        if odds is None or odds <= 1:
+            self.quotes.pop(bookmaker, None)
+        else:
+            self.quotes[bookmaker] = odds
+            heapq.heappush(self.heap, (-odds, bookmaker))
+        if len(self.heap) > 2 * len(self.quotes) + 8:
+            self.heap = [(-o, b) for b, o in self.quotes.items()]
+            heapq.heapify(self.heap)
+
+    def best(self) -> Optional[Tuple[float, str]]:
+        """Melhor (odd, casa) válida, descartando entradas obsoletas do topo do heap."""
+        heap = self.heap
+        while heap:
+            neg_odds, bookmaker = heap[0]
+            if self.quotes.get(bookmaker) == -neg_odds:
+                return -neg_odds, bookmaker
+            heapq.heappop(heap)
+        return None
+
+    def top(self, n: int) -> List[Tuple[float, str]]:
+        return heapq.nlargest(n, ((o, b) for b, o in self.quotes.items()))
+
+
+class MarketState:
+    """Estado de um mercado: livros por seleção, soma implícita e surebet corrente."""
+
+    __slots__ = ('event_id', 'market', 'outcomes', 'best_inverse', 'implied_sum',
+                 'expected_outcomes', 'surebet', 'updates')
+
+    def __init__(self, event_id: Any, market: str, expected_outcomes: Optional[int] = None):
+        self.event_id = event_id
+        self.market = market
+        self.outcomes: Dict[str, _OutcomeBook] = {}
+        self.best_inverse: Dict[str, float] = {}
+        self.implied_sum = 0.0
+        self.expected_outcomes = expected_outcomes
+        self.surebet: Optional[Dict[str, Any]] = None
+        self.updates = 0
+
+    def best_odds(self) -> Dict[str, Tuple[float, str]]:
+        """Melhor (odd, casa) de cada seleção com cotação válida."""
+        result = {}
+        for name, book in self.outcomes.items():
+            best = book.best()
+            if best is not None:
+                result[name] = best
+        return result
+
+    def is_complete(self) -> bool:
+        """Todas as seleções esperadas têm ao menos uma cotação."""
+        quoted = len(self.best_inverse)
+        required = self.expected_outcomes or len(self.outcomes)
+        return quoted >= 2 and quoted >= required and quoted == len(self.outcomes)
+
+
+class ArbitrageIndex:
+    """
+    Índice stateful de surebets alimentado por deltas de odds.
+
+    `update()` aplica uma cotação (odd None ou <= 1 remove a cotação) e
+    devolve a lista de eventos emitidos para aquele mercado. Ouvintes
+    registrados com `subscribe()` recebem os mesmos eventos.
+
+    `outcomes_per_market` informa quantas seleções cada tipo de mercado tem
+    (ex.: {'1X2': 3}); sem isso, o mercado é avaliado com as seleções já vistas.
+
+    Com `transform`, cada odd recebida é convertida uma única vez para a odd
+    efetiva da casa (comissão e limites) antes de entrar nos heaps; as
+    surebets emitidas trazem então odds efetivas.
+    """
+
+    def __init__(self, min_profit: float = 0.0, outcomes_per_market: Optional[Dict[str, int]] = None,
+                 transform: Optional[EffectiveOddsTransform] = None):
+        self.min_profit = min_profit
+        self.outcomes_per_market = outcomes_per_market or {}
+        self.transform = transform
+        self._markets: Dict[Tuple[Any, str], MarketState] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.RLock()
+
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Registra um callback chamado para cada evento de surebet."""
+        self._listeners.append(listener)
+
+    def update(self, event_id: Any, market: str, bookmaker: str, selection: str,
+               odds: Optional[float]) -> List[Dict[str, Any]]:
+        """Aplica uma odd e reavalia somente o mercado afetado."""
+        if self.transform is not None:
+            odds = self.transform.apply(bookmaker, odds)
+        with self._lock:
+            state = self._get_market(event_id, market)
+            book = state.outcomes.get(selection)
+            if book is None:
+                book = state.outcomes[selection] = _OutcomeBook()
+
+            book.set(bookmaker, odds)
+            self._refresh_outcome(state, selection, book)
+            emitted = self._evaluate(state)
+
+        for event in emitted:
+            self._notify(event)
+        return emitted
+
+    def ingest(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Aplica em lote eventos no formato de `SurebetDetector.find_surebets`."""
+        emitted = []
+        for event in events:
+            for s in event['selections']:
+                emitted.extend(self.update(event['event_id'], event['market'], s['bookmaker'], s['name'], s.get('odds')))
+        return emitted
+
+    def remove_market(self, event_id: Any, market: str) -> List[Dict[str, Any]]:
+        """Descarta um mercado (ex.: evento encerrado), fechando a surebet aberta."""
+        with self._lock:
+            state = self._markets.pop((event_id, market), None)
+            if state is None or state.surebet is None:
+                return []
+            event = dict(state.surebet, type=SUREBET_CLOSED)
+        self._notify(event)
+        return [event]
+
+    def get_surebet(self, event_id: Any, market: str) -> Optional[Dict[str, Any]]:
+        state = self._markets.get((event_id, market))
+        return state.surebet if state else None
+
+    def get_market(self, event_id: Any, market: str) -> Optional[MarketState]:
+        return self._markets.get((event_id, market))
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Trava do índice, para leituras consistentes de vários mercados de uma vez."""
+        return self._lock
+
+    def markets(self) -> List[MarketState]:
+        with self._lock:
+            return list(self._markets.values())
+
+    def surebets(self) -> List[Dict[str, Any]]:
+        """Surebets abertas, ordenadas por lucro decrescente."""
+        with self._lock:
+            opened = [state.surebet for state in self._markets.values() if state.surebet]
+        return sorted(opened, key=lambda s: s['profit_percent'], reverse=True)
+
+    def _get_market(self, event_id: Any, market: str) -> MarketState:
+        key = (event_id, market)
+        state = self._markets.get(key)
+        if state is None:
+            state = self._markets[key] = MarketState(event_id, market, self.outcomes_per_market.get(market))
+        return state
+
+    @staticmethod
+    def _refresh_outcome(state: MarketState, selection: str, book: _OutcomeBook) -> None:
+        """Atualiza a melhor probabilidade implícita da seleção e a soma do mercado."""
+        old = state.best_inverse.pop(selection, 0.0)
+        best = book.best()
+        new = 1 / best[0] if best else 0.0
+        if best:
+            state.best_inverse[selection] = new
+
+        state.updates += 1
+        if state.updates % _RESYNC_INTERVAL == 0:
+            state.implied_sum = sum(state.best_inverse.values())
+        else:
+            state.implied_sum += new - old
+
+    def _evaluate(self, state: MarketState) -> List[Dict[str, Any]]:
+        current = self._current_surebet(state)
+        previous = state.surebet
+        state.surebet = current
+
+        if current is None:
+            return [dict(previous, type=SUREBET_CLOSED)] if previous else []
+        if previous is None:
+            return [dict(current, type=SUREBET_OPENED)]
+        if (current['selections'] != previous['selections']
+                or current['arbitrage_index'] != previous['arbitrage_index']):
+            return [dict(current, type=SUREBET_CHANGED)]
+        return []
+
+    def _current_surebet(self, state: MarketState) -> Optional[Dict[str, Any]]:
+        if not state.is_complete() or state.implied_sum >= 1:
+            return None
+
+        best = state.best_odds()
+        names = list(best)
+        if len({bookmaker for _, bookmaker in best.values()}) == len(best):
+            arb_index = state.implied_sum
+            selections = [{'name': n, 'odds': best[n][0], 'bookmaker': best[n][1]} for n in names]
+        else:
+            # Melhores odds na mesma casa: atribuição exata sobre as k melhores cotações
+            outcomes = [
+                [(o, 1 / o, {'name': n, 'odds': o, 'bookmaker': b}) for o, b in state.outcomes[n].top(len(names))]
+                for n in names
+            ]
+            found = SurebetDetector._assign_bookmakers(outcomes)
+            if found is None:
+                return None
+            arb_index, selections = found
+
+        profit_percent = (1 - arb_index) * 100
+        if arb_index >= 1 or profit_percent < self.min_profit:
+            return None
+        return {
+            'event_id': state.event_id,
+            'market': state.market,
+            'selections': tuple(selections),
+            'arbitrage_index': arb_index,
+            'profit_percent': profit_percent
+        }
+
+    def _notify(self, event: Dict[str, Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Erro no ouvinte do índice de arbitragem: {e}")
+
+
+# (evento, mercado, casa, seleção) de uma cotação no índice
+QuoteKey = Tuple[Any, str, str, str]
+
+
+class FeedIndexer:
+    """
+    Ouvinte de `IngestScheduler.subscribe()` que mantém um `ArbitrageIndex`
+    a partir dos deltas da coleta: só os eventos alterados ou removidos de um
+    feed são reaplicados, e só os mercados tocados por eles são reavaliados.
+
+    Os eventos estão no formato dos adaptadores; no índice, o evento é
+    `esporte:nome`, como em `MarketBook.from_adapter_events`, para que as
+    casas do mesmo jogo caiam no mesmo mercado. Com `status`, os feeds de
+    outros status são ignorados.
+    """
+
+    def __init__(self, index: ArbitrageIndex, status: Optional[str] = None):
+        self.index = index
+        self.status = status
+        # (feed, id do evento no adaptador) -> cotações publicadas por ele no índice
+        self._published: Dict[Tuple[Any, Any], Dict[QuoteKey, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, key: Tuple[str, str, str], delta: Any) -> None:
+        bookmaker, _, status = key
+        if self.status is not None and status != self.status:
+            return
+        with self._lock:
+            for event in delta.removed:
+                self._apply(key, event, {})
+            for event in delta.changed:
+                self._apply(key, event, self._quotes(event, bookmaker))
+
+    @staticmethod
+    def _quotes(event: Dict[str, Any], bookmaker: str) -> Dict[QuoteKey, Optional[float]]:
+        event_id = f"{event.get('sport', '')}:{event.get('name', '')}"
+        quotes = {}
+        for market in event.get('markets', []):
+            market_type = market.get('type') or market.get('name', '')
+            for s in market.get('selections', []):
+                quotes[(event_id, market_type, s.get('bookmaker') or bookmaker, s['name'])] = s.get('odds')
+        return quotes
+
+    def _apply(self, key: Tuple[str, str, str], event: Dict[str, Any],
+               quotes: Dict[QuoteKey, Optional[float]]) -> None:
+        source = (key, event.get('id'))
+        previous = self._published.pop(source, {})
+        for quote, odds in quotes.items():
+            if quote not in previous or previous[quote] != odds:
+                self.index.update(*quote, odds)
+        stale = [quote for quote in previous if quote not in quotes]
+        for quote in stale:
+            self.index.update(*quote, None)
+        # Mercados sem nenhuma cotação saem do índice
+        for event_id, market in {(quote[0], quote[1]) for quote in stale}:
+            state = self.index.get_market(event_id, market)
+            if state is not None and not any(book.quotes for book in state.outcomes.values()):
+                self.index.remove_market(event_id, market)
+        if quotes:
+            self._published[source] = quotes
@@ -0,0 +1,299 @@
+"""
+Catálogo de esportes, categorias e torneios da SportRadar.
+
+A árvore de esportes (`config_tree_mini`) é a mesma para todas as casas e
+muda raramente, mas cada adaptador a baixava de novo a cada coleta só para
+descobrir o ID de um esporte. O `SportCatalog` mantém essa árvore num cache
+único:
+
+- as consultas (`sport_id`, `category_id`, `tournament_id`) são buscas em
+  dicionários em memória, sem rede;
+- a árvore normalizada é gravada em `CATALOG_CACHE_PATH` (JSON) e carregada
+  de lá na inicialização, então um processo novo não depende da SportRadar
+  para resolver IDs;
+- a árvore é baixada numa thread em segundo plano, quando não há nada em
+  cache ou quando fica mais velha que `CATALOG_REFRESH_INTERVAL`; as
+  consultas nunca esperam a rede e, até o primeiro download, respondem como
+  se o esporte fosse desconhecido. Quem precisa do catálogo completo (a
+  coleta, antes de resolver o ID de um esporte) usa `ensure_loaded()`, que
+  aguarda o download. Falhas são repetidas no máximo a cada
+  `CATALOG_RETRY_INTERVAL` segundos.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config import settings
+from backend.core.json_codec import dumps_bytes, loads
+
+logger = logging.getLogger(__name__)
+
+# Versão do formato gravado em disco
+CACHE_VERSION = 1
+
+
+def _entries(node: Dict[str, Any], keys: Iterable[str]) -> List[Dict[str, Any]]:
+    for key in keys:
+        items = node.get(key)
+        if isinstance(items, list):
+            return [item for item in items if isinstance(item, dict)]
+    return []
+
+
+def _node(item: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    node_id = item.get('id', item.get('_id'))
+    name = item.get('name')
+    if node_id is None or not name:
+        return None
+    return {'id': str(node_id), 'name': str(name)}
+
+
+def parse_sports_tree(data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Normaliza a resposta de `get_sports_ids()` para
+    `[{id, name, categories: [{id, name, tournaments: [{id, name}]}]}]`.
+    Categorias e torneios só existem quando a SportRadar os inclui na árvore.
+    """
+    try:
+        raw_sports = data['doc'][0]['data']
+    except (KeyError, IndexError, TypeError):
+        return []
+    if isinstance(raw_sports, dict):
+        raw_sports = _entries(raw_sports, ('sports', 'data'))
+    sports = []
+    for raw_sport in raw_sports or []:
+        if not isinstance(raw_sport, dict):
+            continue
+        sport = _node(raw_sport)
+        if sport is None:
+            continue
+        sport['categories'] = []
+        for raw_category in _entries(raw_sport, ('realcategories', 'categories')):
+            category = _node(raw_category)
+            if category is None:
+                continue
+            category['tournaments'] = [
+                tournament for tournament in map(
+                    _node, _entries(raw_category, ('uniquetournaments', 'tournaments'))
+                ) if tournament is not None
+            ]
+            sport['categories'].append(category)
+        sports.append(sport)
+    return sports
+
+
+def _match(names: Dict[str, str], name: str) -> Optional[str]:
+    """ID pelo nome exato (sem caixa) ou, senão, pelo primeiro nome que o contém."""
+    key = name.strip().lower()
+    if key in names:
+        return names[key]
+    for candidate, node_id in names.items():
+        if key in candidate:
+            return node_id
+    return None
+
+
+class CatalogIndex:
+    """Índices imutáveis de uma versão da árvore (trocados inteiros a cada atualização)."""
+
+    __slots__ = ('tree', 'sports', 'categories', 'tournaments', 'category_tournaments')
+
+    def __init__(self, tree: List[Dict[str, Any]]):
+        self.tree = tree
+        self.sports: Dict[str, str] = {}
+        self.categories: Dict[str, Dict[str, str]] = {}
+        self.tournaments: Dict[str, Dict[str, str]] = {}
+        self.category_tournaments: Dict[str, Dict[str, str]] = {}
+        for sport in tree:
+            self.sports.setdefault(sport['name'].lower(), sport['id'])
+            categories = self.categories.setdefault(sport['id'], {})
+            tournaments = self.tournaments.setdefault(sport['id'], {})
+            for category in sport.get('categories', []):
+                categories.setdefault(category['name'].lower(), category['id'])
+                by_category = self.category_tournaments.setdefault(category['id'], {})
+                for tournament in category.get('tournaments', []):
+                    tournaments.setdefault(tournament['name'].lower(), tournament['id'])
+                    by_category.setdefault(tournament['name'].lower(), tournament['id'])
+
+    def __bool__(self) -> bool:
+        return bool(self.sports)
+
+
+class SportCatalog:
+    """Resolve IDs da SportRadar a partir de um cache em memória e em disco."""
+
+    def __init__(self, fetch: Callable[[], Optional[Dict[str, Any]]], path: Optional[str] = None,
+                 refresh_interval: Optional[float] = None, retry_interval: Optional[float] = None,
+                 clock: Callable[[], float] = time.time):
+        self._fetch = fetch
+        # Caminho vazio desativa o cache em disco
+        self.path = settings.CATALOG_CACHE_PATH if path is None else path
+        self.refresh_interval = settings.CATALOG_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.retry_interval = settings.CATALOG_RETRY_INTERVAL if retry_interval is None else retry_interval
+        self.clock = clock
+        self.fetched_at = 0.0
+        self.downloads = 0
+        self._index: Optional[CatalogIndex] = None
+        self._failed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+
+    # Cache em disco
+
+    def _load_file(self) -> None:
+        # Chamado com `_lock` adquirido
+        tree, fetched_at = [], 0.0
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'rb') as f:
+                    cached = loads(f.read())
+                if cached.get('version') == CACHE_VERSION:
+                    tree, fetched_at = cached.get('sports') or [], float(cached.get('fetched_at') or 0)
+                    logger.info(f"Catálogo de esportes carregado de {self.path} ({len(tree)} esportes)")
+            except Exception as e:
+                logger.warning(f"Cache do catálogo de esportes ilegível em {self.path}: {e}")
+                tree, fetched_at = [], 0.0
+        self._index = CatalogIndex(tree)
+        self.fetched_at = fetched_at
+
+    def _save_file(self, tree: List[Dict[str, Any]], fetched_at: float) -> None:
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(dumps_bytes({'version': CACHE_VERSION, 'fetched_at': fetched_at, 'sports': tree}))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o catálogo de esportes em {self.path}: {e}")
+
+    # Atualização
+
+    def _due(self) -> bool:
+        now = self.clock()
+        if self._failed_at is not None and now - self._failed_at < self.retry_interval:
+            return False
+        return not self._index or now - self.fetched_at >= self.refresh_interval
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Baixa a árvore de esportes, atualiza os índices e o arquivo de cache.
+        Sem `force`, não faz nada se outra thread acabou de atualizar.
+        """
+        with self._refresh_lock:
+            if not force and self._index is not None and not self._due():
+                return bool(self._index)
+            self.downloads += 1
+            try:
+                tree = parse_sports_tree(self._fetch())
+            except Exception as e:
+                logger.error(f"Erro ao baixar o catálogo de esportes: {e}")
+                tree = []
+            now = self.clock()
+            if not tree:
+                self._failed_at = now
+                logger.warning("Catálogo de esportes indisponível; mantendo a versão em cache")
+                return False
+            self._failed_at = None
+            self._save_file(tree, now)
+            self._index = CatalogIndex(tree)
+            self.fetched_at = now
+            logger.info(f"Catálogo de esportes atualizado ({len(tree)} esportes)")
+            return True
+
+    def refresh_in_background(self) -> threading.Thread:
+        """Atualiza numa thread em segundo plano (uma por vez) e devolve a thread."""
+        with self._lock:
+            if self._refresher is None or not self._refresher.is_alive():
+                self._refresher = threading.Thread(target=self.refresh, name='sport-catalog', daemon=True)
+                self._refresher.start()
+            return self._refresher
+
+    def load_in_background(self) -> threading.Thread:
+        """Carrega o cache (disco ou rede) sem bloquear quem chama."""
+        thread = threading.Thread(target=self.ensure_loaded, name='sport-catalog-load', daemon=True)
+        thread.start()
+        return thread
+
+    def _current(self) -> CatalogIndex:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._load_file()
+        if self._due():
+            # Mesmo sem nada em cache a consulta não espera o download
+            self.refresh_in_background()
+        return self._index
+
+    # Consultas
+
+    def ensure_loaded(self) -> bool:
+        """
+        Garante o cache carregado (disco ou rede), esperando o download se
+        não há nada em cache; True se há esportes.
+        """
+        if not self._current():
+            # Espera o download já iniciado (ou repete, se a falha já pode ser repetida)
+            self.refresh()
+        return bool(self._index)
+
+    def sport_id(self, name: str) -> Optional[str]:
+        """ID do esporte `name` (ex.: 'soccer'), ou None se desconhecido."""
+        return _match(self._current().sports, name)
+
+    def has_sport(self, name: str) -> bool:
+        """True se `name` é exatamente (sem caixa) o nome de um esporte do catálogo."""
+        return name.strip().lower() in self._current().sports
+
+    def _sport_key(self, index: CatalogIndex, sport: str) -> Optional[str]:
+        return sport if sport in index.categories else _match(index.sports, sport)
+
+    def category_id(self, sport: str, name: str) -> Optional[str]:
+        """ID da categoria (país/região) `name` dentro do esporte `sport` (nome ou ID)."""
+        index = self._current()
+        sport_id = self._sport_key(index, sport)
+        return _match(index.categories.get(sport_id, {}), name) if sport_id else None
+
+    def tournament_id(self, sport: str, name: str, category: Optional[str] = None) -> Optional[str]:
+        """ID do torneio `name`; com `category`, procura só dentro dela."""
+        index = self._current()
+        sport_id = self._sport_key(index, sport)
+        if sport_id is None:
+            return None
+        if category is not None:
+            category_id = category if category in index.category_tournaments else \
+                _match(index.categories.get(sport_id, {}), category)
+            return _match(index.category_tournaments.get(category_id, {}), name) if category_id else None
+        return _match(index.tournaments.get(sport_id, {}), name)
+
+    def status(self) -> Dict[str, Any]:
+        """Resumo do cache para monitoramento."""
+        index = self._index
+        return {
+            'sports': len(index.sports) if index else 0,
+            'age': round(self.clock() - self.fetched_at, 1) if self.fetched_at else None,
+            'downloads': self.downloads,
+            'failing': self._failed_at is not None,
+        }
+
+
+_catalog: Optional[SportCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> SportCatalog:
+    """Catálogo global, baixado pelo cliente SportRadar de `CATALOG_BOOKMAKER`."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                from backend.apps.radar_api import SportRadarAPI
+                api = SportRadarAPI(settings.CATALOG_BOOKMAKER)
+                _catalog = SportCatalog(api.get_sports_ids)
+    return _catalog
@@ -0,0 +1,280 @@
+"""
+Detecção de arbitragem entre mercados complementares.
+
+Cada seleção conhecida (1X2, Dupla Chance, Over/Under, Handicap) é mapeada
+para um conjunto de resultados do evento, representado como bitmask sobre um
+espaço de resultados (ex.: casa/empate/visitante, número de gols ou saldo de
+gols do mandante). Uma cobertura
+é um conjunto de seleções cujos conjuntos são disjuntos e cuja união é o
+espaço inteiro — como "Casa @ A + X2 @ B" —, e nesse caso o índice de
+arbitragem continua sendo a soma de 1/odd.
+
+As coberturas possíveis dependem só das máscaras presentes no evento e são
+pré-compiladas e guardadas em cache; por evento, basta somar as melhores
+probabilidades implícitas de cada máscara e descartar a cobertura quando
+esse limite inferior já é >= 1.
+
+`/api/opportunities` inclui essas surebets quando o corpo traz
+`"cross_market": true`.
+"""
+
+import re
+import math
+import logging
+from collections import defaultdict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from backend.services.arbitrage import EffectiveOddsTransform, SurebetDetector, _Quote
+
+logger = logging.getLogger(__name__)
+
+# Espaços de resultados
+RESULT_SPACE = 'result'
+GOALS_SPACE = 'goals'
+MARGIN_SPACE = 'margin'
+
+_HOME, _DRAW, _AWAY = 1, 2, 4
+
+# Total de gols é discretizado em 0..MAX_GOALS, com o último bit valendo "MAX_GOALS ou mais"
+MAX_GOALS = 15
+
+# Saldo de gols (mandante - visitante) em -MAX_MARGIN..MAX_MARGIN, com os extremos valendo "ou mais"
+MAX_MARGIN = 10
+
+_OUTCOME_ALIASES = {
+    '1': _HOME, 'casa': _HOME, 'home': _HOME, 'mandante': _HOME,
+    'x': _DRAW, 'empate': _DRAW, 'draw': _DRAW,
+    '2': _AWAY, 'visitante': _AWAY, 'away': _AWAY, 'fora': _AWAY,
+}
+
+_DOUBLE_CHANCE = {
+    '1x': _HOME | _DRAW, 'x1': _HOME | _DRAW,
+    '12': _HOME | _AWAY, '21': _HOME | _AWAY,
+    'x2': _DRAW | _AWAY, '2x': _DRAW | _AWAY,
+}
+
+_TOTAL_PATTERN = re.compile(r'^(mais de|over|acima de|menos de|under|abaixo de)\s*(\d+(?:[.,]\d+)?)$')
+_OVER_WORDS = ('mais de', 'over', 'acima de')
+
+_HANDICAP_MARKETS = ('AH', 'HANDICAP', 'SPREAD')
+_HANDICAP_PATTERN = re.compile(
+    r'^(casa|home|mandante|1|visitante|away|fora|2)\s*\(?\s*([+-]?\d+(?:[.,]\d+)?)\s*\)?$'
+)
+
+_FULL_MASK = {
+    RESULT_SPACE: _HOME | _DRAW | _AWAY,
+    GOALS_SPACE: (1 << (MAX_GOALS + 1)) - 1,
+    MARGIN_SPACE: (1 << (2 * MAX_MARGIN + 1)) - 1,
+}
+
+# (espaço de resultados, máscara) coberto por uma seleção
+_Coverage = Tuple[str, int]
+
+_UNRESOLVED = object()
+
+
+class CoverageTable:
+    """
+    Tabela de cobertura: (tipo de mercado, seleção) -> (espaço, bitmask).
+
+    A resolução de nomes é memorizada, de modo que cada nome de seleção é
+    interpretado uma única vez. Para 1X2, a seleção pode trazer o campo
+    'outcome' ('1', 'X', '2'); caso contrário usa-se o nome ('Casa', 'Empate'...)
+    ou os nomes dos times informados em `home`/`away` do evento.
+    """
+
+    def __init__(self):
+        self._cache: Dict[Tuple[str, Any], Optional[_Coverage]] = {}
+        self._covers: Dict[Tuple[str, FrozenSet[int]], List[Tuple[int, ...]]] = {}
+
+    def resolve(self, market: str, selection: Dict[str, Any],
+                teams: Optional[Dict[str, int]] = None) -> Optional[_Coverage]:
+        """Espaço e máscara cobertos pela seleção, ou None se o mercado não for suportado."""
+        raw = selection.get('outcome') or selection.get('name') or ''
+        key = (market, raw)
+        coverage = self._cache.get(key, _UNRESOLVED)
+        if coverage is _UNRESOLVED:
+            coverage = self._cache[key] = self._compile(market.upper(), str(raw).strip().lower())
+        if coverage is None and teams and market.upper() == '1X2':
+            mask = teams.get(str(raw).strip().lower())
+            return (RESULT_SPACE, mask) if mask else None
+        return coverage
+
+    @staticmethod
+    def _compile(market: str, name: str) -> Optional[_Coverage]:
+        if market == '1X2':
+            mask = _OUTCOME_ALIASES.get(name)
+            return (RESULT_SPACE, mask) if mask else None
+        if market == 'DC':
+            mask = _DOUBLE_CHANCE.get(name.replace(' ', ''))
+            return (RESULT_SPACE, mask) if mask else None
+        if market == 'OU':
+            match = _TOTAL_PATTERN.match(name)
+            if not match:
+                return None
+            line = float(match.group(2).replace(',', '.'))
+            # Linhas inteiras e asiáticas devolvem a aposta e não particionam o espaço
+            if line * 2 % 2 != 1 or line > MAX_GOALS:
+                return None
+            threshold = int(line) + 1
+            over = _FULL_MASK[GOALS_SPACE] & ~((1 << threshold) - 1)
+            mask = over if match.group(1) in _OVER_WORDS else _FULL_MASK[GOALS_SPACE] & ~over
+            return GOALS_SPACE, mask
+        if market in _HANDICAP_MARKETS:
+            match = _HANDICAP_PATTERN.match(name)
+            if not match:
+                return None
+            line = float(match.group(2).replace(',', '.'))
+            if line * 2 % 2 != 1 or abs(line) > MAX_MARGIN:
+                return None
+            home = _OUTCOME_ALIASES[match.group(1)] == _HOME
+            # Mandante com linha h ganha com saldo > -h; visitante com h, com saldo < h
+            threshold = math.floor(-line if home else line) + 1 + MAX_MARGIN
+            home_mask = _FULL_MASK[MARGIN_SPACE] & ~((1 << threshold) - 1)
+            return MARGIN_SPACE, home_mask if home else _FULL_MASK[MARGIN_SPACE] & ~home_mask
+        return None
+
+    def covers(self, space: str, masks: FrozenSet[int]) -> List[Tuple[int, ...]]:
+        """
+        Todas as partições exatas do espaço usando as máscaras disponíveis,
+        calculadas uma vez por conjunto de máscaras e reutilizadas entre eventos.
+        """
+        key = (space, masks)
+        cached = self._covers.get(key)
+        if cached is None:
+            cached = self._covers[key] = self._exact_covers(_FULL_MASK[space], sorted(masks))
+        return cached
+
+    @staticmethod
+    def _exact_covers(full: int, masks: List[int]) -> List[Tuple[int, ...]]:
+        by_bit: Dict[int, List[int]] = defaultdict(list)
+        for mask in masks:
+            by_bit[(mask & -mask).bit_length() - 1].append(mask)
+
+        found = []
+
+        def search(covered: int, chosen: List[int]) -> None:
+            if covered == full:
+                if len(chosen) >= 2:
+                    found.append(tuple(chosen))
+                return
+            # O menor bit ainda descoberto precisa ser o menor bit da próxima máscara
+            uncovered = ~covered & full
+            bit = (uncovered & -uncovered).bit_length() - 1
+            for mask in by_bit.get(bit, ()):
+                if not mask & covered:
+                    chosen.append(mask)
+                    search(covered | mask, chosen)
+                    chosen.pop()
+
+        search(0, [])
+        return found
+
+
+class CrossMarketDetector:
+    """
+    Detector de surebets combinando seleções de mercados diferentes do
+    mesmo evento (ex.: 1X2 contra Dupla Chance, Over/Under da mesma linha).
+
+    Recebe eventos no formato de `SurebetDetector.find_surebets` (um dict por
+    evento e mercado, com `market` igual ao tipo: '1X2', 'DC', 'OU', 'AH') e agrupa
+    por `event_id`. Cada seleção de uma surebet retornada traz o campo 'market'.
+
+    Com `cross_only=True` (padrão), coberturas dentro de um único mercado,
+    já encontradas por `SurebetDetector`, não são repetidas.
+    """
+
+    def __init__(self, table: Optional[CoverageTable] = None, cross_only: bool = True):
+        self.table = table or CoverageTable()
+        self.cross_only = cross_only
+
+    def find_surebets(self, events: List[Dict[str, Any]],
+                      transform: Optional[EffectiveOddsTransform] = None) -> List[Dict[str, Any]]:
+        """Surebets entre mercados, uma por cobertura lucrativa, em ordem de lucro decrescente."""
+        grouped: Dict[Any, List[Dict[str, Any]]] = {}
+        for event in events:
+            grouped.setdefault(event['event_id'], []).append(event)
+
+        surebets = []
+        for event_id, markets in grouped.items():
+            surebets.extend(self.find_event_surebets(event_id, markets, transform))
+        surebets.sort(key=lambda s: s['profit_percent'], reverse=True)
+        return surebets
+
+    def find_event_surebets(self, event_id: Any, markets: List[Dict[str, Any]],
+                            transform: Optional[EffectiveOddsTransform] = None) -> List[Dict[str, Any]]:
+        """Avalia todas as coberturas de um único evento."""
+        quotes, market_of = self._group_by_mask(markets, transform)
+        surebets = []
+        for space, by_mask in quotes.items():
+            for cover in self.table.covers(space, frozenset(by_mask)):
+                market_types = list(dict.fromkeys(market_of[space, mask] for mask in cover))
+                if self.cross_only and len(market_types) < 2:
+                    continue
+
+                groups = [by_mask[mask] for mask in cover]
+                # Limite inferior: melhores odds de cada máscara, ignorando conflitos de casa
+                arb_index = sum(group[0][1] for group in groups)
+                if arb_index >= 1:
+                    continue
+
+                if len({group[0][2]['bookmaker'] for group in groups}) == len(groups):
+                    combo = [group[0][2] for group in groups]
+                else:
+                    found = SurebetDetector._assign_bookmakers([group[:len(groups)] for group in groups])
+                    if found is None or found[0] >= 1:
+                        continue
+                    arb_index, combo = found
+
+                surebets.append({
+                    'event_id': event_id,
+                    'market': '+'.join(market_types),
+                    'space': space,
+                    'selections': tuple(
+                        dict(selection, market=market_of[space, mask]) for selection, mask in zip(combo, cover)
+                    ),
+                    'arbitrage_index': arb_index,
+                    'profit_percent': (1 - arb_index) * 100
+                })
+        return surebets
+
+    def _group_by_mask(self, markets: List[Dict[str, Any]], transform: Optional[EffectiveOddsTransform]
+                       ) -> Tuple[Dict[str, Dict[int, List[_Quote]]], Dict[Tuple[str, int], str]]:
+        """
+        Cotações válidas por espaço e máscara, ordenadas da maior para a menor
+        odd, e o tipo de mercado de cada máscara.
+        """
+        grouped: Dict[str, Dict[int, List[_Quote]]] = defaultdict(lambda: defaultdict(list))
+        market_of: Dict[Tuple[str, int], str] = {}
+        resolve = self.table.resolve
+        for market in markets:
+            teams = self._team_masks(market)
+            market_type = market['market']
+            for s in market['selections']:
+                coverage = resolve(market_type, s, teams)
+                if coverage is None:
+                    continue
+                odds = s.get('odds')
+                if transform is not None:
+                    odds = transform.apply(s['bookmaker'], odds)
+                if odds and odds > 1:
+                    grouped[coverage[0]][coverage[1]].append((odds, 1 / odds, s))
+                    market_of.setdefault(coverage, market_type)
+
+        for by_mask in grouped.values():
+            for group in by_mask.values():
+                group.sort(key=lambda q: q[0], reverse=True)
+        return grouped, market_of
+
+    @staticmethod
+    def _team_masks(market: Dict[str, Any]) -> Optional[Dict[str, int]]:
+        """Permite seleções 1X2 nomeadas pelos times (campos `home`/`away` do evento)."""
+        home, away = market.get('home'), market.get('away')
+        if not home and not away:
+            return None
+        teams = {}
+        if home:
+            teams[str(home).strip().lower()] = _HOME
+        if away:
+            teams[str(away).strip().lower()] = _AWAY
+        return teams
@@ -0,0 +1,631 @@
+"""
+Coleta de odds em segundo plano, desacoplada dos handlers HTTP.
+
+O `IngestScheduler` consulta cada casa/esporte/status (um "feed") no seu
+próprio ritmo — ao vivo a cada `INGEST_LIVE_INTERVAL` segundos, futuros a
+cada `INGEST_UPCOMING_INTERVAL` — e publica os eventos num `OddsSnapshot`
+compartilhado. Os handlers (`/api/opportunities`, `/api/games/*`, callbacks
+do dashboard) leem apenas o snapshot: a latência deixa de incluir idas à
+SportRadar e o tráfego externo não cresce com o número de usuários.
+
+O snapshot é copy-on-write: cada publicação troca o dicionário de feeds
+inteiro sob um lock de escrita, e as leituras pegam a referência atual sem
+lock. Um feed novo de um esporte conhecido (de `INGEST_SPORTS` ou do
+catálogo de esportes) é buscado na primeira leitura e passa a ser coletado
+pelo scheduler a partir daí; com a thread de coleta parada, a própria
+leitura busca de novo os feeds cuja última coleta passou do intervalo.
+Esportes desconhecidos — os nomes vêm do cliente — nunca entram na agenda:
+são buscados sob demanda, num snapshot transitório de tamanho limitado,
+quando a última busca passou do intervalo.
+As casas são buscadas em paralelo e a leitura espera no máximo
+`INGEST_READ_DEADLINE` segundos, devolvendo o que já chegou. A situação de
+cada casa nos feeds lidos vem de `bookmaker_status()`.
+
+Cada evento publicado tem um hash de conteúdo (`content_hash`, calculado
+pelo adaptador ou aqui). Uma coleta só gera delta com os eventos cujo hash
+mudou; a revisão do feed só avança quando há delta, e resultados derivados
+(`SnapshotMemo`) só são recalculados quando a revisão de algum feed envolvido
+muda. Os ouvintes registrados com `subscribe()` recebem apenas os deltas;
+o scheduler global assina um `FeedIndexer` por status, que mantém os índices
+incrementais de `get_arbitrage_index()` reavaliando só os eventos alterados.
+"""
+
+import heapq
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from config import settings
+from backend.core.content_hash import content_hash
+from backend.services.priority import RefreshPolicy, VolatilityTracker, load_odds_volatility
+
+logger = logging.getLogger(__name__)
+
+# Status dos feeds
+STATUS_LIVE = 'live'
+STATUS_UPCOMING = 'upcoming'
+STATUSES = (STATUS_LIVE, STATUS_UPCOMING)
+
+# (casa, esporte, status)
+FeedKey = Tuple[str, str, str]
+
+# Máximo de feeds de esportes fora da agenda guardados no snapshot transitório
+TRANSIENT_FEEDS = 256
+
+
+# Assinatura de um conjunto de feeds: ((feed, revisão), ...)
+Signature = Tuple[Tuple[FeedKey, int], ...]
+
+
+class FeedState:
+    """
+    Última coleta de um feed: eventos publicados, hash de cada evento, revisão
+    do conteúdo e resultado da tentativa mais recente.
+    """
+
+    __slots__ = ('events', 'hashes', 'revision', 'updated_at', 'duration', 'error')
+
+    def __init__(self, events: List[Dict[str, Any]], updated_at: float, duration: float = 0.0,
+                 error: Optional[str] = None, hashes: Optional[Dict[Any, int]] = None, revision: int = 0):
+        self.events = events
+        self.hashes = hashes or {}
+        self.revision = revision
+        self.updated_at = updated_at
+        self.duration = duration
+        self.error = error
+
+
+class FeedDelta:
+    """Eventos novos ou alterados e eventos que saíram de um feed numa coleta."""
+
+    __slots__ = ('changed', 'removed')
+
+    def __init__(self, changed: List[Dict[str, Any]], removed: List[Dict[str, Any]]):
+        self.changed = changed
+        self.removed = removed
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed)
+
+
+class OddsSnapshot:
+    """Eventos mais recentes de cada feed, com leitura sem lock."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._feeds: Dict[FeedKey, FeedState] = {}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def put(self, key: FeedKey, events: List[Dict[str, Any]], duration: float = 0.0) -> FeedDelta:
+        """
+        Publica os eventos de uma coleta bem-sucedida e devolve o delta em
+        relação à coleta anterior. Sem delta, a revisão e a lista de eventos
+        anteriores são mantidas.
+        """
+        previous = self._feeds.get(key)
+        old_hashes = previous.hashes if previous is not None else {}
+        hashes = {}
+        changed = []
+        for event in events:
+            digest = event.get('content_hash')
+            if digest is None:
+                digest = content_hash(event)
+            event_id = event.get('id')
+            hashes[event_id] = digest
+            if old_hashes.get(event_id) != digest:
+                changed.append(event)
+        removed = [e for e in previous.events if e.get('id') not in hashes] if previous is not None else []
+        delta = FeedDelta(changed, removed)
+
+        if previous is not None and not delta:
+            state = FeedState(previous.events, self.clock(), duration, hashes=previous.hashes,
+                              revision=previous.revision)
+        else:
+            revision = previous.revision + 1 if previous is not None else 1
+            state = FeedState(list(events), self.clock(), duration, hashes=hashes, revision=revision)
+        self._publish(key, state)
+        return delta
+
+    def fail(self, key: FeedKey, error: str) -> None:
+        """Registra a falha de uma coleta mantendo os últimos eventos válidos."""
+        previous = self._feeds.get(key)
+        if previous is None:
+            state = FeedState([], 0.0, error=error)
+        else:
+            state = FeedState(previous.events, previous.updated_at, error=error, hashes=previous.hashes,
+                              revision=previous.revision)
+        self._publish(key, state)
+
+    def _publish(self, key: FeedKey, state: FeedState) -> None:
+        with self._lock:
+            feeds = dict(self._feeds)
+            feeds[key] = state
+            self._feeds = feeds
+            self.version += 1
+
+    def get(self, key: FeedKey) -> Optional[FeedState]:
+        return self._feeds.get(key)
+
+    def evict(self, max_feeds: int) -> None:
+        """Descarta os feeds atualizados há mais tempo, mantendo no máximo `max_feeds`."""
+        with self._lock:
+            if len(self._feeds) <= max_feeds:
+                return
+            newest = sorted(self._feeds.items(), key=lambda item: item[1].updated_at, reverse=True)
+            self._feeds = dict(newest[:max_feeds])
+            self.version += 1
+
+    def __contains__(self, key: FeedKey) -> bool:
+        return key in self._feeds
+
+    @staticmethod
+    def _select(feeds: Dict[FeedKey, FeedState], status: str, sports: Iterable[str],
+                bookmakers: Optional[Iterable[str]]) -> Iterator[Tuple[FeedKey, FeedState]]:
+        sports = set(sports)
+        bookmakers = set(bookmakers) if bookmakers else None
+        for key, state in feeds.items():
+            bookmaker, sport, feed_status = key
+            if feed_status != status or sport not in sports:
+                continue
+            if bookmakers is not None and bookmaker not in bookmakers:
+                continue
+            yield key, state
+
+    def view(self, status: str, sports: Iterable[str], bookmakers: Optional[Iterable[str]] = None,
+             limit: Optional[int] = None) -> Tuple[Signature, List[Dict[str, Any]]]:
+        """
+        Eventos publicados para `status` nos esportes e casas pedidos (todas as
+        casas se `bookmakers` for vazio), até `limit` por feed, junto com a
+        assinatura (revisões) dos feeds lidos — ambos da mesma versão do snapshot.
+        """
+        selected = sorted(self._select(self._feeds, status, sports, bookmakers), key=lambda item: item[0])
+        signature = tuple((key, state.revision) for key, state in selected)
+        events = []
+        for _, state in selected:
+            events.extend(state.events if limit is None else state.events[:limit])
+        return signature, events
+
+    def events(self, status: str, sports: Iterable[str], bookmakers: Optional[Iterable[str]] = None,
+               limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Eventos publicados (ver `view`)."""
+        return self.view(status, sports, bookmakers, limit)[1]
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Idade, volume e último erro de cada feed, agrupados por casa."""
+        now = self.clock()
+        report: Dict[str, Dict[str, Any]] = {}
+        for (bookmaker, sport, status), state in self._feeds.items():
+            report.setdefault(bookmaker, {})[f"{sport}:{status}"] = {
+                'events': len(state.events),
+                'revision': state.revision,
+                'age': round(now - state.updated_at, 3) if state.updated_at else None,
+                'duration_ms': round(state.duration * 1000, 1),
+                'error': state.error,
+            }
+        return report
+
+
+class IngestScheduler:
+    """
+    Agenda a coleta de cada feed no seu intervalo e publica no snapshot.
+
+    `adapters` é uma função que devolve {nome: adaptador}, consultada a cada
+    rodada para acompanhar o registry. As coletas rodam num pool de
+    `workers` threads; um feed lento não atrasa os demais e nunca tem duas
+    coletas simultâneas.
+
+    Depois de cada coleta o próximo intervalo do feed vem de `policy`
+    (ver `backend.services.priority`), com a volatilidade observada entre
+    coletas e, se `history` for informado, a do histórico de odds
+    (recarregada a cada `INGEST_VOLATILITY_REFRESH` segundos).
+    """
+
+    def __init__(self, adapters: Callable[[], Dict[str, Any]], snapshot: Optional[OddsSnapshot] = None,
+                 sports: Optional[Iterable[str]] = None, live_interval: Optional[float] = None,
+                 upcoming_interval: Optional[float] = None, limit: Optional[int] = None,
+                 workers: Optional[int] = None, policy: Optional[RefreshPolicy] = None,
+                 history: Optional[Callable[[], Dict[Any, float]]] = None,
+                 read_deadline: Optional[float] = None, known_sport: Optional[Callable[[str], bool]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.adapters = adapters
+        self.snapshot = snapshot if snapshot is not None else OddsSnapshot()
+        # Feeds de esportes fora da agenda, buscados só quando lidos
+        self.transient = OddsSnapshot()
+        # Diz se um esporte pedido numa leitura pode entrar na agenda; sem ele, só `sports`
+        self.known_sport = known_sport
+        self.intervals = {
+            STATUS_LIVE: settings.INGEST_LIVE_INTERVAL if live_interval is None else live_interval,
+            STATUS_UPCOMING: settings.INGEST_UPCOMING_INTERVAL if upcoming_interval is None else upcoming_interval,
+        }
+        self.limit = settings.INGEST_EVENT_LIMIT if limit is None else limit
+        self.workers = settings.INGEST_WORKERS if workers is None else workers
+        # Espera máxima por feeds sem coleta numa leitura (<= 0: sem limite)
+        self.read_deadline = settings.INGEST_READ_DEADLINE if read_deadline is None else read_deadline
+        self.policy = policy if policy is not None else RefreshPolicy(
+            live_interval=self.intervals[STATUS_LIVE], upcoming_interval=self.intervals[STATUS_UPCOMING]
+        )
+        self.volatility = VolatilityTracker()
+        self.history = history
+        self.clock = clock
+        self._history_due = clock()
+        self._listeners: List[Callable[[FeedKey, FeedDelta], None]] = []
+        # Intervalo calculado na última coleta de cada feed
+        self._feed_intervals: Dict[FeedKey, float] = {}
+        self._sports: List[str] = []
+        # Próxima coleta de cada feed; entradas do heap que divergem de `_next` são obsoletas
+        self._next: Dict[FeedKey, float] = {}
+        self._due: List[Tuple[float, FeedKey]] = []
+        # Coletas em andamento (agendadas ou disparadas por leituras)
+        self._in_flight: Dict[FeedKey, Future] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        for sport in (settings.INGEST_SPORTS if sports is None else sports):
+            self.add_sport(sport)
+
+    @property
+    def sports(self) -> List[str]:
+        return list(self._sports)
+
+    @property
+    def running(self) -> bool:
+        """True enquanto a thread de coleta está ativa."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_sport(self, sport: str) -> None:
+        """Passa a coletar `sport` (ao vivo e futuros) em todas as casas."""
+        with self._lock:
+            if sport in self._sports:
+                return
+            self._sports.append(sport)
+        self._sync_feeds()
+        self._wake.set()
+
+    def _sync_feeds(self) -> None:
+        """Agenda para já os feeds de casas/esportes que ainda não têm agenda."""
+        bookmakers = list(self.adapters())
+        with self._lock:
+            now = self.clock()
+            for bookmaker in bookmakers:
+                for sport in self._sports:
+                    for status in STATUSES:
+                        key = (bookmaker, sport, status)
+                        if key not in self._next:
+                            self._schedule(key, now)
+
+    def _schedule(self, key: FeedKey, when: float) -> None:
+        # Chamado com o lock adquirido
+        self._next[key] = when
+        heapq.heappush(self._due, (when, key))
+        # Sem a thread ninguém consome o heap e as entradas obsoletas se acumulam
+        if len(self._due) > 2 * len(self._next):
+            self._due = [(due, feed) for feed, due in self._next.items()]
+            heapq.heapify(self._due)
+
+    def subscribe(self, listener: Callable[[FeedKey, FeedDelta], None]) -> None:
+        """Registra um callback chamado com o delta de cada coleta que alterou o feed."""
+        self._listeners.append(listener)
+
+    def poll(self, key: FeedKey, transient: bool = False) -> None:
+        """
+        Coleta um feed agora e publica o resultado (ou a falha) no snapshot.
+        Com `transient`, publica no snapshot transitório, sem volatilidade,
+        intervalo calculado nem ouvintes.
+        """
+        bookmaker, sport, status = key
+        adapter = self.adapters().get(bookmaker)
+        if adapter is None:
+            return
+        fetch = adapter.get_live_odds if status == STATUS_LIVE else adapter.get_upcoming_odds
+        started = time.perf_counter()
+        try:
+            events = fetch(sport, limit=self.limit)
+        except Exception as e:
+            logger.warning(f"Falha na coleta {bookmaker}/{sport}/{status}: {e}")
+            (self.transient if transient else self.snapshot).fail(key, str(e))
+        else:
+            if transient:
+                self.transient.put(key, events, time.perf_counter() - started)
+                self.transient.evict(TRANSIENT_FEEDS)
+                return
+            delta = self.snapshot.put(key, events, time.perf_counter() - started)
+            # Eventos inalterados não são reprocessados; só a volatilidade deles decai
+            changed_ids = {event.get('id') for event in delta.changed}
+            self.volatility.observe(delta.changed)
+            self.volatility.settle(event.get('id') for event in events if event.get('id') not in changed_ids)
+            self._feed_intervals[key] = self.policy.feed_interval(status, events, self.volatility.get)
+            if delta:
+                for listener in self._listeners:
+                    try:
+                        listener(key, delta)
+                    except Exception as e:
+                        logger.error(f"Erro em ouvinte da coleta {bookmaker}/{sport}/{status}: {e}")
+
+    def interval_for(self, key: FeedKey) -> float:
+        """Intervalo até a próxima coleta do feed (padrão do status antes da primeira)."""
+        return self._feed_intervals.get(key, self.intervals[key[2]])
+
+    def refresh_volatility(self) -> None:
+        """Recarrega a volatilidade do histórico e esquece eventos fora dos feeds."""
+        if self.history is not None:
+            try:
+                self.volatility.merge(self.history())
+            except Exception as e:
+                logger.warning(f"Falha ao carregar histórico de odds: {e}")
+        self.volatility.forget(
+            event.get('id') for status in STATUSES
+            for event in self.snapshot.events(status, self._sports)
+        )
+
+    def run_pending(self) -> List[Future]:
+        """Dispara a coleta dos feeds vencidos que não estão em andamento."""
+        self._sync_feeds()
+        now = self.clock()
+        if now >= self._history_due:
+            self._history_due = now + settings.INGEST_VOLATILITY_REFRESH
+            self.refresh_volatility()
+        pool = self._pool()
+        futures = []
+        with self._lock:
+            while self._due and self._due[0][0] <= now:
+                when, key = heapq.heappop(self._due)
+                if self._next.get(key) != when or key in self._in_flight:
+                    continue
+                futures.append(self._submit(pool, key))
+        return futures
+
+    def _submit(self, pool: ThreadPoolExecutor, key: FeedKey, transient: bool = False) -> Future:
+        # Chamado com o lock adquirido; a coleta só sai de `_in_flight` depois dele
+        future = pool.submit(self._poll_transient if transient else self._poll_and_reschedule, key)
+        self._in_flight[key] = future
+        return future
+
+    def _poll_transient(self, key: FeedKey) -> None:
+        try:
+            self.poll(key, transient=True)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _poll_and_reschedule(self, key: FeedKey) -> None:
+        try:
+            self.poll(key)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                self._schedule(key, self.clock() + self.interval_for(key))
+            self._wake.set()
+
+    def next_due_in(self) -> Optional[float]:
+        """Segundos até o próximo feed vencer (None se não há feeds agendados)."""
+        with self._lock:
+            while self._due and self._next.get(self._due[0][1]) != self._due[0][0]:
+                heapq.heappop(self._due)
+            if not self._due:
+                return None
+            return max(self._due[0][0] - self.clock(), 0.0)
+
+    def read(self, status: str, sports: Iterable[str], bookmakers: Optional[Iterable[str]] = None,
+             limit: Optional[int] = None, deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Eventos do snapshot para os handlers (ver `view`)."""
+        return self.view(status, sports, bookmakers, limit, deadline)[1]
+
+    def _split_sports(self, sports: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Separa os esportes pedidos em (agendáveis, fora da agenda)."""
+        scheduled, transient = [], []
+        for sport in dict.fromkeys(sport.strip().lower() for sport in sports):
+            if sport in self._sports or (self.known_sport is not None and self.known_sport(sport)):
+                scheduled.append(sport)
+            else:
+                transient.append(sport)
+        return scheduled, transient
+
+    def _needs_poll(self, key: FeedKey, transient: bool) -> bool:
+        snapshot = self.transient if transient else self.snapshot
+        state = snapshot.get(key)
+        if state is None:
+            return True
+        if not transient and self.running:
+            return False
+        return snapshot.clock() - state.updated_at >= self.interval_for(key)
+
+    def _feed_keys(self, status: str, sports: List[str],
+                   bookmakers: Optional[Iterable[str]]) -> Iterator[FeedKey]:
+        names = set(bookmakers) if bookmakers else None
+        for bookmaker in self.adapters():
+            if names is not None and bookmaker not in names:
+                continue
+            for sport in sports:
+                yield (bookmaker, sport, status)
+
+    def view(self, status: str, sports: Iterable[str], bookmakers: Optional[Iterable[str]] = None,
+             limit: Optional[int] = None, deadline: Optional[float] = None) -> Tuple[Signature, List[Dict[str, Any]]]:
+        """
+        Assinatura e eventos do snapshot para os handlers. Esportes conhecidos
+        ainda não coletados são registrados no scheduler e os feeds sem
+        nenhuma coleta são buscados agora, em paralelo, uma única vez (ou de
+        novo, com a thread parada, quando passam do intervalo); os
+        desconhecidos são buscados sem entrar na agenda (ver o módulo). A
+        leitura espera essas coletas por até `deadline` segundos (padrão
+        `read_deadline`); as que não terminarem a tempo ficam de fora e são
+        publicadas ao concluir.
+        """
+        scheduled, transient = self._split_sports(sports)
+        for sport in scheduled:
+            self.add_sport(sport)
+        stale = [(key, False) for key in self._feed_keys(status, scheduled, bookmakers)
+                 if self._needs_poll(key, False)]
+        stale += [(key, True) for key in self._feed_keys(status, transient, bookmakers)
+                  if self._needs_poll(key, True)]
+        if stale:
+            pool = self._pool()
+            waiting = []
+            with self._lock:
+                for key, is_transient in stale:
+                    # Uma coleta já em andamento (do scheduler ou de outra leitura) é aguardada
+                    future = self._in_flight.get(key)
+                    waiting.append(future if future is not None else self._submit(pool, key, is_transient))
+            timeout = self.read_deadline if deadline is None else deadline
+            _, pending = wait(waiting, timeout=timeout if timeout > 0 else None)
+            if pending:
+                logger.warning(f"Leitura de {status} sem {len(pending)} feed(s) após {timeout}s")
+        signature, events = self.snapshot.view(status, scheduled, bookmakers, limit)
+        if transient:
+            extra_signature, extra_events = self.transient.view(status, transient, bookmakers, limit)
+            signature += extra_signature
+            events = events + extra_events
+        return signature, events
+
+    def bookmaker_status(self, status: str, sports: Iterable[str],
+                         bookmakers: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Situação de cada casa nos feeds de uma leitura: 'ok'; 'error' se a
+        última coleta de algum feed falhou (os eventos são os da última coleta
+        válida); 'pending' se algum feed ainda não tem coleta (ex.: passou do
+        prazo da leitura). Inclui o total de eventos, a idade do feed mais
+        antigo em segundos e o último erro.
+        """
+        now = self.snapshot.clock()
+        rank = {'ok': 0, 'error': 1, 'pending': 2}
+        report: Dict[str, Dict[str, Any]] = {}
+        sports = [sport.strip().lower() for sport in sports]
+        for key in self._feed_keys(status, list(dict.fromkeys(sports)), bookmakers):
+            entry = report.setdefault(key[0], {'status': 'ok', 'events': 0, 'age': None, 'error': None})
+            state = self.snapshot.get(key) or self.transient.get(key)
+            if state is None:
+                current = 'pending'
+            else:
+                current = 'error' if state.error else 'ok'
+                entry['events'] += len(state.events)
+                entry['error'] = state.error or entry['error']
+                if state.updated_at:
+                    entry['age'] = max(entry['age'] or 0.0, round(now - state.updated_at, 3))
+            if rank[current] > rank[entry['status']]:
+                entry['status'] = current
+        return report
+
+    def start(self) -> None:
+        """Inicia a thread do scheduler (idempotente)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='odds-ingest', daemon=True)
+            self._thread.start()
+        logger.info(f"Coleta de odds iniciada: esportes={self._sports} intervalos={self.intervals}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Para a thread do scheduler e o pool de coletas."""
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._lock:
+            self._thread = None
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=max(self.workers, 1),
+                                                    thread_name_prefix='odds-ingest')
+            return self._executor
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"Erro no scheduler de coleta: {e}")
+            wait = self.next_due_in()
+            self._wake.clear()
+            self._wake.wait(1.0 if wait is None else min(wait, 1.0))
+
+
+class SnapshotMemo:
+    """
+    Resultados derivados do snapshot (ex.: oportunidades detectadas), em LRU.
+    A chave inclui a assinatura dos feeds lidos, então enquanto nenhum deles
+    mudar de conteúdo o resultado é reaproveitado sem refazer a detecção.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+_scheduler: Optional[IngestScheduler] = None
+_scheduler_lock = threading.Lock()
+# Índices incrementais alimentados pelos deltas do scheduler global, por status
+_indexes: Dict[str, Any] = {}
+
+
+def get_ingest_scheduler() -> IngestScheduler:
+    """
+    Scheduler global, coletando os adaptadores do registry. A thread de coleta
+    é iniciada na criação quando `INGEST_ENABLED`; sem ela, os feeds são
+    buscados pelas leituras, de novo sempre que passam do intervalo. Os
+    deltas de cada status alimentam o índice de `get_arbitrage_index()`.
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                from backend.apps.adapters import get_all_adapters
+                from backend.services.arbitrage_index import ArbitrageIndex, FeedIndexer
+                from backend.services.catalog import get_catalog
+                from database.database import get_db
+                scheduler = IngestScheduler(
+                    get_all_adapters,
+                    history=lambda: load_odds_volatility(get_db(), settings.INGEST_VOLATILITY_WINDOW),
+                    known_sport=lambda sport: get_catalog().has_sport(sport)
+                )
+                for status in STATUSES:
+                    index = _indexes[status] = ArbitrageIndex()
+                    scheduler.subscribe(FeedIndexer(index, status))
+                if settings.INGEST_ENABLED:
+                    scheduler.start()
+                _scheduler = scheduler
+    return _scheduler
+
+
+def get_snapshot() -> OddsSnapshot:
+    """Snapshot do scheduler global."""
+    return get_ingest_scheduler().snapshot
+
+
+def get_arbitrage_index(status: str = STATUS_LIVE) -> Any:
+    """
+    `ArbitrageIndex` com as cotações brutas dos feeds de `status`, mantido
+    incrementalmente pelos deltas do scheduler global. Só reflete feeds que
+    já foram coletados (pela thread ou por leituras).
+    """
+    get_ingest_scheduler()
+    return _indexes[status]
@@ -0,0 +1,326 @@
+"""
+Modelo compacto de odds em memória.
+
+Nomes de casas e de seleções são internados em tabelas compartilhadas e
+viram IDs inteiros; um `MarketBook` guarda as cotações de um mercado em
+colunas `array` (IDs de seleção e de casa como int32, odds como double), em
+vez de uma lista de dicts por cotação. `Quote` é a visão de uma única
+cotação, com `__slots__`, e aceita acesso por chave (`quote['odds']`) para
+continuar compatível com o código que trabalha com dicts de seleção.
+
+As tabelas não crescem sem limite num processo de coleta longo: quando a
+geração atual passa de `MODEL_NAME_TABLE_LIMIT` nomes, os livros novos usam
+uma geração nova. Cada livro e cada cotação guardam a geração com que foram
+criados, então os IDs continuam válidos, e a geração antiga é liberada quando
+o último livro que a usa sai de cena (o snapshot só guarda dicts de eventos).
+"""
+
+import logging
+import threading
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class NameTable:
+    """Tabela de internação nome <-> ID inteiro, segura para múltiplas threads."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def id(self, name: str) -> int:
+        """ID do nome, criando-o na primeira ocorrência."""
+        found = self._ids.get(name)
+        if found is not None:
+            return found
+        with self._lock:
+            found = self._ids.get(name)
+            if found is None:
+                found = self._ids[name] = len(self._names)
+                self._names.append(name)
+            return found
+
+    def name(self, id_: int) -> str:
+        return self._names[id_]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+class InternTables:
+    """Uma geração de tabelas de internação: seleções e casas."""
+
+    __slots__ = ('selections', 'bookmakers')
+
+    def __init__(self):
+        self.selections = NameTable()
+        self.bookmakers = NameTable()
+
+    def __len__(self) -> int:
+        return len(self.selections) + len(self.bookmakers)
+
+
+_tables = InternTables()
+_tables_lock = threading.Lock()
+
+
+def intern_tables() -> InternTables:
+    """Geração atual das tabelas, trocada por uma nova ao passar de `MODEL_NAME_TABLE_LIMIT` nomes."""
+    global _tables
+    tables = _tables
+    if len(tables) >= settings.MODEL_NAME_TABLE_LIMIT:
+        with _tables_lock:
+            if _tables is tables:
+                _tables = InternTables()
+                logger.info(f"Tabelas de nomes com {len(tables)} entradas; iniciando nova geração")
+            tables = _tables
+    return tables
+
+
+class Quote:
+    """Uma cotação: seleção, casa e odd, com nomes resolvidos pelas tabelas da sua geração."""
+
+    __slots__ = ('selection_id', 'bookmaker_id', 'odds', 'tables')
+
+    def __init__(self, selection_id: int, bookmaker_id: int, odds: float,
+                 tables: Optional[InternTables] = None):
+        self.selection_id = selection_id
+        self.bookmaker_id = bookmaker_id
+        self.odds = odds
+        self.tables = tables if tables is not None else intern_tables()
+
+    @property
+    def name(self) -> str:
+        return self.tables.selections.name(self.selection_id)
+
+    @property
+    def bookmaker(self) -> str:
+        return self.tables.bookmakers.name(self.bookmaker_id)
+
+    def __getitem__(self, key: str) -> Any:
+        # Caminho quente do detector: evita as propriedades
+        if key == 'bookmaker':
+            return self.tables.bookmakers._names[self.bookmaker_id]
+        if key == 'odds':
+            return self.odds
+        if key == 'name':
+            return self.tables.selections._names[self.selection_id]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Quote):
+            return NotImplemented
+        if self.tables is other.tables:
+            return (self.selection_id, self.bookmaker_id, self.odds) == \
+                (other.selection_id, other.bookmaker_id, other.odds)
+        return (self.name, self.bookmaker, self.odds) == (other.name, other.bookmaker, other.odds)
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.bookmaker, self.odds))
+
+    def __repr__(self) -> str:
+        return f"Quote({self.name!r}, {self.bookmaker!r}, {self.odds})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'odds': self.odds, 'bookmaker': self.bookmaker}
+
+
+class MarketBook:
+    """
+    Cotações de um mercado (de uma ou várias casas) em colunas.
+
+    Aceita acesso por chave a 'event_id', 'market' e 'selections' para poder
+    ser usado onde o detector espera o dict de mercado; a iteração devolve
+    objetos `Quote` criados sob demanda. `market` é o tipo ('1X2', 'OU'...),
+    `label` o nome de exibição e `info` os metadados do evento (compartilhados
+    entre os livros do mesmo evento, não copiados). `tables` é a geração de
+    tabelas de nomes dos IDs do livro.
+    """
+
+    __slots__ = ('event_id', 'market', 'label', 'info', 'tables', 'selection_ids', 'bookmaker_ids', 'odds')
+
+    def __init__(self, event_id: Any, market: str, label: Optional[str] = None,
+                 info: Optional[Dict[str, Any]] = None):
+        self.event_id = event_id
+        self.market = market
+        self.label = label or market
+        self.info = info
+        self.tables = intern_tables()
+        self.selection_ids = array('i')
+        self.bookmaker_ids = array('i')
+        self.odds = array('d')
+
+    @classmethod
+    def from_selections(cls, event_id: Any, market: str, selections: List[Dict[str, Any]],
+                        bookmaker: Optional[str] = None, label: Optional[str] = None,
+                        info: Optional[Dict[str, Any]] = None) -> 'MarketBook':
+        """Cria o livro a partir de dicts de seleção; `bookmaker` vale para seleções sem casa."""
+        book = cls(event_id, market, label, info)
+        for s in selections:
+            book.add(s['name'], s.get('bookmaker') or bookmaker, s.get('odds'))
+        return book
+
+    @classmethod
+    def from_adapter_events(cls, events: List[Dict[str, Any]]) -> List['MarketBook']:
+        """
+        Converte eventos no formato dos adaptadores em livros, juntando as
+        cotações de todas as casas do mesmo evento (esporte + nome) e tipo de
+        mercado. `info` guarda nome, esporte, status e início do evento.
+        """
+        books: Dict[Tuple[str, str], MarketBook] = {}
+        infos: Dict[str, Dict[str, Any]] = {}
+        for event in events:
+            event_id = f"{event.get('sport', '')}:{event.get('name', '')}"
+            info = infos.get(event_id)
+            if info is None:
+                info = infos[event_id] = {
+                    key: event.get(key) for key in ('name', 'sport', 'status', 'start_time')
+                }
+            for market in event.get('markets', []):
+                market_type = market.get('type') or market.get('name', '')
+                key = (event_id, market_type)
+                book = books.get(key)
+                if book is None:
+                    book = books[key] = cls(event_id, market_type, market.get('name'), info)
+                for s in market.get('selections', []):
+                    book.add(s['name'], s.get('bookmaker') or event.get('bookmaker'), s.get('odds'))
+        return list(books.values())
+
+    def add(self, name: str, bookmaker: str, odds: Optional[float]) -> None:
+        self.selection_ids.append(self.tables.selections.id(name))
+        self.bookmaker_ids.append(self.tables.bookmakers.id(bookmaker or ''))
+        self.odds.append(odds or 0.0)
+
+    def __len__(self) -> int:
+        return len(self.odds)
+
+    def __iter__(self) -> Iterator[Quote]:
+        tables = self.tables
+        for sid, bid, odds in zip(self.selection_ids, self.bookmaker_ids, self.odds):
+            yield Quote(sid, bid, odds, tables)
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'selections':
+            return list(self)
+        if key in ('event_id', 'market'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def outcome_count(self) -> int:
+        return len(set(self.selection_ids))
+
+    def best_odds(self) -> Dict[int, Tuple[float, int]]:
+        """Melhor (odd, ID da casa) por ID de seleção, ignorando odds <= 1."""
+        best: Dict[int, Tuple[float, int]] = {}
+        for sid, bid, odds in zip(self.selection_ids, self.bookmaker_ids, self.odds):
+            if odds > 1 and (sid not in best or odds > best[sid][0]):
+                best[sid] = (odds, bid)
+        return best
+
+    def best_implied_sum(self) -> float:
+        """
+        Soma de 1/melhor odd publicada por seleção (inf com menos de duas
+        seleções cotadas). Como a odd efetiva nunca supera a publicada, é um
+        limite inferior barato para descartar o mercado antes de agrupá-lo.
+        """
+        best: Dict[int, float] = {}
+        for sid, odds in zip(self.selection_ids, self.odds):
+            if odds > best.get(sid, 1.0):
+                best[sid] = odds
+        if len(best) < 2:
+            return float('inf')
+        return sum(1 / odds for odds in best.values())
+
+    def implied_sum(self, transform: Any = None) -> Optional[float]:
+        """
+        Soma de 1/odd de todas as cotações (uso típico: livro de uma única casa).
+        Com `transform`, usa a odd efetiva e devolve None se alguma cotação for
+        descartada pelos limites da casa.
+        """
+        total = 0.0
+        for bid, odds in zip(self.bookmaker_ids, self.odds):
+            if transform is not None:
+                odds = transform.apply(self.tables.bookmakers.name(bid), odds)
+            if not odds or odds <= 1:
+                return None
+            total += 1 / odds
+        return total
+
+    def best_quotes(self, transform: Any = None) -> Optional[List[Tuple[float, float, Quote]]]:
+        """
+        Melhor cotação (odd, 1/odd, Quote) de cada seleção, na ordem de aparição,
+        sem agrupar o livro inteiro: só as k vencedoras viram objetos `Quote`.
+        Retorna None nas mesmas condições de `group_outcomes`.
+        """
+        order: Dict[int, int] = {}
+        best: List[Optional[Tuple[float, int]]] = []
+        for row, (sid, bid, raw) in enumerate(zip(self.selection_ids, self.bookmaker_ids, self.odds)):
+            slot = order.get(sid)
+            if slot is None:
+                slot = order[sid] = len(best)
+                best.append(None)
+            odds = raw if transform is None else transform.apply(self.tables.bookmakers.name(bid), raw)
+            if odds and odds > 1 and (best[slot] is None or odds > best[slot][0]):
+                best[slot] = (odds, row)
+
+        if len(best) < 2 or None in best:
+            return None
+        sids, bids, raws = self.selection_ids, self.bookmaker_ids, self.odds
+        return [(odds, 1 / odds, Quote(sids[row], bids[row], raws[row], self.tables)) for odds, row in best]
+
+    def group_outcomes(self, transform: Any = None,
+                       limit: Optional[int] = None) -> Optional[List[List[Tuple[float, float, Quote]]]]:
+        """
+        Mesmo contrato de `SurebetDetector._group_outcomes`, indexando por ID
+        inteiro em vez de nome: cotações válidas por seleção, na ordem de
+        aparição e da maior para a menor odd. Com `limit`, só as `limit`
+        melhores de cada seleção são materializadas.
+        """
+        slots: Dict[int, int] = {}
+        rows: List[List[Tuple[float, int]]] = []
+        for row, (sid, bid, raw) in enumerate(zip(self.selection_ids, self.bookmaker_ids, self.odds)):
+            slot = slots.get(sid)
+            if slot is None:
+                slot = slots[sid] = len(rows)
+                rows.append([])
+            odds = raw if transform is None else transform.apply(self.tables.bookmakers.name(bid), raw)
+            if odds and odds > 1:
+                rows[slot].append((odds, row))
+
+        if len(rows) < 2 or not all(rows):
+            return None
+        sids, bids, raws = self.selection_ids, self.bookmaker_ids, self.odds
+        groups = []
+        for quotes in rows:
+            quotes.sort(reverse=True)
+            groups.append([
+                (odds, 1 / odds, Quote(sids[row], bids[row], raws[row], self.tables)) for odds, row in quotes[:limit]
+            ])
+        return groups
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'event_id': self.event_id,
+            'market': self.market,
+            'selections': [quote.to_dict() for quote in self]
+        }
+
+    def __repr__(self) -> str:
+        return f"MarketBook({self.event_id!r}, {self.market!r}, {len(self)} cotações)"
@@ -1,7 +1,8 @@
 from fastapi import FastAPI, WebSocket
-from typing import List
+from typing import Any, Dict, List, Union
 import requests
 from config import settings
+from backend.core.json_codec import dumps
 import asyncio
 
 app = FastAPI()
@@ -21,7 +22,10 @@ async def websocket_endpoint(websocket: WebSocket):
     finally:
         active_connections.remove(websocket)
 
-async def send_notification(message: str):
+async def send_notification(message: Union[str, Dict[str, Any]]):
+    """Envia a mensagem a todos os clientes; dicts são serializados uma única vez."""
+    if not isinstance(message, str):
+        message = dumps(message)
     for connection in active_connections:
         await connection.send_text(message)
 
@@ -0,0 +1,232 @@
+"""
+Detecção de surebets em paralelo, particionada por evento.
+
+Os eventos são distribuídos entre processos pelo hash de `event_id` e cada
+partição viaja num formato colunar compacto (tabelas de nomes e casas
+internadas + vetores numpy de índices e odds), em vez de listas de dicts
+serializadas uma a uma. Os processos devolvem apenas (evento, índice, linhas
+das seleções); as surebets são remontadas no processo principal com as
+seleções originais e intercaladas por lucro decrescente.
+
+`/api/opportunities` e o dashboard detectam por `get_parallel_detector()`:
+abaixo de `DETECTION_PARALLEL_MIN_EVENTS` livros a varredura continua sendo
+a de `SurebetDetector.stream_surebets`, no próprio processo.
+"""
+
+import os
+import atexit
+import heapq
+import threading
+import zlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import settings
+from backend.services.arbitrage import EffectiveOddsTransform, SurebetDetector
+from backend.services.models import MarketBook
+
+logger = logging.getLogger(__name__)
+
+# Modos de detecção: todas as combinações ou a melhor por mercado
+MODE_ALL = 'all'
+MODE_BEST = 'best'
+
+# Resultado compacto devolvido pelos processos: (posição do mercado na partição, índice, linhas)
+_ShardResult = Tuple[int, float, Tuple[int, ...]]
+
+
+def encode_shard(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Codifica uma lista de mercados no formato de `SurebetDetector.find_surebets`
+    em colunas: nomes e casas viram índices em tabelas, as odds um vetor float64
+    e `offsets[i]:offsets[i + 1]` delimita as seleções do mercado i.
+    """
+    names: Dict[str, int] = {}
+    bookmakers: Dict[str, int] = {}
+    offsets = np.zeros(len(events) + 1, dtype=np.int64)
+    name_idx: List[int] = []
+    book_idx: List[int] = []
+    odds: List[float] = []
+
+    for i, event in enumerate(events):
+        for s in event['selections']:
+            name_idx.append(names.setdefault(s['name'], len(names)))
+            book_idx.append(bookmakers.setdefault(s['bookmaker'], len(bookmakers)))
+            odds.append(s.get('odds') or 0.0)
+        offsets[i + 1] = len(odds)
+
+    return {
+        'names': list(names),
+        'bookmakers': list(bookmakers),
+        'offsets': offsets,
+        'name_idx': np.asarray(name_idx, dtype=np.int32),
+        'book_idx': np.asarray(book_idx, dtype=np.int32),
+        'odds': np.asarray(odds, dtype=np.float64),
+    }
+
+
+def decode_shard(shard: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Reconstrói mercados leves a partir de `encode_shard`; cada seleção guarda sua linha em 'row'."""
+    names, bookmakers = shard['names'], shard['bookmakers']
+    offsets = shard['offsets'].tolist()
+    name_idx = shard['name_idx'].tolist()
+    book_idx = shard['book_idx'].tolist()
+    odds = shard['odds'].tolist()
+
+    events = []
+    for i in range(len(offsets) - 1):
+        events.append({
+            'event_id': i,
+            'market': None,
+            'selections': [
+                {'name': names[name_idx[r]], 'odds': odds[r], 'bookmaker': bookmakers[book_idx[r]], 'row': r}
+                for r in range(offsets[i], offsets[i + 1])
+            ]
+        })
+    return events
+
+
+def _detect_shard(shard: Dict[str, Any], mode: str,
+                  transform: Optional[EffectiveOddsTransform]) -> List[_ShardResult]:
+    """Executado no processo filho: detecta na partição e devolve só índices."""
+    events = decode_shard(shard)
+    if mode == MODE_BEST:
+        found = SurebetDetector.find_best_surebets(events, transform=transform)
+    else:
+        found = SurebetDetector.find_surebets(events, transform=transform)
+    return [
+        (s['event_id'], s['arbitrage_index'], tuple(sel['row'] for sel in s['selections']))
+        for s in found
+    ]
+
+
+class ParallelSurebetDetector:
+    """
+    Executa `SurebetDetector` em um `ProcessPoolExecutor`, particionando os
+    mercados por hash de `event_id` (todos os mercados de um evento ficam no
+    mesmo processo).
+
+    Abaixo de `min_events` mercados a detecção roda no próprio processo,
+    pois o custo de serialização supera o ganho. O pool é criado sob demanda
+    e reaproveitado entre chamadas; use `close()` ou o gerenciador de contexto
+    para encerrá-lo.
+    """
+
+    def __init__(self, workers: Optional[int] = None, min_events: Optional[int] = None, mode: str = MODE_ALL):
+        if mode not in (MODE_ALL, MODE_BEST):
+            raise ValueError(f"Modo de detecção inválido: {mode}")
+        self.workers = workers or settings.DETECTION_WORKERS or os.cpu_count() or 1
+        self.min_events = settings.DETECTION_PARALLEL_MIN_EVENTS if min_events is None else min_events
+        self.mode = mode
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'ParallelSurebetDetector':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def find_surebets(self, events: List[Dict[str, Any]],
+                      transform: Optional[EffectiveOddsTransform] = None) -> List[Dict[str, Any]]:
+        """Mesmo resultado de `SurebetDetector.find_surebets` (ou `find_best_surebets`), em paralelo."""
+        return self._find(events, self.mode, transform)
+
+    def best_surebets(self, books: List[MarketBook], min_profit: float = 0.0, limit: Optional[int] = None,
+                      bookmakers: Optional[Iterable[str]] = None,
+                      predicate: Optional[Callable[[MarketBook], bool]] = None,
+                      transform: Optional[EffectiveOddsTransform] = None) -> List[Dict[str, Any]]:
+        """
+        Melhor surebet de cada livro, com os filtros de
+        `SurebetDetector.stream_surebets`, em ordem de lucro decrescente.
+        Abaixo de `min_events` livros delega para `stream_surebets`; acima,
+        os filtros são aplicados antes de particionar e as seleções das
+        surebets continuam sendo as `Quote` dos livros.
+        """
+        if self.workers <= 1 or len(books) < self.min_events:
+            surebets = SurebetDetector.stream_surebets(books, min_profit=min_profit, limit=limit,
+                                                       bookmakers=bookmakers, predicate=predicate,
+                                                       transform=transform)
+            return list(surebets) if limit is not None else sorted(
+                surebets, key=lambda s: s['profit_percent'], reverse=True)
+
+        allowed = set(bookmakers) if bookmakers else None
+        max_index = 1 - min_profit / 100
+        markets = []
+        for book in books:
+            if predicate is not None and not predicate(book):
+                continue
+            if book.best_implied_sum() > max_index:
+                continue
+            quotes = [q for q in book if allowed is None or q['bookmaker'] in allowed]
+            markets.append({'event_id': book.event_id, 'market': book.market, 'selections': quotes})
+
+        surebets = [s for s in self._find(markets, MODE_BEST, transform) if s['profit_percent'] >= min_profit]
+        return surebets[:limit] if limit is not None else surebets
+
+    def _find(self, events: List[Dict[str, Any]], mode: str,
+              transform: Optional[EffectiveOddsTransform]) -> List[Dict[str, Any]]:
+        if self.workers <= 1 or len(events) < self.min_events:
+            if mode == MODE_BEST:
+                return SurebetDetector.find_best_surebets(events, transform=transform)
+            return SurebetDetector.find_surebets(events, transform=transform)
+
+        shards = self.shard(events, self.workers)
+        executor = self._get_executor()
+        futures = [
+            (shard, executor.submit(_detect_shard, encode_shard(shard), mode, transform))
+            for shard in shards if shard
+        ]
+
+        partials = []
+        for shard, future in futures:
+            rows = [s for event in shard for s in event['selections']]
+            partials.append([
+                SurebetDetector._build_surebet(shard[position], [rows[r] for r in selection_rows], arb_index)
+                for position, arb_index, selection_rows in future.result()
+            ])
+
+        # Cada partição já vem ordenada por lucro; basta intercalar
+        return list(heapq.merge(*partials, key=lambda s: s['profit_percent'], reverse=True))
+
+    @staticmethod
+    def shard(events: List[Dict[str, Any]], n_shards: int) -> List[List[Dict[str, Any]]]:
+        """Particiona os mercados por CRC32 de `event_id` (estável entre processos e execuções)."""
+        shards: List[List[Dict[str, Any]]] = [[] for _ in range(n_shards)]
+        for event in events:
+            key = str(event['event_id']).encode('utf-8')
+            shards[zlib.crc32(key) % n_shards].append(event)
+        return shards
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            logger.info(f"Pool de detecção iniciado com {self.workers} processos")
+        return self._executor
+
+
+_detector: Optional[ParallelSurebetDetector] = None
+_detector_lock = threading.Lock()
+
+
+def get_parallel_detector() -> ParallelSurebetDetector:
+    """
+    Detector global no modo `MODE_BEST`, configurado por `DETECTION_WORKERS`
+    e `DETECTION_PARALLEL_MIN_EVENTS`. O pool só é criado na primeira
+    detecção acima do limite e é encerrado na saída do processo.
+    """
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                detector = ParallelSurebetDetector(mode=MODE_BEST)
+                atexit.register(detector.close)
+                _detector = detector
+    return _detector
@@ -0,0 +1,196 @@
+"""
+Prioridade de atualização por evento.
+
+Cada evento recebe um intervalo de atualização a partir de:
+- `status`: ao vivo parte de `INGEST_LIVE_INTERVAL`;
+- proximidade do início: eventos futuros usam o tempo até o início dividido
+  por `INGEST_KICKOFF_RATIO` (1h antes -> 60s, 15min antes -> 15s);
+- volatilidade recente: a variação média das odds (`odds_history.change_percentage`
+  e as mudanças observadas entre coletas) encurta o intervalo na proporção
+  1 / (1 + volatilidade / `INGEST_VOLATILITY_REF`).
+
+Os intervalos ficam entre `INGEST_MIN_INTERVAL` e `INGEST_MAX_INTERVAL`. A
+SportRadar entrega os eventos de um esporte numa única requisição, então o
+scheduler usa o menor intervalo entre os eventos de um feed como o ritmo do
+feed: feeds com jogos ao vivo voláteis ou prestes a começar são consultados
+com frequência, feeds só com jogos distantes quase não gastam requisições.
+"""
+
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Peso da observação mais recente na média móvel de volatilidade
+VOLATILITY_DECAY = 0.5
+
+
+def parse_start_time(value: Any) -> Optional[datetime]:
+    """Início do evento como datetime (ISO 8601 ou timestamp); None se inválido."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class RefreshPolicy:
+    """Calcula intervalos de atualização por evento e por feed."""
+
+    def __init__(self, live_interval: Optional[float] = None, upcoming_interval: Optional[float] = None,
+                 min_interval: Optional[float] = None, max_interval: Optional[float] = None,
+                 kickoff_ratio: Optional[float] = None, volatility_ref: Optional[float] = None,
+                 now: Callable[[], datetime] = datetime.now):
+        self.live_interval = settings.INGEST_LIVE_INTERVAL if live_interval is None else live_interval
+        self.upcoming_interval = settings.INGEST_UPCOMING_INTERVAL if upcoming_interval is None else upcoming_interval
+        self.min_interval = settings.INGEST_MIN_INTERVAL if min_interval is None else min_interval
+        self.max_interval = settings.INGEST_MAX_INTERVAL if max_interval is None else max_interval
+        self.kickoff_ratio = settings.INGEST_KICKOFF_RATIO if kickoff_ratio is None else kickoff_ratio
+        self.volatility_ref = settings.INGEST_VOLATILITY_REF if volatility_ref is None else volatility_ref
+        self.now = now
+
+    def _clamp(self, interval: float) -> float:
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _seconds_to_start(self, event: Dict[str, Any]) -> Optional[float]:
+        start = parse_start_time(event.get('start_time'))
+        if start is None:
+            return None
+        now = self.now()
+        if start.tzinfo is not None and now.tzinfo is None:
+            now = now.astimezone()
+        elif start.tzinfo is None and now.tzinfo is not None:
+            start = start.replace(tzinfo=now.tzinfo)
+        return (start - now).total_seconds()
+
+    def event_interval(self, event: Dict[str, Any], volatility: float = 0.0) -> float:
+        """Intervalo de atualização do evento, em segundos."""
+        if event.get('status') == 'live':
+            base = self.live_interval
+        else:
+            seconds = self._seconds_to_start(event)
+            if seconds is None:
+                base = self.upcoming_interval
+            elif seconds <= 0:
+                # Já deveria ter começado: trata como ao vivo
+                base = self.live_interval
+            else:
+                base = seconds / self.kickoff_ratio
+        if volatility > 0 and self.volatility_ref > 0:
+            base /= 1 + volatility / self.volatility_ref
+        return self._clamp(base)
+
+    def feed_interval(self, status: str, events: Iterable[Dict[str, Any]],
+                      volatility: Optional[Callable[[Any], float]] = None) -> float:
+        """
+        Ritmo do feed: o menor intervalo entre os seus eventos. Sem eventos, o
+        intervalo padrão do status (para descobrir jogos novos).
+        """
+        intervals = [
+            self.event_interval(event, volatility(event.get('id')) if volatility else 0.0)
+            for event in events
+        ]
+        if not intervals:
+            return self._clamp(self.live_interval if status == 'live' else self.upcoming_interval)
+        # Ao vivo nunca fica mais lento que o intervalo padrão de ao vivo
+        ceiling = self._clamp(self.live_interval) if status == 'live' else self.max_interval
+        return min(min(intervals), ceiling)
+
+
+class VolatilityTracker:
+    """
+    Volatilidade recente por evento: a maior entre a média móvel da variação
+    absoluta (%) das odds observada nas coletas e a média do histórico do
+    banco. As odds de cada casa são comparadas só com a coleta anterior da
+    mesma casa. O histórico é uma linha de base substituída a cada carga, e
+    não entra na média móvel: recarregar a mesma janela não infla o valor.
+    """
+
+    def __init__(self, decay: float = VOLATILITY_DECAY):
+        self.decay = decay
+        self._odds: Dict[tuple, Dict[tuple, float]] = {}
+        self._volatility: Dict[Any, float] = {}
+        self._history: Dict[Any, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, event_id: Any) -> float:
+        return max(self._volatility.get(event_id, 0.0), self._history.get(event_id, 0.0))
+
+    def _update(self, event_id: Any, change: float) -> None:
+        # Chamado com o lock adquirido
+        previous = self._volatility.get(event_id)
+        self._volatility[event_id] = change if previous is None else \
+            self.decay * change + (1 - self.decay) * previous
+
+    def observe(self, events: Iterable[Dict[str, Any]]) -> None:
+        """Compara as odds de cada evento com a coleta anterior e atualiza a volatilidade."""
+        with self._lock:
+            for event in events:
+                event_id = event.get('id')
+                current = {}
+                for market in event.get('markets') or []:
+                    market_key = market.get('type') or market.get('name')
+                    for selection in market.get('selections') or []:
+                        odds = selection.get('odds')
+                        if isinstance(odds, (int, float)) and odds > 0:
+                            current[market_key, selection.get('name')] = float(odds)
+                odds_key = (event.get('bookmaker'), event_id)
+                previous = self._odds.get(odds_key)
+                self._odds[odds_key] = current
+                if not previous:
+                    continue
+                changes = [abs(odds - previous[key]) / previous[key] * 100
+                           for key, odds in current.items() if key in previous]
+                if changes:
+                    self._update(event_id, sum(changes) / len(changes))
+
+    def settle(self, event_ids: Iterable[Any]) -> None:
+        """Registra variação zero para eventos cujas odds não mudaram desde a última coleta."""
+        with self._lock:
+            for event_id in event_ids:
+                if event_id in self._volatility:
+                    self._update(event_id, 0.0)
+
+    def merge(self, history: Dict[Any, float]) -> None:
+        """Substitui a linha de base histórica (ex.: `load_odds_volatility`) pela janela informada."""
+        history = {event_id: abs(change) for event_id, change in history.items()}
+        with self._lock:
+            self._history = history
+
+    def forget(self, keep: Iterable[Any]) -> None:
+        """Descarta eventos que saíram de todos os feeds."""
+        keep = set(keep)
+        with self._lock:
+            for odds_key in [k for k in self._odds if k[1] not in keep]:
+                del self._odds[odds_key]
+            for event_id in [e for e in self._volatility if e not in keep]:
+                del self._volatility[event_id]
+            self._history = {e: change for e, change in self._history.items() if e in keep}
+
+
+def load_odds_volatility(db: Any, minutes: int = 30) -> Dict[str, float]:
+    """
+    Variação absoluta média (%) das odds de cada evento nos últimos `minutes`
+    minutos, a partir de `odds_history`, indexada pelo `external_id` do evento.
+    """
+    rows = db.fetch(
+        """
+        SELECT e.external_id AS event_id, AVG(ABS(h.change_percentage)) AS volatility
+        FROM odds_history h
+        JOIN selections s ON s.id = h.selection_id
+        JOIN events e ON e.id = s.event_id
+        WHERE h.changed_at >= datetime('now', ?) AND e.external_id IS NOT NULL
+        GROUP BY e.external_id
+        """,
+        (f'-{int(minutes)} minutes',)
+    )
+    return {row['event_id']: row['volatility'] or 0.0 for row in rows}
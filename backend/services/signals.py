@@ -0,0 +1,207 @@
+"""
+Detecção de middles e value bets sobre o índice de arbitragem.
+
+Reaproveita as estruturas do `ArbitrageIndex` (livros por seleção com a
+melhor odd de cada casa) para produzir, numa única passada pelos mercados
+indexados, os três tipos de sinal:
+
+- surebets: já mantidas incrementalmente pelo índice;
+- value bets: odd de uma casa acima da odd justa de uma casa de referência
+  (sharp, por padrão a Pinnacle), com a margem removida proporcionalmente;
+- middles: lados opostos de linhas diferentes cujos resultados se sobrepõem,
+  identificados pelas máscaras da `CoverageTable` — em totais (Over 2.5 @ A
+  + Under 3.5 @ B ganham juntas com exatamente 3 gols) e em handicaps
+  (Casa -1.5 @ A + Visitante +2.5 @ B ganham juntas com vitória do mandante
+  por exatamente 2 gols).
+
+`/api/signals/<status>` roda o motor sobre o índice alimentado pela coleta.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.services.arbitrage_index import ArbitrageIndex, MarketState
+from backend.services.cross_market import CoverageTable, GOALS_SPACE, MARGIN_SPACE, MAX_GOALS, MAX_MARGIN
+
+logger = logging.getLogger(__name__)
+
+# Tipos de sinal
+SIGNAL_SUREBET = 'surebet'
+SIGNAL_VALUE_BET = 'value_bet'
+SIGNAL_MIDDLE = 'middle'
+
+# Espaços com linhas: espaço -> (bits, campo do middle no sinal, valor do bit 0).
+# A perna "alta" (Over, mandante) cobre o último bit e a "baixa" (Under, visitante) o primeiro.
+_LINE_SPACES = {
+    GOALS_SPACE: (MAX_GOALS + 1, 'middle_goals', 0),
+    MARGIN_SPACE: (2 * MAX_MARGIN + 1, 'middle_margins', -MAX_MARGIN),
+}
+
+# (máscara, mercado, seleção, duas melhores cotações) de uma perna de middle
+_LineEntry = Tuple[int, str, str, List[Tuple[float, str]]]
+
+
+class SignalEngine:
+    """
+    Motor de sinais que percorre o `ArbitrageIndex` uma vez por `scan()`.
+
+    `min_edge` é o valor esperado mínimo de uma value bet (0.02 = +2%) e
+    `max_middle_loss` a perda máxima aceita, em %, quando apenas uma das
+    pernas do middle ganha.
+    """
+
+    def __init__(self, index: ArbitrageIndex, sharp_bookmaker: str = 'pinnacle',
+                 min_edge: float = 0.02, max_middle_loss: float = 2.0,
+                 table: Optional[CoverageTable] = None):
+        self.index = index
+        self.sharp_bookmaker = sharp_bookmaker
+        self.min_edge = min_edge
+        self.max_middle_loss = max_middle_loss
+        self.table = table or CoverageTable()
+
+    @classmethod
+    def from_events(cls, events: List[Any], **kwargs) -> 'SignalEngine':
+        """Cria um índice a partir de mercados no formato do detector (ou `MarketBook`) e o motor sobre ele."""
+        index = ArbitrageIndex()
+        index.ingest(events)
+        return cls(index, **kwargs)
+
+    def scan(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Surebets, value bets e middles, cada lista em ordem decrescente de valor."""
+        surebets: List[Dict[str, Any]] = []
+        value_bets: List[Dict[str, Any]] = []
+        middles: List[Dict[str, Any]] = []
+
+        with self.index.lock:
+            by_event: Dict[Any, List[MarketState]] = {}
+            for state in self.index.markets():
+                if state.surebet is not None:
+                    surebets.append(dict(state.surebet, type=SIGNAL_SUREBET))
+                value_bets.extend(self._value_bets(state))
+                by_event.setdefault(state.event_id, []).append(state)
+
+            for event_id, states in by_event.items():
+                middles.extend(self._middles(event_id, states))
+
+        surebets.sort(key=lambda s: s['profit_percent'], reverse=True)
+        value_bets.sort(key=lambda s: s['edge_percent'], reverse=True)
+        middles.sort(key=lambda s: s['loss_percent'])
+        return {'surebets': surebets, 'value_bets': value_bets, 'middles': middles}
+
+    def _value_bets(self, state: MarketState) -> List[Dict[str, Any]]:
+        """Compara a melhor odd de outras casas com a odd justa da casa de referência."""
+        signals = []
+        for names in self._complementary_groups(state):
+            sharp = [state.outcomes[name].quotes.get(self.sharp_bookmaker) for name in names]
+            if len(sharp) < 2 or not all(sharp):
+                continue
+
+            # Remoção proporcional da margem da casa de referência
+            overround = sum(1 / odds for odds in sharp)
+            for name, sharp_odds in zip(names, sharp):
+                fair_probability = (1 / sharp_odds) / overround
+                best = next((q for q in state.outcomes[name].top(2) if q[1] != self.sharp_bookmaker), None)
+                if best is None:
+                    continue
+                edge = best[0] * fair_probability - 1
+                if edge >= self.min_edge:
+                    signals.append({
+                        'type': SIGNAL_VALUE_BET,
+                        'event_id': state.event_id,
+                        'market': state.market,
+                        'selection': name,
+                        'bookmaker': best[1],
+                        'odds': best[0],
+                        'fair_odds': 1 / fair_probability,
+                        'edge_percent': edge * 100
+                    })
+        return signals
+
+    def _complementary_groups(self, state: MarketState) -> List[List[str]]:
+        """
+        Seleções que formam um conjunto completo de resultados. Um mercado de
+        totais ou de handicap com várias linhas vira um par de lados opostos
+        por linha; nos demais, o mercado inteiro é um único grupo.
+        """
+        masks: Dict[int, str] = {}
+        spaces = set()
+        for name in state.outcomes:
+            coverage = self.table.resolve(state.market, {'name': name})
+            if coverage is None or coverage[0] not in _LINE_SPACES:
+                return [list(state.outcomes)]
+            spaces.add(coverage[0])
+            masks[coverage[1]] = name
+        if len(spaces) != 1:
+            return [list(state.outcomes)]
+        full = (1 << _LINE_SPACES[spaces.pop()][0]) - 1
+        return [
+            [name, masks[full & ~mask]]
+            for mask, name in masks.items()
+            if mask & 1 == 0 and full & ~mask in masks
+        ]
+
+    def _middles(self, event_id: Any, states: List[MarketState]) -> List[Dict[str, Any]]:
+        """
+        Pares de lados opostos de linhas sobrepostas no mesmo evento: Over/Under
+        no espaço de gols e mandante/visitante no espaço de saldo de gols.
+        """
+        highs: Dict[str, List[_LineEntry]] = {space: [] for space in _LINE_SPACES}
+        lows: Dict[str, List[_LineEntry]] = {space: [] for space in _LINE_SPACES}
+        for state in states:
+            for name, book in state.outcomes.items():
+                coverage = self.table.resolve(state.market, {'name': name})
+                if coverage is None or coverage[0] not in _LINE_SPACES:
+                    continue
+                quotes = book.top(2)
+                if not quotes:
+                    continue
+                space, mask = coverage
+                entry = (mask, state.market, name, quotes)
+                if mask & (1 << (_LINE_SPACES[space][0] - 1)):
+                    highs[space].append(entry)
+                elif mask & 1:
+                    lows[space].append(entry)
+
+        signals = []
+        for space, (bits, field, offset) in _LINE_SPACES.items():
+            full = (1 << bits) - 1
+            for high_mask, high_market, high_name, high_quotes in highs[space]:
+                for low_mask, low_market, low_name, low_quotes in lows[space]:
+                    overlap = high_mask & low_mask
+                    if not overlap or (high_mask | low_mask) != full:
+                        continue
+                    legs = self._pick_legs(high_quotes, low_quotes)
+                    if legs is None:
+                        continue
+                    (high_odds, high_book), (low_odds, low_book) = legs
+                    arb_index = 1 / high_odds + 1 / low_odds
+                    loss_percent = (1 - 1 / arb_index) * 100
+                    if loss_percent > self.max_middle_loss:
+                        continue
+                    signals.append({
+                        'type': SIGNAL_MIDDLE,
+                        'event_id': event_id,
+                        'space': space,
+                        'selections': (
+                            {'market': high_market, 'name': high_name, 'odds': high_odds, 'bookmaker': high_book},
+                            {'market': low_market, 'name': low_name, 'odds': low_odds, 'bookmaker': low_book},
+                        ),
+                        field: [bit + offset for bit in range(bits) if overlap >> bit & 1],
+                        'arbitrage_index': arb_index,
+                        'loss_percent': loss_percent,
+                        'middle_profit_percent': (2 / arb_index - 1) * 100
+                    })
+        return signals
+
+    @staticmethod
+    def _pick_legs(high_quotes: List[Tuple[float, str]],
+                   low_quotes: List[Tuple[float, str]]) -> Optional[Tuple[Tuple[float, str], Tuple[float, str]]]:
+        """Melhor par de cotações em casas distintas entre as duas melhores de cada perna."""
+        best = None
+        for high in high_quotes:
+            for low in low_quotes:
+                if high[1] == low[1]:
+                    continue
+                if best is None or 1 / high[0] + 1 / low[0] < 1 / best[0][0] + 1 / best[1][0]:
+                    best = (high, low)
+        return best
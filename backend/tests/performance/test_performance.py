@@ -4,6 +4,8 @@
 Testes para medir e validar performance do sistema.
 """
 
+import os
+import sys
 import pytest
 import time
 import threading
@@ -14,6 +16,8 @@ import logging
 
 from database.database import get_db
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
 
 class TestDatabasePerformance:
     """Testes de performance do banco de dados."""
@@ -328,6 +332,312 @@ class TestArbitragePerformance:
             
             logging.info(f"Stake calculation: avg={avg_calc_time:.3f}ms per opportunity")
 
+    @staticmethod
+    def _generate_market_events(n_events, n_books, n_outcomes, seed=123):
+        """Gera eventos sintéticos com margem típica de casa de apostas."""
+        rng = random.Random(seed)
+        events = []
+        for e in range(n_events):
+            weights = [rng.uniform(0.5, 1.5) for _ in range(n_outcomes)]
+            total = sum(weights)
+            selections = []
+            for b in range(n_books):
+                margin = rng.uniform(0.02, 0.06)
+                for o in range(n_outcomes):
+                    selections.append({
+                        'name': f'sel_{o}',
+                        'odds': round(total / weights[o] / (1 + margin) * rng.uniform(0.96, 1.04), 2),
+                        'bookmaker': f'book_{b}'
+                    })
+            events.append({'event_id': f'evt_{e}', 'market': 'test', 'selections': selections})
+        return events
+
+    @staticmethod
+    def _legacy_find_surebets(events):
+        """Implementação original via produto cartesiano, usada como referência."""
+        import itertools
+        from backend.services.arbitrage import SurebetDetector
+
+        surebets = []
+        for event in events:
+            selections = event['selections']
+            selection_names = list({s['name'] for s in selections})
+            combos = list(itertools.product(*[
+                [s for s in selections if s['name'] == sel] for sel in selection_names
+            ]))
+            for combo in combos:
+                bookmakers = [s['bookmaker'] for s in combo]
+                if len(set(bookmakers)) != len(bookmakers):
+                    continue
+                arb_index = SurebetDetector.calculate_arbitrage([s['odds'] for s in combo])
+                if arb_index < 1:
+                    surebets.append({'event_id': event['event_id'], 'selections': combo})
+        return surebets
+
+    @pytest.mark.performance
+    def test_surebet_engine_speedup(self, benchmark_timer):
+        """Compara o motor por melhor odd com o produto cartesiano original."""
+        from backend.services.arbitrage import SurebetDetector
+
+        events = self._generate_market_events(n_events=100, n_books=15, n_outcomes=3)
+
+        benchmark_timer.start()
+        legacy = self._legacy_find_surebets(events)
+        benchmark_timer.stop()
+        legacy_ms = benchmark_timer.elapsed_ms()
+
+        benchmark_timer.start()
+        surebets = SurebetDetector.find_surebets(events)
+        benchmark_timer.stop()
+        engine_ms = benchmark_timer.elapsed_ms()
+
+        assert {(s['event_id'], frozenset(id(x) for x in s['selections'])) for s in surebets} == \
+            {(s['event_id'], frozenset(id(x) for x in s['selections'])) for s in legacy}
+        assert engine_ms * 10 < legacy_ms  # Pelo menos 10x mais rápido
+
+        logging.info(f"Surebet engine: legacy={legacy_ms:.2f}ms, engine={engine_ms:.2f}ms, speedup={legacy_ms / engine_ms:.1f}x")
+
+    @pytest.mark.performance
+    def test_correct_score_market_scan(self, benchmark_timer):
+        """Mercados de placar exato (12 seleções, 15 casas) são inviáveis no produto cartesiano."""
+        from backend.services.arbitrage import SurebetDetector
+
+        events = self._generate_market_events(n_events=500, n_books=15, n_outcomes=12)
+
+        benchmark_timer.start()
+        SurebetDetector.find_best_surebets(events)
+        benchmark_timer.stop()
+
+        assert benchmark_timer.elapsed_ms() < 500
+        logging.info(f"Correct score scan: 500 events in {benchmark_timer.elapsed_ms():.2f}ms")
+
+    @pytest.mark.performance
+    def test_batch_tensor_scan(self, benchmark_timer):
+        """Varredura vetorizada de 10k mercados x 3 seleções x 15 casas."""
+        import numpy as np
+        from backend.services.arbitrage import SurebetDetector
+
+        rng = np.random.default_rng(1)
+        probabilities = rng.dirichlet(np.ones(3), size=(1000, 10))
+        margins = rng.uniform(1.03, 1.08, size=(1000, 10, 1, 15))
+        noise = rng.uniform(0.98, 1.02, size=(1000, 10, 3, 15))
+        odds = np.round(noise / (probabilities[..., None] * margins), 2)
+        odds[rng.random(odds.shape) < 0.1] = np.nan
+
+        benchmark_timer.start()
+        result = SurebetDetector.scan_odds_tensor(odds, total_stake=1000)
+        benchmark_timer.stop()
+
+        assert result['implied_sum'].shape == (1000, 10)
+        assert benchmark_timer.elapsed_ms() < 500
+        logging.info(f"Batch scan: 10k markets in {benchmark_timer.elapsed_ms():.2f}ms, "
+                     f"{int(result['is_surebet'].sum())} surebets")
+
+    @pytest.mark.performance
+    def test_incremental_index_tick_rate(self, benchmark_timer):
+        """Cada delta de odd reavalia apenas o mercado tocado."""
+        from backend.services.arbitrage_index import ArbitrageIndex
+
+        rng = random.Random(5)
+        index = ArbitrageIndex(outcomes_per_market={'1X2': 3})
+        for e in range(2000):
+            for b in range(15):
+                for s in range(3):
+                    index.update(f'evt_{e}', '1X2', f'book_{b}', f'sel_{s}', round(rng.uniform(2.5, 2.9), 2))
+
+        ticks = [
+            (f'evt_{rng.randrange(2000)}', '1X2', f'book_{rng.randrange(15)}', f'sel_{rng.randrange(3)}',
+             round(rng.uniform(2.5, 3.1), 2))
+            for _ in range(20000)
+        ]
+        benchmark_timer.start()
+        for tick in ticks:
+            index.update(*tick)
+        benchmark_timer.stop()
+
+        per_tick_us = benchmark_timer.elapsed_ms() * 1000 / len(ticks)
+        assert per_tick_us < 100  # < 100µs por delta, independente do tamanho do livro
+        logging.info(f"Incremental index: {per_tick_us:.2f}µs per tick over 2000 markets")
+
+    @pytest.mark.performance
+    def test_batch_stake_calculation_performance(self, benchmark_timer):
+        """Stakes com limites, comissão e arredondamento para 10k oportunidades."""
+        import numpy as np
+        from backend.services.arbitrage import StakeCalculator
+
+        rng = np.random.default_rng(2)
+        odds = rng.uniform(2.0, 4.0, size=(10000, 3))
+        odds[rng.random(10000) < 0.3, 2] = np.nan
+        commission = np.where(rng.random((10000, 3)) < 0.25, 0.05, 0.0)
+        max_stakes = np.where(rng.random((10000, 3)) < 0.2, 250.0, 0.0)
+
+        calculator = StakeCalculator(rounding=0.5)
+        benchmark_timer.start()
+        result = calculator.calculate(odds, total_stake=1000, min_stakes=2.0,
+                                      max_stakes=max_stakes, commission=commission)
+        benchmark_timer.stop()
+
+        assert result['stakes'].shape == (10000, 3)
+        assert benchmark_timer.elapsed_ms() < 100
+        logging.info(f"Batch stakes: 10k opportunities in {benchmark_timer.elapsed_ms():.2f}ms")
+
+    @pytest.mark.performance
+    def test_cross_market_scan(self, benchmark_timer):
+        """Coberturas entre 1X2, Dupla Chance e várias linhas de gols com poda."""
+        from backend.services.cross_market import CrossMarketDetector
+
+        rng = random.Random(8)
+        lines = [0.5, 1.5, 2.5, 3.5, 4.5, 5.5]
+        events = []
+        for e in range(2000):
+            probs = {'Casa': 0.45, 'Empate': 0.27, 'Visitante': 0.28}
+            dc = {'1X': 0.72, '12': 0.73, 'X2': 0.55}
+            markets = [('1X2', probs), ('DC', dc)]
+            for line in lines:
+                over = min(0.95, max(0.05, 1 - line / 5))
+                markets.append(('OU', {f'Mais de {line}': over, f'Menos de {line}': 1 - over}))
+            for market_type, outcome_probs in markets:
+                selections = [
+                    {'name': name, 'bookmaker': f'book_{b}',
+                     'odds': round(1 / (p * 1.05) * rng.uniform(0.96, 1.05), 2)}
+                    for name, p in outcome_probs.items() for b in range(8)
+                ]
+                events.append({'event_id': f'evt_{e}', 'market': market_type, 'selections': selections})
+
+        detector = CrossMarketDetector()
+        benchmark_timer.start()
+        surebets = detector.find_surebets(events)
+        benchmark_timer.stop()
+
+        assert all(s['arbitrage_index'] < 1 for s in surebets)
+        assert benchmark_timer.elapsed_ms() < 2000
+        logging.info(f"Cross-market scan: 2000 events x 8 markets in {benchmark_timer.elapsed_ms():.2f}ms, "
+                     f"{len(surebets)} surebets")
+
+    @pytest.mark.performance
+    def test_parallel_detection_scaling(self, benchmark_timer):
+        """Detecção particionada por evento deve escalar com os núcleos disponíveis."""
+        from backend.services.arbitrage import SurebetDetector
+        from backend.services.parallel import ParallelSurebetDetector
+
+        cores = os.cpu_count() or 1
+        if cores < 4:
+            pytest.skip("Requer ao menos 4 núcleos")
+
+        events = self._generate_market_events(20000, 12, 3)
+        benchmark_timer.start()
+        serial = SurebetDetector.find_surebets(events)
+        benchmark_timer.stop()
+        serial_ms = benchmark_timer.elapsed_ms()
+
+        with ParallelSurebetDetector(workers=cores, min_events=0) as detector:
+            detector.find_surebets(events[:100])  # aquece o pool
+            benchmark_timer.start()
+            parallel = detector.find_surebets(events)
+            benchmark_timer.stop()
+
+        assert len(parallel) == len(serial)
+        assert benchmark_timer.elapsed_ms() < serial_ms / 1.5
+        logging.info(f"Parallel detection: {serial_ms:.0f}ms serial vs "
+                     f"{benchmark_timer.elapsed_ms():.0f}ms on {cores} cores")
+
+    @pytest.mark.performance
+    def test_market_book_memory_and_scan(self, benchmark_timer):
+        """Livros em colunas com nomes internados versus listas de dicts."""
+        import tracemalloc
+        from backend.services.arbitrage import SurebetDetector
+        from backend.services.models import MarketBook
+
+        events = self._generate_market_events(5000, 15, 3)
+        for event in events:
+            for s in event['selections']:
+                s['name'] = ''.join(s['name'])  # nomes sem internação, como vindos do JSON
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        copies = [
+            {'event_id': e['event_id'], 'market': e['market'], 'selections': [dict(s) for s in e['selections']]}
+            for e in events
+        ]
+        dict_bytes = tracemalloc.get_traced_memory()[0] - before
+        before = tracemalloc.get_traced_memory()[0]
+        books = [MarketBook.from_selections(e['event_id'], e['market'], e['selections']) for e in events]
+        book_bytes = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        benchmark_timer.start()
+        from_books = SurebetDetector.find_best_surebets(books)
+        benchmark_timer.stop()
+        books_ms = benchmark_timer.elapsed_ms()
+
+        benchmark_timer.start()
+        from_dicts = SurebetDetector.find_best_surebets(copies)
+        benchmark_timer.stop()
+
+        assert len(from_books) == len(from_dicts)
+        assert book_bytes * 3 < dict_bytes
+        logging.info(f"MarketBook: {book_bytes / 225000:.1f} vs {dict_bytes / 225000:.1f} bytes/quote, "
+                     f"scan {books_ms:.0f}ms vs {benchmark_timer.elapsed_ms():.0f}ms")
+
+    @pytest.mark.performance
+    def test_top_k_stream_prunes_scan(self, benchmark_timer):
+        """"Top 50 acima de 2%" não deve pagar pela varredura completa."""
+        from backend.services.arbitrage import SurebetDetector
+        from backend.services.models import MarketBook
+
+        events = self._generate_market_events(20000, 10, 3)
+        books = [MarketBook.from_selections(e['event_id'], e['market'], e['selections']) for e in events]
+
+        benchmark_timer.start()
+        full = [s for s in SurebetDetector.find_best_surebets(books) if s['profit_percent'] >= 2.0][:50]
+        benchmark_timer.stop()
+        full_ms = benchmark_timer.elapsed_ms()
+
+        benchmark_timer.start()
+        top = list(SurebetDetector.stream_surebets(books, min_profit=2.0, limit=50))
+        benchmark_timer.stop()
+
+        assert [s['profit_percent'] for s in top] == pytest.approx([s['profit_percent'] for s in full])
+        assert benchmark_timer.elapsed_ms() < full_ms / 2
+        logging.info(f"Top-K stream: {benchmark_timer.elapsed_ms():.0f}ms vs full scan {full_ms:.0f}ms")
+
+    @pytest.mark.performance
+    def test_json_codec_opportunities_payload(self, benchmark_timer):
+        """Serializar 5k oportunidades com o codec ativo vs json.dumps."""
+        import json
+        from datetime import datetime
+        from backend.core import json_codec
+
+        now = datetime(2024, 1, 1, 12, 0)
+        payload = {'opportunities': [
+            {
+                'event_id': f'evt_{i}', 'market': '1x2', 'profit_percent': random.uniform(0.1, 5.0),
+                'detected_at': now,
+                'selections': [
+                    {'outcome': outcome, 'bookmaker': f'bk_{j}', 'odds': random.uniform(1.5, 4.0),
+                     'stake': random.uniform(10, 500)}
+                    for j, outcome in enumerate(('home', 'draw', 'away'))
+                ],
+            }
+            for i in range(5000)
+        ], 'count': 5000}
+
+        benchmark_timer.start()
+        for _ in range(5):
+            stdlib_body = json.dumps(payload, default=str)
+        benchmark_timer.stop()
+        stdlib_ms = benchmark_timer.elapsed_ms()
+
+        codec = json_codec.get_codec()
+        benchmark_timer.start()
+        for _ in range(5):
+            body = codec.dumps_bytes(payload)
+        benchmark_timer.stop()
+
+        assert len(codec.loads(body)['opportunities']) == len(json.loads(stdlib_body)['opportunities'])
+        logging.info(f"JSON {codec.name}: {benchmark_timer.elapsed_ms():.0f}ms vs json.dumps {stdlib_ms:.0f}ms")
+        if json_codec.orjson is not None:
+            assert benchmark_timer.elapsed_ms() < stdlib_ms / 2
 
 class TestScalabilityTests:
     """Testes de escalabilidade."""
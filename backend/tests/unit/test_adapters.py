@@ -0,0 +1,275 @@
+"""Testes unitários para o registry preguiçoso de adaptadores."""
+
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.apps import adapters as adapters_module, bookmakers
+from backend.apps.adapters import AdapterRegistry, ConfiguredBookmakerAdapter, UnifiedBookmakerAdapter
+from backend.apps.bookmakers import BUILTIN_BOOKMAKERS, BookmakerConfig, discover_bookmakers
+from backend.services.catalog import SportCatalog
+
+
+class FakeSportsAPI:
+    def __init__(self, delay=0.0, available=True):
+        self.delay = delay
+        self.available = available
+        self.calls = 0
+
+    def get_sports_ids(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if not self.available:
+            return None
+        return {'doc': [{'data': [{'id': 1, 'name': 'Soccer'}, {'id': 5, 'name': 'Tennis'}]}]}
+
+
+class FakeAdapter(UnifiedBookmakerAdapter):
+    created = 0
+    lock = threading.Lock()
+
+    def __init__(self, api=None):
+        with FakeAdapter.lock:
+            FakeAdapter.created += 1
+        super().__init__('fake', 99)
+        self.api = api or FakeSportsAPI()
+        self._catalog = SportCatalog(self.api.get_sports_ids, path='', retry_interval=0)
+
+    def get_custom_settings(self):
+        return {}
+
+
+class TestSportIds:
+    """Testes da resolução de IDs de esporte."""
+
+    def test_resolved_once_and_cached(self):
+        adapter = FakeAdapter()
+
+        assert adapter.sport_id('tennis') == '5'
+        assert adapter.sport_id('Tennis') == '5'
+        assert adapter.soccer_id == '1'
+        assert adapter.api.calls == 1
+
+    def test_adapters_share_catalog(self):
+        api = FakeSportsAPI()
+        catalog = SportCatalog(api.get_sports_ids, path='')
+        adapters = [FakeAdapter(api) for _ in range(4)]
+        for adapter in adapters:
+            adapter._catalog = catalog
+
+        assert {adapter.sport_id('tennis') for adapter in adapters} == {'5'}
+        assert api.calls == 1
+
+    def test_fallback_is_not_cached(self):
+        adapter = FakeAdapter(FakeSportsAPI(available=False))
+
+        assert adapter.sport_id('tennis') == '1'
+        adapter.api.available = True
+        assert adapter.sport_id('tennis') == '5'
+
+    def test_background_resolution(self):
+        adapter = FakeAdapter(FakeSportsAPI(delay=0.05))
+
+        started = time.perf_counter()
+        resolver = adapter.resolve_sport_ids()
+        assert time.perf_counter() - started < 0.05
+
+        resolver.join(2)
+        calls = adapter.api.calls
+        assert adapter.sport_id('tennis') == '5'
+        assert adapter.api.calls == calls
+
+
+class TestAdapterRegistry:
+    """Testes do registry."""
+
+    def test_adapters_are_built_lazily(self):
+        FakeAdapter.created = 0
+        registry = AdapterRegistry({'fake': FakeAdapter})
+
+        assert registry.names() == ['fake']
+        assert FakeAdapter.created == 0
+        assert registry.get('FAKE') is registry.get('fake')
+        assert FakeAdapter.created == 1
+        assert registry.get('outra') is None
+
+    def test_concurrent_first_use_builds_one_adapter(self):
+        FakeAdapter.created = 0
+        registry = AdapterRegistry({'fake': FakeAdapter})
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            adapters = list(pool.map(lambda _: registry.get('fake'), range(8)))
+
+        assert FakeAdapter.created == 1
+        assert all(a is adapters[0] for a in adapters)
+
+    def test_warm_up_waits_for_sport_ids(self):
+        api = FakeSportsAPI(delay=0.02)
+        registry = AdapterRegistry({'fake': lambda: FakeAdapter(api)})
+
+        adapters = registry.warm_up(wait=True, timeout=2)
+
+        assert adapters['fake'].catalog.status()['sports'] == 2
+        assert adapters['fake'].sport_id('tennis') == '5'
+        assert api.calls == 1
+
+
+class FakeOddsAPI(FakeSportsAPI):
+    def __init__(self, docs):
+        super().__init__()
+        self.docs = docs
+        self.requests = []
+
+    def modal_docs(self, sport_id, limit=None, fields=None, region='Europe:Berlin'):
+        self.requests.append((sport_id, limit, fields, region))
+        return {'doc': self.docs[:limit]}
+
+
+class FakeEntryPoint:
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+    def load(self):
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+class TestConfiguredAdapters:
+    """Testes do motor de adaptadores guiado por configuração."""
+
+    def make_adapter(self, config, docs):
+        adapter = ConfiguredBookmakerAdapter(config, api=FakeOddsAPI(docs))
+        adapter._catalog = SportCatalog(adapter.api.get_sports_ids, path='')
+        return adapter
+
+    def test_settings_and_env_overrides(self, monkeypatch):
+        betfair = next(c for c in BUILTIN_BOOKMAKERS if c.name == 'betfair')
+        pinnacle = next(c for c in BUILTIN_BOOKMAKERS if c.name == 'pinnacle')
+        monkeypatch.setenv('BETFAIR_COMMISSION', '0.02')
+        monkeypatch.setenv('PINNACLE_MARKET_TYPES', '1_1, 1_8')
+
+        assert betfair.settings() == {'min_odds': 1.01, 'max_odds': 1000.0,
+                                      'exchange_mode': True, 'commission_rate': 0.02}
+        assert pinnacle.settings()['market_types'] == ['1_1', '1_8']
+        assert 'commission_rate' not in pinnacle.settings()
+
+    def test_parse_mapping(self):
+        config = BookmakerConfig.from_dict({
+            'name': 'NovaCasa', 'id': 10,
+            'fields': {'name': 'match.title', 'start_time': 'match.kickoff'},
+        })
+        adapter = self.make_adapter(config, [
+            {'id': 7, 'match': {'title': 'A vs B', 'kickoff': '2026-01-01T15:00:00'}, 'markets': [], 'extra': 1},
+        ])
+
+        events = adapter.get_live_odds('tennis', limit=5)
+
+        assert adapter.api.requests == [('5', 5, ('id', 'match', 'sport', 'markets'), 'Europe:Berlin')]
+        assert events[0]['name'] == 'A vs B'
+        assert events[0]['start_time'] == '2026-01-01T15:00:00'
+        assert events[0]['sport'] == ''
+        assert events[0]['bookmaker'] == 'novacasa' and events[0]['status'] == 'live'
+
+    def test_unchanged_items_reuse_parsed_events(self, monkeypatch):
+        docs = [
+            {'id': 1, 'name': 'A vs B', 'markets': [{'type': '1X2', 'selections': [{'name': 'A', 'odds': 2.0}]}]},
+            {'id': 2, 'name': 'C vs D', 'markets': []},
+        ]
+        adapter = self.make_adapter(BookmakerConfig('nova', 10), docs)
+        plucks = []
+        real_pluck = adapters_module._pluck
+        monkeypatch.setattr(adapters_module, '_pluck', lambda *args: plucks.append(1) or real_pluck(*args))
+
+        first = adapter.get_live_odds('soccer', limit=5)
+        parsed = len(plucks)
+        docs[1] = dict(docs[1], name='C vs E')
+        second = adapter.get_live_odds('soccer', limit=5)
+
+        assert second[0] is first[0]
+        assert second[1]['name'] == 'C vs E'
+        assert len(plucks) == parsed * 3 // 2
+        # Outro status é outro feed
+        assert adapter.get_upcoming_odds('soccer', limit=5)[0] is not first[0]
+
+    def test_unknown_config_field(self):
+        try:
+            BookmakerConfig.from_dict({'name': 'x', 'id': 1, 'comission': 0.1})
+        except ValueError as e:
+            assert 'comission' in str(e)
+        else:
+            raise AssertionError('campo desconhecido aceito')
+
+    def test_discovery_from_entry_points(self, monkeypatch):
+        points = [
+            FakeEntryPoint('um', BookmakerConfig('casa_um', 11)),
+            FakeEntryPoint('varios', lambda: [{'name': 'casa_dois', 'id': 12}, {'name': 'casa_tres', 'id': 13}]),
+            FakeEntryPoint('quebrado', ImportError('sem módulo')),
+        ]
+        monkeypatch.setattr(bookmakers, '_entry_points', lambda group: points)
+
+        assert [c.name for c in discover_bookmakers('grupo')] == ['casa_um', 'casa_dois', 'casa_tres']
+
+    def test_registry_loads_plugins_once(self, monkeypatch):
+        catalog = SportCatalog(FakeSportsAPI().get_sports_ids, path='')
+        monkeypatch.setattr(adapters_module, 'get_catalog', lambda: catalog)
+        calls = []
+
+        def plugins():
+            calls.append(1)
+            return [BookmakerConfig('pinnacle', 2, max_odds=3000), BookmakerConfig('nova', 10)]
+
+        registry = AdapterRegistry.from_configs(BUILTIN_BOOKMAKERS, plugins=plugins)
+
+        assert registry.names() == ['bet365', 'pinnacle', 'betfair', 'superodds', 'nova']
+        assert 'NOVA' in registry
+        assert registry.get('pinnacle').get_effective_settings()['max_odds'] == 3000
+        assert len(calls) == 1
+
+
+class SlowOddsAPI(FakeSportsAPI):
+    def __init__(self, delay):
+        super().__init__()
+        self.odds_delay = delay
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def modal_docs(self, sport_id, limit=None, fields=None, region='Europe:Berlin'):
+        with self.lock:
+            self.requests.append(sport_id)
+        time.sleep(self.odds_delay)
+        # O evento 'compartilhado' aparece em todos os esportes
+        return {'doc': [{'id': f'{sport_id}_1', 'markets': []}, {'id': 'compartilhado', 'markets': []}]}
+
+
+class TestMultiSportFetch:
+    """Testes das buscas de vários esportes."""
+
+    def make_adapter(self, delay=0.0):
+        adapter = ConfiguredBookmakerAdapter(BookmakerConfig('nova', 10), api=SlowOddsAPI(delay))
+        adapter._catalog = SportCatalog(adapter.api.get_sports_ids, path='')
+        return adapter
+
+    def test_combined_and_deduplicated(self):
+        adapter = self.make_adapter()
+
+        events = adapter.get_live_odds_many(['soccer', 'Tennis', 'SOCCER'], limit=5)
+
+        assert [e['id'] for e in events] == ['1_1', 'compartilhado', '5_1']
+        assert sorted(adapter.api.requests) == ['1', '5']
+        assert adapter.api.calls == 1
+        assert {e['status'] for e in adapter.get_upcoming_odds_many(['soccer'])} == {'upcoming'}
+
+    def test_sports_are_fetched_concurrently(self):
+        adapter = self.make_adapter(delay=0.2)
+
+        started = time.perf_counter()
+        events = adapter.get_upcoming_odds_many(['soccer', 'tennis'], limit=5)
+
+        assert len(events) == 3
+        assert time.perf_counter() - started < 0.35
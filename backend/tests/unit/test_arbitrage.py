@@ -0,0 +1,347 @@
+"""Testes unitários para o motor de detecção de arbitragem."""
+
+import os
+import sys
+import random
+import itertools
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.services.arbitrage import SurebetDetector
+
+
+def brute_force_surebets(events):
+    """Referência: produto cartesiano com casas distintas (implementação original)."""
+    found = []
+    for event in events:
+        selections = event['selections']
+        names = list(dict.fromkeys(s['name'] for s in selections))
+        if len(names) < 2:
+            continue
+        groups = [[s for s in selections if s['name'] == n and s['odds'] > 1] for n in names]
+        for combo in itertools.product(*groups):
+            bookmakers = [s['bookmaker'] for s in combo]
+            if len(set(bookmakers)) != len(bookmakers):
+                continue
+            arb_index = sum(1 / s['odds'] for s in combo)
+            if arb_index < 1:
+                found.append((event['event_id'], frozenset(id(s) for s in combo), arb_index))
+    return found
+
+
+def random_events(n_events, n_books, n_outcomes, seed=42):
+    rng = random.Random(seed)
+    events = []
+    for e in range(n_events):
+        selections = []
+        for o in range(n_outcomes):
+            fair = n_outcomes * rng.uniform(0.8, 1.2)
+            for b in range(n_books):
+                selections.append({
+                    'name': f'sel_{o}',
+                    'odds': round(fair * rng.uniform(0.85, 1.15), 2),
+                    'bookmaker': f'book_{b}'
+                })
+        events.append({'event_id': f'evt_{e}', 'market': '1X2', 'selections': selections})
+    return events
+
+
+class TestSurebetDetector:
+    """Testes do detector baseado em melhor odd por seleção."""
+
+    def test_calculate_arbitrage(self):
+        assert SurebetDetector.calculate_arbitrage([2.1, 2.1]) == pytest.approx(2 / 2.1)
+        assert SurebetDetector.calculate_arbitrage([0.9, 3.0]) == 1.0
+        assert SurebetDetector.calculate_arbitrage([]) == 1.0
+
+    def test_simple_surebet(self):
+        events = [{
+            'event_id': 'e1',
+            'market': '1X2',
+            'selections': [
+                {'name': 'Home', 'odds': 2.2, 'bookmaker': 'bet365'},
+                {'name': 'Away', 'odds': 2.2, 'bookmaker': 'pinnacle'},
+                {'name': 'Home', 'odds': 1.8, 'bookmaker': 'pinnacle'},
+            ]
+        }]
+        surebets = SurebetDetector.find_surebets(events)
+        assert len(surebets) == 1
+        assert surebets[0]['profit_percent'] == pytest.approx((1 - 2 / 2.2) * 100)
+        assert {s['bookmaker'] for s in surebets[0]['selections']} == {'bet365', 'pinnacle'}
+
+    def test_same_bookmaker_is_not_arbitrage(self):
+        events = [{
+            'event_id': 'e1',
+            'market': '1X2',
+            'selections': [
+                {'name': 'Home', 'odds': 2.5, 'bookmaker': 'bet365'},
+                {'name': 'Away', 'odds': 2.5, 'bookmaker': 'bet365'},
+                {'name': 'Home', 'odds': 1.5, 'bookmaker': 'pinnacle'},
+                {'name': 'Away', 'odds': 1.5, 'bookmaker': 'pinnacle'},
+            ]
+        }]
+        assert SurebetDetector.find_surebets(events) == []
+        assert SurebetDetector.find_best_surebets(events) == []
+
+    def test_invalid_odds_and_single_selection_are_ignored(self):
+        events = [
+            {'event_id': 'e1', 'market': 'm', 'selections': [
+                {'name': 'Home', 'odds': 5.0, 'bookmaker': 'a'},
+                {'name': 'Away', 'odds': 0, 'bookmaker': 'b'},
+            ]},
+            {'event_id': 'e2', 'market': 'm', 'selections': [
+                {'name': 'Home', 'odds': 5.0, 'bookmaker': 'a'},
+            ]},
+        ]
+        assert SurebetDetector.find_surebets(events) == []
+
+    @pytest.mark.parametrize('n_books,n_outcomes', [(3, 2), (4, 3), (6, 3), (5, 4)])
+    def test_matches_cartesian_reference(self, n_books, n_outcomes):
+        events = random_events(60, n_books, n_outcomes, seed=n_books * 10 + n_outcomes)
+        expected = brute_force_surebets(events)
+        surebets = SurebetDetector.find_surebets(events)
+
+        got = {(s['event_id'], frozenset(id(sel) for sel in s['selections'])) for s in surebets}
+        assert got == {(e, combo) for e, combo, _ in expected}
+        profits = [s['profit_percent'] for s in surebets]
+        assert profits == sorted(profits, reverse=True)
+
+    def test_best_surebet_per_market(self):
+        events = random_events(80, 5, 3, seed=7)
+        expected = {}
+        for event_id, _, arb_index in brute_force_surebets(events):
+            expected[event_id] = min(arb_index, expected.get(event_id, 1.0))
+
+        best = SurebetDetector.find_best_surebets(events)
+        assert {s['event_id'] for s in best} == set(expected)
+        for surebet in best:
+            assert surebet['arbitrage_index'] == pytest.approx(expected[surebet['event_id']])
+
+    def test_best_surebet_resolves_bookmaker_conflict(self):
+        events = [{
+            'event_id': 'e1',
+            'market': '1X2',
+            'selections': [
+                {'name': 'Home', 'odds': 3.5, 'bookmaker': 'a'},
+                {'name': 'Draw', 'odds': 3.8, 'bookmaker': 'a'},
+                {'name': 'Away', 'odds': 3.6, 'bookmaker': 'a'},
+                {'name': 'Home', 'odds': 3.4, 'bookmaker': 'b'},
+                {'name': 'Draw', 'odds': 3.7, 'bookmaker': 'c'},
+                {'name': 'Away', 'odds': 3.0, 'bookmaker': 'b'},
+            ]
+        }]
+        best = SurebetDetector.find_best_surebets(events)
+        assert len(best) == 1
+        bookmakers = [s['bookmaker'] for s in best[0]['selections']]
+        assert len(set(bookmakers)) == 3
+        assert best[0]['arbitrage_index'] == pytest.approx(1 / 3.4 + 1 / 3.7 + 1 / 3.6)
+
+
+class TestBatchScan:
+    """Testes da varredura vetorizada sobre o tensor de odds."""
+
+    def test_matches_best_surebets(self):
+        import numpy as np
+
+        events = random_events(120, 5, 3, seed=11)
+        tensor, labels = SurebetDetector.build_odds_tensor(events)
+        assert tensor.shape == (120, 1, 3, 5)
+
+        result = SurebetDetector.scan_odds_tensor(tensor)
+        expected = {s['event_id']: s['arbitrage_index'] for s in SurebetDetector.find_best_surebets(events)}
+
+        flagged = {labels['events'][e] for e in np.flatnonzero(result['is_surebet'][:, 0])}
+        assert flagged == set(expected)
+        for e in np.flatnonzero(result['is_surebet'][:, 0]):
+            assert result['implied_sum'][e, 0] == pytest.approx(expected[labels['events'][e]])
+            bookmakers = result['best_bookmaker'][e, 0]
+            assert len(set(bookmakers.tolist())) == len(bookmakers)
+
+    def test_stakes_give_equal_return(self):
+        import numpy as np
+
+        tensor = np.full((1, 1, 2, 2), np.nan)
+        tensor[0, 0, :, 0] = [2.2, 1.6]
+        tensor[0, 0, :, 1] = [1.7, 2.1]
+        result = SurebetDetector.scan_odds_tensor(tensor, total_stake=1000)
+
+        stakes = result['stakes'][0, 0]
+        returns = stakes * result['best_odds'][0, 0]
+        assert stakes.sum() == pytest.approx(1000)
+        assert returns[0] == pytest.approx(returns[1])
+        assert result['profit_percent'][0, 0] == pytest.approx((1 - (1 / 2.2 + 1 / 2.1)) * 100)
+
+    def test_missing_outcome_quote_is_not_surebet(self):
+        import numpy as np
+
+        tensor = np.full((1, 1, 3, 2), np.nan)
+        tensor[0, 0, 0, 0] = 3.0
+        tensor[0, 0, 1, 1] = 3.0
+        assert SurebetDetector.scan_odds_tensor(tensor)['is_surebet'][0, 0]
+
+        result = SurebetDetector.scan_odds_tensor(tensor, n_outcomes=np.array([[3]]))
+        assert not result['is_surebet'][0, 0]
+        assert np.isnan(result['implied_sum'][0, 0])
+
+
+class TestStakeCalculator:
+    """Testes do cálculo vetorizado de stakes."""
+
+    def test_equal_profit_stakes(self):
+        import numpy as np
+        from backend.services.arbitrage import StakeCalculator
+
+        result = StakeCalculator(rounding=0).calculate(np.array([[2.2, 2.1], [1.8, 1.9]]), total_stake=1000)
+        returns = result['stakes'][0] * np.array([2.2, 2.1])
+        assert returns[0] == pytest.approx(returns[1])
+        assert result['total_stake'][0] == pytest.approx(1000)
+        assert result['is_surebet'].tolist() == [True, False]
+        assert result['profit'][1] < 0
+        assert result['profit_percent'][0] == pytest.approx((1 / (1 / 2.2 + 1 / 2.1) - 1) * 100)
+
+    def test_commission_reduces_effective_odds(self):
+        import numpy as np
+        from backend.services.arbitrage import StakeCalculator
+
+        odds = np.array([[2.2, 2.1]])
+        result = StakeCalculator(rounding=0).calculate(odds, 100, commission=np.array([[0.05, 0.0]]))
+        assert result['effective_odds'][0, 0] == pytest.approx(1 + 1.2 * 0.95)
+        assert result['profit'][0] < StakeCalculator(rounding=0).calculate(odds, 100)['profit'][0]
+
+    def test_max_stake_scales_bankroll(self):
+        import numpy as np
+        from backend.services.arbitrage import StakeCalculator
+
+        result = StakeCalculator(rounding=1).calculate(
+            np.array([[2.2, 2.1]]), total_stake=1000, max_stakes=np.array([[100, 0]])
+        )
+        assert result['feasible'][0]
+        assert result['stakes'][0, 0] == 100
+        assert result['total_stake'][0] < 300
+
+    def test_min_stake_above_bankroll_is_infeasible(self):
+        import numpy as np
+        from backend.services.arbitrage import StakeCalculator
+
+        result = StakeCalculator().calculate(np.array([[2.2, 2.1]]), total_stake=10, min_stakes=np.array([[50, 50]]))
+        assert not result['feasible'][0]
+        assert np.isnan(result['stakes'][0]).all()
+
+    def test_rounding_reports_guaranteed_profit(self):
+        import numpy as np
+        from backend.services.arbitrage import StakeCalculator
+
+        result = StakeCalculator(rounding=5).calculate(np.array([[2.2, 2.1, np.nan]]), total_stake=333)
+        stakes = result['stakes'][0, :2]
+        assert np.all(stakes % 5 == 0)
+        assert np.isnan(result['stakes'][0, 2])
+        assert result['guaranteed_return'][0] == pytest.approx(min(stakes * np.array([2.2, 2.1])))
+        assert result['profit'][0] == pytest.approx(result['guaranteed_return'][0] - stakes.sum())
+
+    def test_calculate_opportunities_uses_adapter_settings(self):
+        from backend.services.arbitrage import StakeCalculator
+
+        class FakeAdapter:
+            def __init__(self, settings):
+                self.settings = settings
+
+            def get_effective_settings(self):
+                return self.settings
+
+        calculator = StakeCalculator.from_adapters({
+            'betfair': FakeAdapter({'min_odds': 1.01, 'commission_rate': 0.05}),
+            'bet365': FakeAdapter({'min_odds': 1.01}),
+        })
+        assert calculator.bookmaker_settings == {'betfair': {'commission_rate': 0.05}, 'bet365': {}}
+
+        opportunity = {'selections': (
+            {'name': 'Home', 'odds': 2.3, 'bookmaker': 'betfair'},
+            {'name': 'Away', 'odds': 2.1, 'bookmaker': 'bet365'},
+        )}
+        allocation = calculator.calculate_opportunities([opportunity], total_stake=1000)[0]
+        assert [s['selection'] for s in allocation['stakes']] == ['Home', 'Away']
+        assert sum(s['amount'] for s in allocation['stakes']) == pytest.approx(allocation['total_stake'])
+        assert sum(s['percentage'] for s in allocation['stakes']) == pytest.approx(100, abs=0.02)
+
+
+class TestEffectiveOddsTransform:
+    """Testes da conversão para odds efetivas por casa."""
+
+    SETTINGS = {
+        'betfair': {'min_odds': 1.01, 'max_odds': 1000.0, 'exchange_mode': True, 'commission_rate': 0.05},
+        'bet365': {'min_odds': 1.01, 'max_odds': 3.0},
+    }
+
+    def test_commission_and_caps(self):
+        from backend.services.arbitrage import EffectiveOddsTransform
+
+        transform = EffectiveOddsTransform(self.SETTINGS)
+        assert transform.apply('betfair', 2.2) == pytest.approx(1 + 1.2 * 0.95)
+        assert transform.apply('bet365', 2.2) == 2.2
+        assert transform.apply('bet365', 3.5) is None
+        assert transform.apply('unknown', 7.0) == 7.0
+
+        selections = transform.apply_selections('betfair', [{'name': 'Home', 'odds': 2.2}])
+        assert selections[0]['raw_odds'] == 2.2
+
+    def test_commission_removes_marginal_surebet(self):
+        from backend.services.arbitrage import EffectiveOddsTransform
+
+        events = [{'event_id': 'e1', 'market': 'm', 'selections': [
+            {'name': 'Home', 'odds': 2.02, 'bookmaker': 'betfair'},
+            {'name': 'Away', 'odds': 2.02, 'bookmaker': 'bet365'},
+        ]}]
+        transform = EffectiveOddsTransform(self.SETTINGS)
+        assert len(SurebetDetector.find_surebets(events)) == 1
+        assert SurebetDetector.find_surebets(events, transform=transform) == []
+        assert SurebetDetector.find_best_surebets(events, transform=transform) == []
+
+    def test_tensor_matches_scalar(self):
+        import numpy as np
+        from backend.services.arbitrage import EffectiveOddsTransform
+
+        events = random_events(40, 2, 2, seed=5)
+        for event in events:
+            for s in event['selections']:
+                s['bookmaker'] = 'betfair' if s['bookmaker'] == 'book_0' else 'bet365'
+        transform = EffectiveOddsTransform(self.SETTINGS)
+
+        tensor, labels = SurebetDetector.build_odds_tensor(events, transform=transform)
+        result = SurebetDetector.scan_odds_tensor(tensor)
+        expected = {s['event_id'] for s in SurebetDetector.find_best_surebets(events, transform=transform)}
+        assert {labels['events'][e] for e in np.flatnonzero(result['is_surebet'][:, 0])} == expected
+
+
+class TestStreamSurebets:
+    """Testes da varredura em gerador com filtros empurrados para o detector."""
+
+    def test_top_k_matches_full_scan(self):
+        from backend.services.models import MarketBook
+
+        events = random_events(150, 5, 3, seed=17)
+        full = [s for s in SurebetDetector.find_best_surebets(events) if s['profit_percent'] >= 2.0]
+        books = [MarketBook.from_selections(e['event_id'], e['market'], e['selections']) for e in events]
+
+        for source in (events, books):
+            top = list(SurebetDetector.stream_surebets(source, min_profit=2.0, limit=10))
+            assert [s['profit_percent'] for s in top] == pytest.approx([s['profit_percent'] for s in full[:10]])
+            unlimited = list(SurebetDetector.stream_surebets(source, min_profit=2.0))
+            assert len(unlimited) == len(full)
+
+    def test_filters_are_pushed_down(self):
+        events = random_events(60, 4, 2, seed=8)
+        for i, event in enumerate(events):
+            event['sport'] = 'Tennis' if i % 2 else 'soccer'
+
+        tennis = list(SurebetDetector.stream_surebets(events, sports=['tennis']))
+        assert tennis and all(int(s['event_id'].split('_')[1]) % 2 for s in tennis)
+
+        restricted = list(SurebetDetector.stream_surebets(events, bookmakers=['book_0', 'book_1']))
+        assert all(sel['bookmaker'] in ('book_0', 'book_1') for s in restricted for sel in s['selections'])
+
+        seen = []
+        list(SurebetDetector.stream_surebets(events, predicate=lambda e: seen.append(e) or False))
+        assert len(seen) == len(events)
+        assert list(SurebetDetector.stream_surebets(events, limit=0)) == []
@@ -0,0 +1,146 @@
+"""Testes unitários para o índice incremental de arbitragem."""
+
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.services.arbitrage import SurebetDetector
+from backend.services.arbitrage_index import (
+    ArbitrageIndex, FeedIndexer, SUREBET_OPENED, SUREBET_CLOSED, SUREBET_CHANGED
+)
+from backend.services.ingest import FeedDelta
+
+
+class TestArbitrageIndex:
+    """Testes do ciclo de vida de surebets a partir de deltas de odds."""
+
+    def test_open_change_close(self):
+        index = ArbitrageIndex(outcomes_per_market={'1X2': 2})
+        received = []
+        index.subscribe(received.append)
+
+        assert index.update('e1', '1X2', 'bet365', 'Home', 2.1) == []
+        assert index.update('e1', '1X2', 'pinnacle', 'Away', 1.8) == []
+
+        opened = index.update('e1', '1X2', 'pinnacle', 'Away', 2.2)
+        assert [e['type'] for e in opened] == [SUREBET_OPENED]
+        assert opened[0]['arbitrage_index'] == pytest.approx(1 / 2.1 + 1 / 2.2)
+
+        changed = index.update('e1', '1X2', 'betfair', 'Home', 2.3)
+        assert [e['type'] for e in changed] == [SUREBET_CHANGED]
+        assert {s['bookmaker'] for s in changed[0]['selections']} == {'betfair', 'pinnacle'}
+
+        closed = index.update('e1', '1X2', 'pinnacle', 'Away', None)
+        assert [e['type'] for e in closed] == [SUREBET_CLOSED]
+        assert index.surebets() == []
+        assert [e['type'] for e in received] == [SUREBET_OPENED, SUREBET_CHANGED, SUREBET_CLOSED]
+
+    def test_waits_for_all_expected_outcomes(self):
+        index = ArbitrageIndex(outcomes_per_market={'1X2': 3})
+        index.update('e1', '1X2', 'a', 'Home', 3.0)
+        assert index.update('e1', '1X2', 'b', 'Away', 3.0) == []
+
+        opened = index.update('e1', '1X2', 'c', 'Draw', 3.3)
+        assert [e['type'] for e in opened] == [SUREBET_OPENED]
+
+    def test_same_bookmaker_conflict_uses_assignment(self):
+        index = ArbitrageIndex()
+        index.update('e1', 'm', 'a', 'Home', 2.5)
+        index.update('e1', 'm', 'a', 'Away', 2.5)
+        assert index.get_surebet('e1', 'm') is None
+
+        index.update('e1', 'm', 'b', 'Away', 2.0)
+        surebet = index.get_surebet('e1', 'm')
+        assert surebet is not None
+        assert surebet['arbitrage_index'] == pytest.approx(1 / 2.5 + 1 / 2.0)
+
+    def test_min_profit_threshold(self):
+        index = ArbitrageIndex(min_profit=5.0)
+        index.update('e1', 'm', 'a', 'Home', 2.05)
+        index.update('e1', 'm', 'b', 'Away', 2.05)
+        assert index.get_surebet('e1', 'm') is None
+
+        index.update('e1', 'm', 'b', 'Away', 2.4)
+        assert index.get_surebet('e1', 'm') is not None
+
+    def test_random_stream_matches_full_scan(self):
+        rng = random.Random(3)
+        index = ArbitrageIndex(outcomes_per_market={'1X2': 3})
+        quotes = {}
+        for _ in range(5000):
+            key = (f'e{rng.randrange(20)}', '1X2', f'b{rng.randrange(6)}', f's{rng.randrange(3)}')
+            odds = None if rng.random() < 0.1 else round(rng.uniform(2.4, 3.6), 2)
+            index.update(*key, odds)
+            if odds is None:
+                quotes.pop(key, None)
+            else:
+                quotes[key] = odds
+
+        events = {}
+        for (event_id, market, bookmaker, name), odds in quotes.items():
+            events.setdefault(event_id, []).append({'name': name, 'odds': odds, 'bookmaker': bookmaker})
+        full = [
+            {'event_id': e, 'market': '1X2', 'selections': s}
+            for e, s in events.items() if len({x['name'] for x in s}) == 3
+        ]
+        expected = {s['event_id']: s['arbitrage_index'] for s in SurebetDetector.find_best_surebets(full)}
+
+        got = {s['event_id']: s['arbitrage_index'] for s in index.surebets()}
+        assert set(got) == set(expected)
+        for event_id, arb_index in got.items():
+            assert arb_index == pytest.approx(expected[event_id])
+
+    def test_transform_applied_on_update(self):
+        from backend.services.arbitrage import EffectiveOddsTransform
+
+        transform = EffectiveOddsTransform({'betfair': {'exchange_mode': True, 'commission_rate': 0.05}})
+        index = ArbitrageIndex(transform=transform)
+        index.update('e1', 'm', 'betfair', 'Home', 2.02)
+        assert index.update('e1', 'm', 'b', 'Away', 2.02) == []
+
+        opened = index.update('e1', 'm', 'b', 'Away', 2.3)
+        assert opened[0]['arbitrage_index'] == pytest.approx(1 / (1 + 1.02 * 0.95) + 1 / 2.3)
+
+
+def adapter_event(event_id, bookmaker, home, away):
+    return {'id': event_id, 'name': 'A vs B', 'sport': 'soccer', 'bookmaker': bookmaker, 'markets': [
+        {'type': '1X2', 'selections': [{'name': 'A', 'odds': home}, {'name': 'B', 'odds': away}]}
+    ]}
+
+
+class TestFeedIndexer:
+    """Testes do índice alimentado pelos deltas da coleta."""
+
+    def test_only_changed_quotes_are_applied(self):
+        index = ArbitrageIndex()
+        indexer = FeedIndexer(index)
+        updates = []
+        real_update = index.update
+        index.update = lambda *args: updates.append(args) or real_update(*args)
+
+        indexer(('bet365', 'soccer', 'live'), FeedDelta([adapter_event(1, 'bet365', 2.2, 1.5)], []))
+        indexer(('pinnacle', 'soccer', 'live'), FeedDelta([adapter_event(9, 'pinnacle', 1.5, 2.1)], []))
+        assert [s['event_id'] for s in index.surebets()] == ['soccer:A vs B']
+
+        updates.clear()
+        indexer(('bet365', 'soccer', 'live'), FeedDelta([adapter_event(1, 'bet365', 2.2, 1.6)], []))
+        assert updates == [('soccer:A vs B', '1X2', 'bet365', 'B', 1.6)]
+
+    def test_removed_events_leave_the_index(self):
+        index = ArbitrageIndex()
+        indexer = FeedIndexer(index, status='live')
+        indexer(('bet365', 'soccer', 'live'), FeedDelta([adapter_event(1, 'bet365', 2.2, 1.5)], []))
+        indexer(('pinnacle', 'soccer', 'live'), FeedDelta([adapter_event(9, 'pinnacle', 1.5, 2.1)], []))
+        indexer(('betfair', 'soccer', 'upcoming'), FeedDelta([adapter_event(5, 'betfair', 3.0, 3.0)], []))
+        assert index.get_market('soccer:A vs B', '1X2').outcomes['A'].quotes == {'bet365': 2.2, 'pinnacle': 1.5}
+
+        event = adapter_event(1, 'bet365', 2.2, 1.5)
+        indexer(('bet365', 'soccer', 'live'), FeedDelta([], [event]))
+        assert index.surebets() == []
+
+        indexer(('pinnacle', 'soccer', 'live'), FeedDelta([], [adapter_event(9, 'pinnacle', 1.5, 2.1)]))
+        assert index.markets() == []
@@ -0,0 +1,139 @@
+"""Testes unitários para o catálogo de esportes da SportRadar."""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.services.catalog import SportCatalog, parse_sports_tree
+
+
+TREE = {'doc': [{'data': [
+    {'_id': 1, 'name': 'Soccer', 'realcategories': [
+        {'_id': 1, 'name': 'England', 'uniquetournaments': [
+            {'_id': 17, 'name': 'Premier League'}, {'_id': 18, 'name': 'Championship'}
+        ]},
+        {'_id': 13, 'name': 'Brazil', 'uniquetournaments': [{'_id': 325, 'name': 'Brasileiro Serie A'}]},
+    ]},
+    {'id': 5, 'name': 'Tennis'},
+]}]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeFetch:
+    def __init__(self, data=TREE):
+        self.data = data
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.data
+
+
+def make_catalog(fetch, path='', **options):
+    options.setdefault('refresh_interval', 3600)
+    options.setdefault('retry_interval', 60)
+    return SportCatalog(fetch, path=path, **options)
+
+
+class TestParseSportsTree:
+    """Testes da normalização da árvore."""
+
+    def test_nested_ids(self):
+        tree = parse_sports_tree(TREE)
+
+        assert [s['id'] for s in tree] == ['1', '5']
+        assert tree[0]['categories'][0]['tournaments'][0] == {'id': '17', 'name': 'Premier League'}
+        assert tree[1]['categories'] == []
+
+    def test_invalid_response(self):
+        assert parse_sports_tree(None) == []
+        assert parse_sports_tree({'doc': []}) == []
+
+
+class TestSportCatalog:
+    """Testes das consultas e do cache."""
+
+    def test_lookups_download_once(self):
+        fetch = FakeFetch()
+        catalog = make_catalog(fetch)
+
+        assert catalog.ensure_loaded()
+        assert catalog.sport_id('soccer') == '1'
+        assert catalog.sport_id('TENNIS') == '5'
+        assert catalog.category_id('soccer', 'brazil') == '13'
+        assert catalog.tournament_id('soccer', 'premier league') == '17'
+        assert catalog.tournament_id('1', 'championship', category='england') == '18'
+        assert catalog.tournament_id('soccer', 'championship', category='brazil') is None
+        assert catalog.sport_id('cricket') is None
+        assert catalog.has_sport(' Tennis') and not catalog.has_sport('ten')
+        assert fetch.calls == 1
+
+    def test_persisted_cache_is_used_by_new_process(self, tmp_path):
+        path = str(tmp_path / 'catalog.json')
+        clock = FakeClock()
+        make_catalog(FakeFetch(), path=path, clock=clock).ensure_loaded()
+
+        fetch = FakeFetch(data=None)
+        catalog = make_catalog(fetch, path=path, clock=clock)
+
+        assert catalog.sport_id('tennis') == '5'
+        assert fetch.calls == 0
+
+    def test_stale_cache_refreshes_in_background(self, tmp_path):
+        path = str(tmp_path / 'catalog.json')
+        clock = FakeClock()
+        make_catalog(FakeFetch(), path=path, clock=clock).ensure_loaded()
+        clock.now += 3600
+
+        renamed = {'doc': [{'data': [{'id': 1, 'name': 'Soccer'}, {'id': 6, 'name': 'Tennis'}]}]}
+        fetch = FakeFetch(renamed)
+        release = threading.Event()
+        catalog = make_catalog(lambda: release.wait(2) and fetch(), path=path, clock=clock)
+
+        # A versão em cache responde enquanto a nova é baixada
+        assert catalog.sport_id('tennis') == '5'
+        release.set()
+        catalog.refresh_in_background().join(2)
+        assert catalog.sport_id('tennis') == '6'
+        assert fetch.calls == 1
+
+    def test_failures_are_retried_after_interval(self):
+        fetch = FakeFetch(data=None)
+        clock = FakeClock()
+        catalog = make_catalog(fetch, clock=clock)
+
+        assert not catalog.ensure_loaded()
+        assert not catalog.ensure_loaded()
+        assert catalog.sport_id('soccer') is None
+        assert fetch.calls == 1
+
+        fetch.data = TREE
+        clock.now += 60
+        assert catalog.ensure_loaded()
+        assert catalog.sport_id('soccer') == '1'
+        assert fetch.calls == 2
+
+    def test_cold_query_does_not_wait_for_download(self):
+        release = threading.Event()
+        fetch = FakeFetch()
+        catalog = make_catalog(lambda: release.wait(2) and fetch())
+
+        started = time.perf_counter()
+        assert not catalog.has_sport('soccer')
+        assert catalog.sport_id('soccer') is None
+        assert time.perf_counter() - started < 0.5
+
+        release.set()
+        assert catalog.ensure_loaded()
+        assert catalog.has_sport('soccer')
+        assert fetch.calls == 1
@@ -0,0 +1,138 @@
+"""Testes unitários para a detecção de arbitragem entre mercados."""
+
+import os
+import sys
+import itertools
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.services.cross_market import (
+    CoverageTable, CrossMarketDetector, RESULT_SPACE, GOALS_SPACE, MARGIN_SPACE, MAX_MARGIN
+)
+
+
+def market(event_id, market_type, *quotes, **extra):
+    selections = [{'name': n, 'odds': o, 'bookmaker': b} for n, o, b in quotes]
+    return dict({'event_id': event_id, 'market': market_type, 'selections': selections}, **extra)
+
+
+class TestCoverageTable:
+    """Testes da tabela de cobertura."""
+
+    def test_resolves_known_markets(self):
+        table = CoverageTable()
+        home = table.resolve('1X2', {'name': 'Casa'})
+        x2 = table.resolve('DC', {'name': 'X2'})
+        assert home[0] == x2[0] == RESULT_SPACE
+        assert home[1] & x2[1] == 0
+        assert home[1] | x2[1] == 0b111
+
+        over = table.resolve('OU', {'name': 'Mais de 2.5'})
+        under = table.resolve('OU', {'name': 'Menos de 2.5'})
+        assert over[0] == GOALS_SPACE
+        assert over[1] & under[1] == 0
+        assert table.resolve('OU', {'name': 'Mais de 2.0'}) is None
+        assert table.resolve('BTTS', {'name': 'Sim'}) is None
+
+    def test_resolves_handicap_lines(self):
+        table = CoverageTable()
+        home = table.resolve('AH', {'name': 'Casa -1.5'})
+        away = table.resolve('AH', {'name': 'Visitante +1.5'})
+        assert home[0] == away[0] == MARGIN_SPACE
+        assert home[1] & away[1] == 0
+        assert home[1] | away[1] == (1 << (2 * MAX_MARGIN + 1)) - 1
+        # Mandante -1.5 ganha com saldo >= 2
+        assert home[1] & -home[1] == 1 << (MAX_MARGIN + 2)
+        assert table.resolve('AH', {'name': 'Visitante (+2.5)'})[1] & (1 << (MAX_MARGIN + 2))
+        assert table.resolve('AH', {'name': 'Casa -1'}) is None
+
+    def test_team_names_and_explicit_outcome(self):
+        table = CoverageTable()
+        assert table.resolve('1X2', {'name': 'Flamengo'}, {'flamengo': 1}) == (RESULT_SPACE, 1)
+        assert table.resolve('1X2', {'name': 'Flamengo', 'outcome': '2'}) == (RESULT_SPACE, 4)
+
+    def test_exact_covers(self):
+        table = CoverageTable()
+        covers = table.covers(RESULT_SPACE, frozenset({1, 2, 4, 3, 5, 6}))
+        assert {frozenset(c) for c in covers} == {frozenset(c) for c in [(1, 2, 4), (1, 6), (2, 5), (3, 4)]}
+
+
+class TestCrossMarketDetector:
+    """Testes do detector entre mercados."""
+
+    def test_home_against_double_chance(self):
+        events = [
+            market('e1', '1X2', ('Casa', 2.6, 'a'), ('Empate', 3.2, 'a'), ('Visitante', 3.0, 'a')),
+            market('e1', 'DC', ('1X', 1.3, 'b'), ('X2', 1.7, 'b'), ('12', 1.3, 'b')),
+        ]
+        surebets = CrossMarketDetector().find_surebets(events)
+        assert len(surebets) == 1
+        assert surebets[0]['market'] == '1X2+DC'
+        assert surebets[0]['arbitrage_index'] == pytest.approx(1 / 2.6 + 1 / 1.7)
+        assert {s['name'] for s in surebets[0]['selections']} == {'Casa', 'X2'}
+
+    def test_team_named_selections(self):
+        events = [
+            market('e1', '1X2', ('Flamengo', 2.6, 'a'), home='Flamengo', away='Vasco'),
+            market('e1', 'DC', ('X2', 1.7, 'b')),
+        ]
+        assert len(CrossMarketDetector().find_surebets(events)) == 1
+
+    def test_same_bookmaker_needs_assignment(self):
+        events = [
+            market('e1', '1X2', ('Casa', 2.6, 'a'), ('Casa', 2.4, 'b')),
+            market('e1', 'DC', ('X2', 1.8, 'a'), ('X2', 1.6, 'c')),
+        ]
+        surebets = CrossMarketDetector().find_surebets(events)
+        assert len(surebets) == 1
+        assert surebets[0]['arbitrage_index'] == pytest.approx(min(1 / 2.6 + 1 / 1.6, 1 / 2.4 + 1 / 1.8))
+
+    def test_cross_only_skips_single_market_covers(self):
+        events = [market('e1', 'OU', ('Mais de 2.5', 2.1, 'a'), ('Menos de 2.5', 2.1, 'b'))]
+        assert CrossMarketDetector().find_surebets(events) == []
+        assert len(CrossMarketDetector(cross_only=False).find_surebets(events)) == 1
+
+    def test_matches_brute_force(self):
+        import random
+
+        rng = random.Random(9)
+        names = {'1X2': ['Casa', 'Empate', 'Visitante'], 'DC': ['1X', '12', 'X2']}
+        table = CoverageTable()
+        events = []
+        for e in range(40):
+            for market_type, outcomes in names.items():
+                quotes = []
+                for name in outcomes:
+                    fair = 3.0 if market_type == '1X2' else 1.5
+                    for b in range(4):
+                        quotes.append((name, round(fair * rng.uniform(0.8, 1.25), 2), f'b{b}'))
+                events.append(market(f'e{e}', market_type, *quotes))
+
+        detector = CrossMarketDetector(table, cross_only=False)
+        best = {}
+        for s in detector.find_surebets(events):
+            best[s['event_id']] = min(best.get(s['event_id'], 1.0), s['arbitrage_index'])
+
+        expected = {}
+        for e in range(40):
+            quotes = [
+                (table.resolve(m['market'], s)[1], s)
+                for m in events if m['event_id'] == f'e{e}' for s in m['selections']
+            ]
+            for size in (2, 3):
+                for combo in itertools.combinations(quotes, size):
+                    masks = [q[0] for q in combo]
+                    books = [q[1]['bookmaker'] for q in combo]
+                    if sum(masks) != 0b111 or any(a & b for a, b in itertools.combinations(masks, 2)):
+                        continue
+                    if len(set(books)) != size:
+                        continue
+                    arb_index = sum(1 / q[1]['odds'] for q in combo)
+                    if arb_index < 1:
+                        expected[f'e{e}'] = min(expected.get(f'e{e}', 1.0), arb_index)
+
+        assert set(best) == set(expected)
+        for event_id, arb_index in best.items():
+            assert arb_index == pytest.approx(expected[event_id])
@@ -0,0 +1,123 @@
+"""Testes unitários para o cache de respostas da SportRadar."""
+
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.core import http_cache
+from backend.core.http_cache import ResponseCache
+from backend.core.rate_limit import FetchGuard
+from backend.apps.radar_api import SportRadarAPI
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+        self.text = ''
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def json(self):
+        return self.data
+
+    @property
+    def content(self):
+        return json.dumps(self.data).encode()
+
+
+class FakeTransport:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.session = None
+
+    def get(self, url, headers=None):
+        self.requests.append((url, headers or {}))
+        return self.responses.pop(0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache:
+    """Testes do cache LRU com TTL."""
+
+    def test_lru_eviction_and_counters(self):
+        cache = ResponseCache(max_entries=2, default_ttl=60)
+        cache.store('a', 1)
+        cache.store('b', 2)
+        cache.lookup('a')
+        cache.store('c', 3)
+
+        assert cache.lookup('b') == (None, False)
+        assert cache.lookup('a')[0].data == 1
+        stats = cache.stats()
+        assert (stats['entries'], stats['hits'], stats['misses'], stats['evictions']) == (2, 2, 1, 1)
+
+    def test_zero_ttl_keeps_only_validated_responses(self):
+        cache = ResponseCache(default_ttl=60)
+        cache.store('a', 1, ttl=0)
+        cache.store('b', 2, ttl=0, headers={'ETag': '"v1"'})
+
+        assert len(cache) == 1
+        entry, fresh = cache.lookup('b')
+        assert not fresh
+        assert entry.validators() == {'If-None-Match': '"v1"'}
+
+
+class TestSportRadarCache:
+    """Testes do cache integrado ao cliente."""
+
+    def test_static_endpoint_is_served_from_cache_until_ttl(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(http_cache.time, 'monotonic', clock)
+        transport = FakeTransport(FakeResponse(data={'v': 1}), FakeResponse(data={'v': 2}))
+        api = SportRadarAPI('bet365', transport, ResponseCache(), 
+                            guard=FetchGuard('teste', rate_limit=0), ttls={'league': 100})
+
+        assert api.league('7') == {'v': 1}
+        assert api.league('7') == {'v': 1}
+        assert len(transport.requests) == 1
+
+        clock.now += 101
+        assert api.league('7') == {'v': 2}
+        assert len(transport.requests) == 2
+
+    def test_conditional_revalidation(self, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(http_cache.time, 'monotonic', clock)
+        transport = FakeTransport(
+            FakeResponse(data={'doc': [1]}, headers={'ETag': '"abc"', 'Last-Modified': 'Sat, 01 Jun 2024 10:00:00 GMT'}),
+            FakeResponse(status_code=304),
+        )
+        cache = ResponseCache()
+        api = SportRadarAPI('bet365', transport, cache, guard=FetchGuard('teste', rate_limit=0))
+
+        first = api.modal_data('1')
+        second = api.modal_data('1')
+
+        assert first == second == {'doc': [1]}
+        assert transport.requests[1][1] == {
+            'If-None-Match': '"abc"', 'If-Modified-Since': 'Sat, 01 Jun 2024 10:00:00 GMT'
+        }
+        assert cache.stats()['revalidations'] == 1
+
+    def test_uncached_paths_always_hit_origin(self):
+        transport = FakeTransport(FakeResponse(data={}), FakeResponse(data={}))
+        api = SportRadarAPI('bet365', transport, ResponseCache(), guard=FetchGuard('teste', rate_limit=0))
+
+        api.get_by_path('bet365/en/x')
+        api.get_by_path('bet365/en/x')
+
+        assert len(transport.requests) == 2
@@ -0,0 +1,65 @@
+"""Testes unitários para o transporte HTTP compartilhado."""
+
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.core.http_cache import ResponseCache
+from backend.core.rate_limit import FetchGuard
+from backend.core.http_transport import HttpTransport, get_transport
+from backend.apps.radar_api import AsyncSportRadarAPI, SportRadarAPI
+
+
+class FakeResponse:
+    status_code = 200
+    text = '{}'
+    content = b'{"doc": []}'
+    headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'doc': []}
+
+
+class TestHttpTransport:
+    """Testes do pool compartilhado."""
+
+    def test_clients_share_the_global_transport(self):
+        first, second = SportRadarAPI('bet365'), SportRadarAPI('pinnacle')
+        async_client = AsyncSportRadarAPI('betfair')
+
+        assert first.transport is second.transport is async_client.transport is get_transport()
+        assert first.session is second.session
+
+    def test_pool_size_per_host(self):
+        transport = HttpTransport(pool_hosts=3, pool_maxsize=7)
+        adapter = transport.session.get_adapter('https://s5.sir.sportradar.com/')
+
+        assert adapter._pool_connections == 3
+        assert adapter._pool_maxsize == 7
+        transport.close()
+
+    def test_default_timeouts_are_applied(self, monkeypatch):
+        transport = HttpTransport(timeout=12, connect_timeout=2)
+        calls = []
+        monkeypatch.setattr(transport.session, 'get', lambda url, **kw: calls.append(kw) or FakeResponse())
+
+        SportRadarAPI('bet365', transport, ResponseCache(), guard=FetchGuard('teste', rate_limit=0)).league('7')
+        transport.get('https://example.com', timeout=1)
+
+        assert calls[0]['timeout'] == (2, 12)
+        assert calls[1]['timeout'] == 1
+        transport.close()
+
+    def test_background_loop_is_reused(self):
+        transport = HttpTransport()
+
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        assert transport.run(current_loop()) is transport.run(current_loop())
+        transport.close()
@@ -0,0 +1,348 @@
+"""Testes unitários para a coleta de odds em segundo plano."""
+
+import os
+import sys
+import time
+import threading
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.core.content_hash import content_hash
+from backend.services.ingest import (
+    STATUS_LIVE, STATUS_UPCOMING, IngestScheduler, OddsSnapshot, SnapshotMemo
+)
+from backend.services.arbitrage_index import ArbitrageIndex, FeedIndexer
+from backend.services.priority import RefreshPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAdapter:
+    def __init__(self, name, fail=False):
+        self.name = name
+        self.fail = fail
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _events(self, sport, status, limit):
+        with self._lock:
+            self.calls.append((sport, status))
+        if self.fail:
+            raise RuntimeError('fora do ar')
+        start = datetime.now() + (timedelta(days=2) if status == STATUS_UPCOMING else timedelta(minutes=-30))
+        return [{'id': f'{self.name}_{sport}_{i}', 'name': f'Jogo {i}', 'sport': sport, 'status': status,
+                 'start_time': start.isoformat(), 'bookmaker': self.name, 'markets': []}
+                for i in range(limit)]
+
+    def get_live_odds(self, sport='soccer', limit=50):
+        return self._events(sport, STATUS_LIVE, limit)
+
+    def get_upcoming_odds(self, sport='soccer', limit=50):
+        return self._events(sport, STATUS_UPCOMING, limit)
+
+
+def make_scheduler(adapters, **options):
+    clock = FakeClock()
+    options.setdefault('live_interval', 5)
+    options.setdefault('upcoming_interval', 60)
+    options.setdefault('limit', 3)
+    options.setdefault('workers', 2)
+    scheduler = IngestScheduler(lambda: adapters, clock=clock, **options)
+    return scheduler, clock
+
+
+def run_due(scheduler):
+    for future in scheduler.run_pending():
+        future.result()
+
+
+class TestOddsSnapshot:
+    """Testes do snapshot compartilhado."""
+
+    def test_filters_and_limits(self):
+        snapshot = OddsSnapshot()
+        snapshot.put(('a', 'soccer', STATUS_LIVE), [{'id': 1}, {'id': 2}])
+        snapshot.put(('b', 'soccer', STATUS_LIVE), [{'id': 3}])
+        snapshot.put(('a', 'tennis', STATUS_LIVE), [{'id': 4}])
+        snapshot.put(('a', 'soccer', STATUS_UPCOMING), [{'id': 5}])
+
+        assert [e['id'] for e in snapshot.events(STATUS_LIVE, ['soccer'])] == [1, 2, 3]
+        assert [e['id'] for e in snapshot.events(STATUS_LIVE, ['soccer'], ['b'])] == [3]
+        assert sorted(e['id'] for e in snapshot.events(STATUS_LIVE, ['soccer', 'tennis'], limit=1)) == [1, 3, 4]
+
+    def test_failure_keeps_last_events(self):
+        snapshot = OddsSnapshot()
+        key = ('a', 'soccer', STATUS_LIVE)
+        snapshot.put(key, [{'id': 1}])
+
+        snapshot.fail(key, 'timeout')
+
+        assert snapshot.get(key).events == [{'id': 1}]
+        assert snapshot.status()['a']['soccer:live']['error'] == 'timeout'
+
+
+class TestIngestScheduler:
+    """Testes do agendamento por feed."""
+
+    def test_live_refreshes_faster_than_upcoming(self):
+        adapter = FakeAdapter('a')
+        scheduler, clock = make_scheduler({'a': adapter}, sports=['soccer'])
+
+        run_due(scheduler)
+        assert sorted(adapter.calls) == [('soccer', STATUS_LIVE), ('soccer', STATUS_UPCOMING)]
+
+        clock.now += 5
+        run_due(scheduler)
+        clock.now += 5
+        run_due(scheduler)
+
+        assert adapter.calls.count(('soccer', STATUS_LIVE)) == 3
+        assert adapter.calls.count(('soccer', STATUS_UPCOMING)) == 1
+        assert scheduler.next_due_in() == 5
+
+    def test_reads_come_from_snapshot(self):
+        adapter = FakeAdapter('a')
+        scheduler, _ = make_scheduler({'a': adapter}, sports=['soccer'])
+        run_due(scheduler)
+        calls = len(adapter.calls)
+
+        for _ in range(100):
+            events = scheduler.read(STATUS_LIVE, ['soccer'], limit=2)
+
+        assert len(events) == 2
+        assert len(adapter.calls) == calls
+
+    def test_cold_feed_is_fetched_once_and_scheduled(self):
+        adapter = FakeAdapter('a')
+        scheduler, clock = make_scheduler({'a': adapter}, sports=[], known_sport=lambda sport: sport == 'tennis')
+
+        assert len(scheduler.read(STATUS_LIVE, ['tennis'])) == 3
+        assert scheduler.read(STATUS_LIVE, ['tennis'])
+        assert adapter.calls == [('tennis', STATUS_LIVE)]
+        assert 'tennis' in scheduler.sports
+
+        # O feed lido agora só vence no próximo intervalo; o futuro vence já
+        run_due(scheduler)
+        assert adapter.calls == [('tennis', STATUS_LIVE), ('tennis', STATUS_UPCOMING)]
+        clock.now += 5
+        run_due(scheduler)
+        assert adapter.calls.count(('tennis', STATUS_LIVE)) == 2
+
+    def test_stale_feed_is_refetched_without_thread(self):
+        adapter = FakeAdapter('a')
+        now = FakeClock()
+        scheduler, _ = make_scheduler({'a': adapter}, sports=['soccer'], snapshot=OddsSnapshot(clock=now))
+        key = ('a', 'soccer', STATUS_LIVE)
+
+        scheduler.read(STATUS_LIVE, ['soccer'])
+        scheduler.read(STATUS_LIVE, ['soccer'])
+        assert adapter.calls == [('soccer', STATUS_LIVE)]
+
+        now.now += scheduler.interval_for(key)
+        assert scheduler.read(STATUS_LIVE, ['soccer'])
+        assert adapter.calls == [('soccer', STATUS_LIVE)] * 2
+
+        # O reagendamento de cada coleta não acumula entradas no heap
+        for _ in range(10):
+            now.now += scheduler.interval_for(key)
+            scheduler.read(STATUS_LIVE, ['soccer'])
+        assert len(adapter.calls) == 12
+        assert len(scheduler._due) <= 2 * len(scheduler._next)
+
+    def test_unknown_sport_is_not_scheduled(self):
+        adapter = FakeAdapter('a')
+        scheduler, _ = make_scheduler({'a': adapter}, sports=['soccer'], known_sport=lambda sport: sport == 'tennis')
+        scheduled = dict(scheduler._next)
+
+        for i in range(20):
+            assert len(scheduler.read(STATUS_LIVE, [f'inventado{i}'])) == 3
+        # Lido de novo dentro do intervalo, sai do snapshot transitório
+        assert scheduler.read(STATUS_LIVE, ['inventado0'])
+        assert scheduler.bookmaker_status(STATUS_LIVE, ['inventado0'])['a']['status'] == 'ok'
+
+        assert scheduler._next == scheduled
+        assert scheduler.sports == ['soccer']
+        assert len(adapter.calls) == 20
+
+        scheduler.read(STATUS_LIVE, [' Tennis'])
+        assert scheduler.sports == ['soccer', 'tennis']
+
+    def test_failing_bookmaker_does_not_block_others(self):
+        scheduler, _ = make_scheduler({'a': FakeAdapter('a'), 'b': FakeAdapter('b', fail=True)}, sports=['soccer'])
+
+        run_due(scheduler)
+
+        assert {e['bookmaker'] for e in scheduler.read(STATUS_LIVE, ['soccer'])} == {'a'}
+        assert scheduler.snapshot.status()['b']['soccer:live']['error'] == 'fora do ar'
+
+    def test_background_thread_polls(self):
+        adapter = FakeAdapter('a')
+        scheduler = IngestScheduler(lambda: {'a': adapter}, sports=['soccer'], live_interval=0.01,
+                                    upcoming_interval=60, limit=1, workers=1,
+                                    policy=RefreshPolicy(live_interval=0.01, min_interval=0))
+        scheduler.start()
+        try:
+            deadline = time.monotonic() + 5
+            while adapter.calls.count(('soccer', STATUS_LIVE)) < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            scheduler.stop()
+
+        assert adapter.calls.count(('soccer', STATUS_LIVE)) >= 3
+
+
+def market_event(event_id, odds):
+    return {'id': event_id, 'bookmaker': 'a', 'markets': [
+        {'type': '1X2', 'selections': [{'name': 'casa', 'odds': odds}]}
+    ]}
+
+
+class TestDeltaDetection:
+    """Eventos inalterados não devem seguir adiante."""
+
+    def test_content_hash(self):
+        assert content_hash({'a': 1, 'b': [1.5]}) == content_hash({'a': 1, 'b': [1.5]})
+        assert content_hash({'a': 1}) != content_hash({'a': 2})
+
+    def test_delta_and_revision(self):
+        snapshot = OddsSnapshot()
+        key = ('a', 'soccer', STATUS_LIVE)
+
+        first = snapshot.put(key, [market_event(1, 2.0), market_event(2, 3.0)])
+        assert [e['id'] for e in first.changed] == [1, 2]
+        same = snapshot.put(key, [market_event(1, 2.0), market_event(2, 3.0)])
+        assert not same and snapshot.get(key).revision == 1
+
+        delta = snapshot.put(key, [market_event(1, 2.1), market_event(3, 1.5)])
+
+        assert [e['id'] for e in delta.changed] == [1, 3]
+        assert [e['id'] for e in delta.removed] == [2]
+        assert snapshot.get(key).revision == 2
+
+    def test_adapter_hash_is_used(self):
+        snapshot = OddsSnapshot()
+        key = ('a', 'soccer', STATUS_LIVE)
+        snapshot.put(key, [dict(market_event(1, 2.0), content_hash=7)])
+
+        # Hash igual: mudanças fora do documento bruto não geram delta
+        assert not snapshot.put(key, [dict(market_event(1, 9.0), content_hash=7)])
+
+    def test_listeners_only_see_changes(self):
+        odds = {'value': 2.0}
+
+        class Adapter:
+            def get_live_odds(self, sport, limit):
+                return [market_event(1, odds['value'])]
+
+            def get_upcoming_odds(self, sport, limit):
+                return []
+
+        scheduler, _ = make_scheduler({'a': Adapter()}, sports=[])
+        deltas = []
+        scheduler.subscribe(lambda key, delta: deltas.append((key, [e['id'] for e in delta.changed])))
+        key = ('a', 'soccer', STATUS_LIVE)
+
+        scheduler.poll(key)
+        scheduler.poll(key)
+        odds['value'] = 2.5
+        scheduler.poll(key)
+
+        assert deltas == [(key, [1]), (key, [1])]
+
+    def test_indexer_rescans_only_changed_events(self):
+        odds = {1: 2.0, 2: 3.0}
+
+        class Adapter:
+            def get_live_odds(self, sport, limit):
+                return [dict(market_event(i, o), name=f'Jogo {i}') for i, o in odds.items()]
+
+            def get_upcoming_odds(self, sport, limit):
+                return []
+
+        scheduler, _ = make_scheduler({'a': Adapter()}, sports=[])
+        index = ArbitrageIndex()
+        scheduler.subscribe(FeedIndexer(index, STATUS_LIVE))
+        touched = []
+        real_update = index.update
+        index.update = lambda event_id, *args: touched.append(event_id) or real_update(event_id, *args)
+        key = ('a', 'soccer', STATUS_LIVE)
+
+        scheduler.poll(key)
+        odds[2] = 3.5
+        scheduler.poll(key)
+
+        assert touched == [':Jogo 1', ':Jogo 2', ':Jogo 2']
+        assert index.get_market(':Jogo 2', '1X2').outcomes['casa'].quotes == {'a': 3.5}
+
+    def test_memo_recomputes_only_on_new_revision(self):
+        snapshot = OddsSnapshot()
+        memo = SnapshotMemo()
+        key = ('a', 'soccer', STATUS_LIVE)
+        runs = []
+
+        def detect():
+            signature, events = snapshot.view(STATUS_LIVE, ['soccer'])
+            return memo.get((signature, 'filtros'), lambda: runs.append(1) or len(events))
+
+        snapshot.put(key, [market_event(1, 2.0)])
+        detect()
+        snapshot.put(key, [market_event(1, 2.0)])
+        detect()
+        snapshot.put(key, [market_event(1, 2.0), market_event(2, 2.0)])
+
+        assert detect() == 2
+        assert len(runs) == 2
+        assert memo.hits == 1
+
+
+class SlowAdapter(FakeAdapter):
+    def __init__(self, name, delay, fail=False):
+        super().__init__(name, fail)
+        self.delay = delay
+
+    def _events(self, sport, status, limit):
+        time.sleep(self.delay)
+        return super()._events(sport, status, limit)
+
+
+class TestColdReadFanOut:
+    """Leituras de feeds sem coleta: casas em paralelo, com prazo."""
+
+    def test_adapters_are_polled_concurrently(self):
+        adapters = {name: SlowAdapter(name, 0.2) for name in ('a', 'b', 'c')}
+        scheduler, _ = make_scheduler(adapters, sports=['soccer'], workers=3)
+
+        started = time.perf_counter()
+        events = scheduler.read(STATUS_LIVE, ['soccer'])
+
+        assert time.perf_counter() - started < 0.5
+        assert {e['bookmaker'] for e in events} == {'a', 'b', 'c'}
+        assert {s['status'] for s in scheduler.bookmaker_status(STATUS_LIVE, ['soccer']).values()} == {'ok'}
+
+    def test_slow_bookmaker_is_cut_by_deadline(self):
+        adapters = {'a': SlowAdapter('a', 0.0), 'lenta': SlowAdapter('lenta', 0.5), 'b': FakeAdapter('b', fail=True)}
+        scheduler, _ = make_scheduler(adapters, sports=['soccer'], workers=3, read_deadline=0.1)
+
+        started = time.perf_counter()
+        events = scheduler.read(STATUS_LIVE, ['soccer'])
+        status = scheduler.bookmaker_status(STATUS_LIVE, ['soccer'])
+
+        assert time.perf_counter() - started < 0.4
+        assert {e['bookmaker'] for e in events} == {'a'}
+        assert status['a']['status'] == 'ok' and status['a']['events'] == 3
+        assert status['lenta']['status'] == 'pending'
+        assert status['b'] == {'status': 'error', 'events': 0, 'age': None, 'error': 'fora do ar'}
+
+        # A coleta atrasada é publicada ao terminar e não é repetida pela próxima leitura
+        deadline = time.monotonic() + 2
+        while 'lenta' not in {e['bookmaker'] for e in scheduler.read(STATUS_LIVE, ['soccer'])}:
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        assert adapters['lenta'].calls == [('soccer', STATUS_LIVE)]
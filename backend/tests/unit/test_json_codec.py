@@ -0,0 +1,118 @@
+"""Testes unitários para o codec JSON plugável."""
+
+import os
+import sys
+import json
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.core import json_codec
+from backend.core.json_codec import CodecJSONProvider, OrjsonCodec, StdlibCodec
+
+CODECS = [StdlibCodec]
+if json_codec.orjson is not None:
+    CODECS.append(OrjsonCodec)
+
+
+class Quote:
+    def to_dict(self):
+        return {'odds': 2.1}
+
+
+@pytest.fixture
+def restore_codec():
+    previous = json_codec._codec
+    yield
+    json_codec._codec = previous
+
+
+class TestCodecs:
+    """Os codecs devem produzir o mesmo JSON para os tipos do sistema."""
+
+    @pytest.mark.parametrize('codec_cls', CODECS)
+    def test_extended_types(self, codec_cls):
+        codec = codec_cls()
+        data = {
+            'when': datetime(2024, 1, 2, 3, 4, 5),
+            'stake': Decimal('10.5'),
+            'odds': np.array([1.5, 2.5]),
+            'count': np.int64(3),
+            'quote': Quote(),
+            'tags': {'a'},
+            'name': 'São Paulo',
+        }
+
+        decoded = codec.loads(codec.dumps_bytes(data))
+
+        assert decoded == {
+            'when': '2024-01-02T03:04:05', 'stake': 10.5, 'odds': [1.5, 2.5], 'count': 3,
+            'quote': {'odds': 2.1}, 'tags': ['a'], 'name': 'São Paulo',
+        }
+        assert codec.loads(codec.dumps(data)) == decoded
+        assert codec.loads(memoryview(codec.dumps_bytes([1]))) == [1]
+
+    @pytest.mark.parametrize('codec_cls', CODECS)
+    def test_unknown_type_raises(self, codec_cls):
+        with pytest.raises(TypeError):
+            codec_cls().dumps({'x': object()})
+
+    def test_selection(self, restore_codec):
+        assert json_codec.set_codec('json').name == 'json'
+        assert json_codec.dumps({'a': 1}) == '{"a":1}'
+        expected = 'orjson' if json_codec.orjson is not None else 'json'
+        assert json_codec.set_codec('auto').name == expected
+        with pytest.raises(ValueError):
+            json_codec.set_codec('yaml')
+
+
+class TestIntegrations:
+    """Uso do codec no Flask, no banco e nas notificações."""
+
+    def test_flask_provider(self):
+        app = Flask(__name__)
+        app.json = CodecJSONProvider(app)
+
+        @app.route('/echo', methods=['POST'])
+        def echo():
+            return jsonify(received=request.get_json(), when=datetime(2024, 1, 1))
+
+        resp = app.test_client().post('/echo', json={'odds': [1.9, 2.1]})
+
+        assert resp.mimetype == 'application/json'
+        assert json.loads(resp.data) == {'received': {'odds': [1.9, 2.1]}, 'when': '2024-01-01T00:00:00'}
+
+    def test_json_columns_are_encoded(self):
+        from database.database import _column_values
+
+        values = _column_values({'stakes_json': {'bk_a': 50.0}, 'selections_json': [1, 2], 'name': 'x', 'raw_json': '{}'})
+
+        assert json.loads(values[0]) == {'bk_a': 50.0}
+        assert json.loads(values[1]) == [1, 2]
+        assert values[2:] == ['x', '{}']
+
+    def test_notification_encodes_once(self):
+        from backend.services import notification
+
+        class Socket:
+            def __init__(self):
+                self.sent = []
+
+            async def send_text(self, text):
+                self.sent.append(text)
+
+        sockets = [Socket(), Socket()]
+        notification.active_connections[:] = sockets
+        try:
+            asyncio.run(notification.send_notification({'type': 'surebet', 'profit': 2.5}))
+        finally:
+            notification.active_connections.clear()
+
+        assert sockets[0].sent == sockets[1].sent
+        assert json.loads(sockets[0].sent[0]) == {'type': 'surebet', 'profit': 2.5}
@@ -0,0 +1,120 @@
+"""Testes unitários para a leitura incremental com projeção de campos."""
+
+import io
+import os
+import sys
+import json
+import logging
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.core.http_cache import ResponseCache
+from backend.core.json_stream import project_doc, stream_doc
+from backend.core.rate_limit import FetchGuard
+from backend.apps.radar_api import SportRadarAPI
+
+FIELDS = ('id', 'name', 'markets')
+
+
+def tree(n):
+    return {'doc': [
+        {'id': i, 'name': f'Jogo {i}', 'markets': [], 'tournament': {'big': 'x' * 100}, 'extra': list(range(50))}
+        for i in range(n)
+    ]}
+
+
+class StreamResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, body):
+        self.raw = io.BytesIO(body)
+        self.closed = False
+
+    @property
+    def text(self):
+        raise AssertionError('corpo não deve ser formatado para log')
+
+    def raise_for_status(self):
+        pass
+
+    @property
+    def content(self):
+        return self.raw.getvalue()
+
+    def json(self):
+        return json.loads(self.raw.getvalue())
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTransport:
+    session = None
+
+    def __init__(self, response):
+        self.response = response
+        self.kwargs = None
+
+    def get(self, url, **kwargs):
+        self.kwargs = kwargs
+        return self.response
+
+
+def api_for(response):
+    transport = FakeTransport(response)
+    return SportRadarAPI('bet365', transport, ResponseCache(), guard=FetchGuard('teste', rate_limit=0)), transport
+
+
+class TestJsonStream:
+    """Testes da projeção e do limite."""
+
+    def test_projection_and_limit(self):
+        body = json.dumps(tree(10)).encode()
+
+        result = stream_doc(io.BytesIO(body), FIELDS, limit=3)
+
+        assert result == project_doc(tree(10), FIELDS, 3)
+        assert [item['id'] for item in result['doc']] == [0, 1, 2]
+        assert all(set(item) == set(FIELDS) for item in result['doc'])
+
+    def test_without_fields_or_limit(self):
+        data = tree(2)
+
+        assert stream_doc(io.BytesIO(json.dumps(data).encode())) == data
+        assert project_doc(None) == {'doc': []}
+        assert project_doc(data, limit=0) == {'doc': []}
+
+    def test_incremental_reader_stops_at_limit(self):
+        pytest.importorskip('ijson')
+        body = json.dumps(tree(5)).encode()
+        # Corpo truncado após o segundo item: só é válido se a leitura parar antes
+        cut = body.index(b'{"id": 2')
+
+        result = stream_doc(io.BytesIO(body[:cut]), FIELDS, limit=2)
+
+        assert [item['id'] for item in result['doc']] == [0, 1]
+
+
+class TestModalDocs:
+    """Testes da integração com o cliente."""
+
+    def test_streams_projected_events(self):
+        response = StreamResponse(json.dumps(tree(8)).encode())
+        api, transport = api_for(response)
+
+        result = api.modal_docs('1', limit=4, fields=FIELDS)
+
+        assert transport.kwargs['stream'] is True
+        assert len(result['doc']) == 4
+        assert 'tournament' not in result['doc'][0]
+        assert response.closed
+
+    def test_body_is_not_formatted_without_debug(self, caplog):
+        response = StreamResponse(json.dumps(tree(1)).encode())
+        api, _ = api_for(response)
+
+        with caplog.at_level(logging.INFO, logger='backend.apps.radar_api'):
+            assert api.modal_data('1') == tree(1)
@@ -0,0 +1,95 @@
+"""Testes unitários para o modelo compacto de odds."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.services.arbitrage import EffectiveOddsTransform, SurebetDetector
+from backend.services import models
+from backend.services.models import MarketBook, NameTable, Quote, intern_tables
+from backend.tests.unit.test_arbitrage import random_events
+
+
+class TestNameTable:
+    """Testes da internação de nomes."""
+
+    def test_ids_are_stable(self):
+        table = NameTable()
+        assert table.id('bet365') == 0
+        assert table.id('pinnacle') == 1
+        assert table.id('bet365') == 0
+        assert table.name(1) == 'pinnacle'
+        assert len(table) == 2
+
+
+class TestMarketBook:
+    """Testes do livro de mercado em colunas."""
+
+    def test_quote_behaves_like_selection_dict(self):
+        tables = intern_tables()
+        quote = Quote(tables.selections.id('Casa'), tables.bookmakers.id('bet365'), 2.1, tables)
+        assert quote['name'] == 'Casa'
+        assert quote['bookmaker'] == 'bet365'
+        assert quote.get('odds') == 2.1
+        assert quote.get('missing') is None
+        assert quote.to_dict() == {'name': 'Casa', 'odds': 2.1, 'bookmaker': 'bet365'}
+        with pytest.raises(AttributeError):
+            quote.extra = 1
+
+    def test_round_trip(self):
+        event = random_events(1, 3, 3, seed=2)[0]
+        book = MarketBook.from_selections(event['event_id'], event['market'], event['selections'])
+        assert len(book) == 9
+        assert book.outcome_count() == 3
+        assert book.to_dict() == event
+
+    def test_detector_accepts_books(self):
+        events = random_events(80, 5, 3, seed=13)
+        books = [MarketBook.from_selections(e['event_id'], e['market'], e['selections']) for e in events]
+
+        for method in (SurebetDetector.find_surebets, SurebetDetector.find_best_surebets):
+            expected = [(s['event_id'], s['arbitrage_index']) for s in method(events)]
+            got = [(s['event_id'], s['arbitrage_index']) for s in method(books)]
+            assert got == pytest.approx(expected)
+
+    def test_implied_sum_with_transform(self):
+        book = MarketBook.from_selections('e1', '1X2', [
+            {'name': 'Casa', 'odds': 2.1}, {'name': 'Fora', 'odds': 2.2}
+        ], bookmaker='betfair')
+        assert book.implied_sum() == pytest.approx(1 / 2.1 + 1 / 2.2)
+
+        transform = EffectiveOddsTransform({'betfair': {'max_odds': 2.15, 'commission_rate': 0.05}})
+        assert book.implied_sum(transform) is None
+
+    def test_from_adapter_events_merges_bookmakers(self):
+        events = [
+            {'name': 'A vs B', 'sport': 'soccer', 'bookmaker': bookmaker, 'markets': [
+                {'type': '1X2', 'name': 'Resultado Final', 'selections': [
+                    {'name': 'A', 'odds': odds}, {'name': 'Empate', 'odds': 3.3}, {'name': 'B', 'odds': 3.0}
+                ]}
+            ]}
+            for bookmaker, odds in (('bet365', 2.4), ('pinnacle', 2.6))
+        ]
+        books = MarketBook.from_adapter_events(events)
+        assert len(books) == 1
+        assert books[0].label == 'Resultado Final'
+        tables = books[0].tables
+        assert books[0].best_odds()[tables.selections.id('A')] == (2.6, tables.bookmakers.id('pinnacle'))
+
+    def test_name_tables_are_bounded(self, monkeypatch):
+        monkeypatch.setattr(models.settings, 'MODEL_NAME_TABLE_LIMIT', 10)
+        monkeypatch.setattr(models, '_tables', models.InternTables())
+
+        books = [MarketBook.from_selections(f'e{i}', '1X2', [
+            {'name': f'Time {i}', 'odds': 2.0}, {'name': f'Rival {i}', 'odds': 2.1}
+        ], bookmaker='bet365') for i in range(20)]
+
+        assert len(intern_tables()) <= 10
+        assert books[0].tables is not books[-1].tables
+        # Livros antigos continuam resolvendo os nomes pela sua geração
+        assert books[0].to_dict()['selections'][0] == {'name': 'Time 0', 'odds': 2.0, 'bookmaker': 'bet365'}
+        assert list(books[0])[0] == list(MarketBook.from_selections('x', '1X2', [
+            {'name': 'Time 0', 'odds': 2.0}], bookmaker='bet365'))[0]
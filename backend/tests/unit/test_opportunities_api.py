@@ -0,0 +1,149 @@
+"""Testes unitários para /api/opportunities, /api/games/*, /api/surebets/* e /api/signals/*."""
+
+import os
+import sys
+import itertools
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.apps import admin_api
+from backend.services.arbitrage_index import ArbitrageIndex
+
+
+# Assinatura distinta por scheduler, para o memo de oportunidades não vazar entre testes
+_signatures = itertools.count()
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.reads = []
+        self.events = []
+        self.signature = (next(_signatures),)
+
+    def view(self, status, sports, bookmakers=None, limit=None, deadline=None):
+        self.reads.append((status, list(sports), list(bookmakers or [])))
+        return self.signature, self.events
+
+    def read(self, status, sports, bookmakers=None, limit=None, deadline=None):
+        self.reads.append((status, list(sports), list(bookmakers or [])))
+        return []
+
+    def bookmaker_status(self, status, sports, bookmakers=None):
+        return {}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    scheduler = FakeScheduler()
+    monkeypatch.setattr(admin_api, 'get_ingest_scheduler', lambda: scheduler)
+    monkeypatch.setattr(admin_api, 'get_all_adapters', lambda: {})
+    admin_api.app.config['TESTING'] = True
+    with admin_api.app.test_client() as client:
+        client.scheduler = scheduler
+        yield client
+
+
+class TestOpportunitiesInput:
+    """Campos nulos ou inválidos não derrubam o handler."""
+
+    def test_null_lists_are_treated_as_missing(self, client):
+        response = client.post('/api/opportunities', json={'sports': None, 'bookmakers': None})
+
+        assert response.status_code == 200
+        assert response.get_json()['opportunities'] == []
+        assert client.scheduler.reads == [('live', ['soccer'], [])]
+
+    @pytest.mark.parametrize('body', [
+        {'limit': 'dez'},
+        {'limit': [1]},
+        {'min_profit': 'alto'},
+        {'bookmakers': 'bet365'},
+        {'sports': [1, 2]},
+    ])
+    def test_invalid_fields_return_400(self, client, body):
+        response = client.post('/api/opportunities', json=body)
+
+        assert response.status_code == 400
+        assert client.scheduler.reads == []
+
+    def test_cross_market_must_be_boolean(self, client):
+        assert client.post('/api/opportunities', json={'cross_market': 'sim'}).status_code == 400
+
+    def test_games_limit_must_be_integer(self, client):
+        assert client.get('/api/games/live?limit=x').status_code == 400
+        assert client.get('/api/games/upcoming?limit=5').status_code == 200
+
+
+def adapter_event(bookmaker, market_type, label, *quotes):
+    return {'name': 'A vs B', 'sport': 'soccer', 'status': 'live', 'start_time': None, 'bookmaker': bookmaker,
+            'markets': [{'type': market_type, 'name': label,
+                         'selections': [{'name': n, 'odds': o} for n, o in quotes]}]}
+
+
+class TestCrossMarketOpportunities:
+    """Surebets entre mercados diferentes do mesmo evento."""
+
+    def test_cross_market_is_opt_in(self, client):
+        client.scheduler.events = [
+            adapter_event('bet365', '1X2', 'Resultado Final', ('Casa', 2.3), ('Empate', 3.0), ('Visitante', 3.0)),
+            adapter_event('pinnacle', 'DC', 'Dupla Chance', ('X2', 1.9), ('1X', 1.2)),
+        ]
+
+        plain = client.post('/api/opportunities', json={'min_profit': 0}).get_json()
+        assert plain['opportunities'] == []
+
+        body = client.post('/api/opportunities', json={'min_profit': 0, 'cross_market': True}).get_json()
+        assert body['total'] == 1
+        opportunity = body['opportunities'][0]
+        assert opportunity['cross_market'] is True
+        assert opportunity['market'] == 'Resultado Final + Dupla Chance'
+        assert {(s['name'], s['bookmaker']) for s in opportunity['selections']} == {('Casa', 'bet365'), ('X2', 'pinnacle')}
+        assert opportunity['profit'] == pytest.approx((1 - 1 / 2.3 - 1 / 1.9) * 100, abs=0.01)
+
+        other = client.post('/api/opportunities', json={'min_profit': 0, 'cross_market': True,
+                                                        'bookmakers': ['bet365']}).get_json()
+        assert other['opportunities'] == []
+
+
+class TestIndexedSurebets:
+    """Surebets lidas do índice incremental da coleta."""
+
+    def test_reads_open_surebets_from_index(self, client, monkeypatch):
+        index = ArbitrageIndex()
+        index.update('soccer:A vs B', '1X2', 'bet365', 'A', 2.2)
+        index.update('soccer:A vs B', '1X2', 'pinnacle', 'B', 2.1)
+        monkeypatch.setattr(admin_api, 'get_arbitrage_index', lambda status: index)
+
+        response = client.get('/api/surebets/live')
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['total'] == 1
+        assert body['surebets'][0]['event_id'] == 'soccer:A vs B'
+
+    def test_invalid_status_and_limit(self, client):
+        assert client.get('/api/surebets/finished').status_code == 400
+        assert client.get('/api/surebets/live?limit=x').status_code == 400
+
+
+class TestSignalsEndpoint:
+    """Sinais calculados sobre o índice incremental."""
+
+    def test_returns_middles_from_index(self, client, monkeypatch):
+        index = ArbitrageIndex()
+        index.update('soccer:A vs B', 'OU', 'bet365', 'Mais de 2.5', 2.00)
+        index.update('soccer:A vs B', 'OU', 'betfair', 'Menos de 3.5', 1.98)
+        monkeypatch.setattr(admin_api, 'get_arbitrage_index', lambda status: index)
+
+        body = client.get('/api/signals/upcoming').get_json()
+
+        assert [m['middle_goals'] for m in body['middles']] == [[3]]
+        assert body['surebets'] == [] and body['value_bets'] == []
+        assert client.get('/api/signals/upcoming?max_middle_loss=0.1').get_json()['middles'] == []
+
+    def test_invalid_parameters(self, client):
+        assert client.get('/api/signals/live?min_edge=alto').status_code == 400
+        assert client.get('/api/signals/live?limit=x').status_code == 400
+        assert client.get('/api/signals/finished').status_code == 400
@@ -0,0 +1,79 @@
+"""Testes unitários para a detecção paralela de surebets."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.services.arbitrage import SurebetDetector
+from backend.services.models import MarketBook
+from backend.services.parallel import ParallelSurebetDetector, decode_shard, encode_shard, MODE_BEST
+from backend.tests.unit.test_arbitrage import random_events
+
+
+class TestShardEncoding:
+    """Testes do formato colunar das partições."""
+
+    def test_round_trip(self):
+        events = random_events(10, 3, 3, seed=1)
+        decoded = decode_shard(encode_shard(events))
+        assert len(decoded) == len(events)
+        for original, event in zip(events, decoded):
+            assert [(s['name'], s['odds'], s['bookmaker']) for s in event['selections']] == \
+                [(s['name'], s['odds'], s['bookmaker']) for s in original['selections']]
+
+    def test_shard_keeps_event_markets_together(self):
+        events = [{'event_id': f'e{i % 7}', 'market': f'm{i}', 'selections': []} for i in range(50)]
+        shards = ParallelSurebetDetector.shard(events, 4)
+        owners = {}
+        for n, shard in enumerate(shards):
+            for event in shard:
+                assert owners.setdefault(event['event_id'], n) == n
+
+
+class TestParallelSurebetDetector:
+    """Testes de equivalência com o detector sequencial."""
+
+    def test_matches_serial(self):
+        events = random_events(200, 5, 3, seed=21)
+        expected = SurebetDetector.find_surebets(events)
+        with ParallelSurebetDetector(workers=2, min_events=0) as detector:
+            got = detector.find_surebets(events)
+
+        assert [s['profit_percent'] for s in got] == pytest.approx([s['profit_percent'] for s in expected])
+        key = lambda s: (s['event_id'], tuple(id(sel) for sel in s['selections']))
+        assert {key(s) for s in got} == {key(s) for s in expected}
+
+    def test_best_mode_and_serial_fallback(self):
+        events = random_events(120, 4, 3, seed=4)
+        expected = {s['event_id']: s['arbitrage_index'] for s in SurebetDetector.find_best_surebets(events)}
+        with ParallelSurebetDetector(workers=3, min_events=0, mode=MODE_BEST) as detector:
+            got = {s['event_id']: s['arbitrage_index'] for s in detector.find_surebets(events)}
+        assert got == pytest.approx(expected)
+
+        detector = ParallelSurebetDetector(workers=4, min_events=10 ** 6)
+        assert len(detector.find_surebets(events)) == len(SurebetDetector.find_surebets(events))
+        assert detector._executor is None
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            ParallelSurebetDetector(mode='fast')
+
+    def test_books_match_stream_surebets(self):
+        books = [MarketBook.from_selections(e['event_id'], e['market'], e['selections'])
+                 for e in random_events(300, 5, 3, seed=8)]
+        bookmakers = ['book_0', 'book_1', 'book_2']
+        predicate = lambda book: book.event_id != 'evt_3'
+        expected = list(SurebetDetector.stream_surebets(books, min_profit=1.0, limit=20,
+                                                        bookmakers=bookmakers, predicate=predicate))
+
+        with ParallelSurebetDetector(workers=2, min_events=0) as detector:
+            got = detector.best_surebets(books, min_profit=1.0, limit=20, bookmakers=bookmakers,
+                                         predicate=predicate)
+
+        assert expected
+        assert [s['profit_percent'] for s in got] == pytest.approx([s['profit_percent'] for s in expected])
+        assert {(s['event_id'], s['market']) for s in got} == {(s['event_id'], s['market']) for s in expected}
+        assert all(sel['bookmaker'] in bookmakers and hasattr(sel, 'to_dict') for s in got for sel in s['selections'])
@@ -0,0 +1,140 @@
+"""Testes unitários para a prioridade de atualização por evento."""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.services.ingest import STATUS_LIVE, STATUS_UPCOMING, IngestScheduler
+from backend.services.priority import RefreshPolicy, VolatilityTracker, parse_start_time
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+def policy(**options):
+    options.setdefault('live_interval', 5)
+    options.setdefault('upcoming_interval', 60)
+    options.setdefault('min_interval', 1)
+    options.setdefault('max_interval', 300)
+    options.setdefault('kickoff_ratio', 60)
+    options.setdefault('volatility_ref', 5)
+    return RefreshPolicy(now=lambda: NOW, **options)
+
+
+def event(status='upcoming', starts_in=None, event_id='e1', odds=(2.0, 3.0), bookmaker='a'):
+    start = (NOW + starts_in).isoformat() if starts_in is not None else ''
+    return {'id': event_id, 'status': status, 'start_time': start, 'bookmaker': bookmaker, 'markets': [
+        {'type': '1X2', 'selections': [{'name': 'casa', 'odds': odds[0]}, {'name': 'fora', 'odds': odds[1]}]}
+    ]}
+
+
+class TestRefreshPolicy:
+    """Testes dos intervalos por evento."""
+
+    def test_kickoff_proximity(self):
+        p = policy()
+
+        assert p.event_interval(event(starts_in=timedelta(hours=1))) == 60
+        assert p.event_interval(event(starts_in=timedelta(minutes=15))) == 15
+        assert p.event_interval(event(starts_in=timedelta(days=3))) == 300
+        assert p.event_interval(event(starts_in=timedelta(minutes=-5))) == 5
+        assert p.event_interval(event()) == 60
+
+    def test_live_and_volatility(self):
+        p = policy()
+
+        assert p.event_interval(event('live')) == 5
+        assert p.event_interval(event('live'), volatility=5) == pytest.approx(2.5)
+        assert p.event_interval(event('live'), volatility=500) == 1
+
+    def test_feed_uses_most_urgent_event(self):
+        p = policy()
+        far = event(starts_in=timedelta(days=2), event_id='far')
+        soon = event(starts_in=timedelta(minutes=20), event_id='soon')
+
+        assert p.feed_interval(STATUS_UPCOMING, [far]) == 300
+        assert p.feed_interval(STATUS_UPCOMING, [far, soon]) == 20
+        assert p.feed_interval(STATUS_UPCOMING, [soon], lambda i: 5.0) == 10
+        assert p.feed_interval(STATUS_UPCOMING, []) == 60
+        assert p.feed_interval(STATUS_LIVE, []) == 5
+
+    def test_parse_start_time(self):
+        assert parse_start_time('2024-06-01T12:00:00Z').tzinfo is not None
+        assert parse_start_time(0).year == 1970
+        assert parse_start_time('amanhã') is None
+
+
+class TestVolatilityTracker:
+    """Testes da volatilidade observada."""
+
+    def test_observed_changes(self):
+        tracker = VolatilityTracker(decay=0.5)
+        tracker.observe([event(odds=(2.0, 3.0))])
+        assert tracker.get('e1') == 0.0
+
+        tracker.observe([event(odds=(2.2, 3.3))])
+        assert tracker.get('e1') == pytest.approx(10.0)
+
+        tracker.observe([event(odds=(2.2, 3.3))])
+        assert tracker.get('e1') == pytest.approx(5.0)
+
+    def test_bookmakers_are_compared_separately(self):
+        tracker = VolatilityTracker()
+        tracker.observe([event(odds=(2.0, 3.0), bookmaker='a'), event(odds=(2.5, 3.5), bookmaker='b')])
+
+        assert tracker.get('e1') == 0.0
+
+    def test_history_merge_and_forget(self):
+        tracker = VolatilityTracker(decay=0.5)
+        tracker.merge({'e1': -4.0, 'e2': 2.0})
+
+        tracker.forget(['e1'])
+
+        assert tracker.get('e1') == 4.0
+        assert tracker.get('e2') == 0.0
+
+    def test_reloading_history_does_not_compound(self):
+        tracker = VolatilityTracker(decay=0.5)
+        tracker.observe([event(odds=(2.0, 3.0))])
+        tracker.observe([event(odds=(2.2, 3.3))])
+
+        for _ in range(5):
+            tracker.merge({'e1': 4.0})
+        assert tracker.get('e1') == pytest.approx(10.0)
+
+        # A média observada decai; a linha de base só muda com a próxima janela
+        for _ in range(5):
+            tracker.settle(['e1'])
+        assert tracker.get('e1') == 4.0
+        tracker.merge({})
+        assert tracker.get('e1') < 1.0
+
+
+class TestPriorityScheduling:
+    """O scheduler deve seguir o intervalo do evento mais urgente."""
+
+    def test_feed_interval_follows_events(self):
+        events = {'now': [event(starts_in=timedelta(days=2))]}
+
+        class Adapter:
+            def get_upcoming_odds(self, sport, limit):
+                return events['now']
+
+            def get_live_odds(self, sport, limit):
+                return []
+
+        clock_now = [0.0]
+        scheduler = IngestScheduler(lambda: {'a': Adapter()}, sports=['soccer'], policy=policy(),
+                                    history=lambda: {}, workers=1, clock=lambda: clock_now[0])
+        key = ('a', 'soccer', STATUS_UPCOMING)
+
+        scheduler.poll(key)
+        assert scheduler.interval_for(key) == 300
+
+        events['now'] = [event(starts_in=timedelta(days=2)), event(starts_in=timedelta(minutes=10), event_id='e2')]
+        scheduler.poll(key)
+        assert scheduler.interval_for(key) == 10
+        assert scheduler.interval_for(('a', 'soccer', STATUS_LIVE)) == scheduler.intervals[STATUS_LIVE]
@@ -0,0 +1,83 @@
+"""Testes unitários para os clientes da SportRadar."""
+
+import os
+import sys
+import time
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.apps.radar_api import AsyncSportRadarAPI, SportRadarAPI, gather_bookmakers
+
+
+class RecordingSync(SportRadarAPI):
+    def __init__(self, house):
+        super().__init__(house)
+        self.urls = []
+
+    def _get(self, url, endpoint=None, debug=False):
+        self.urls.append(url)
+        return {'doc': [{'data': [{'id': 1}]}]}
+
+
+class RecordingAsync(AsyncSportRadarAPI):
+    def __init__(self, house, delay=0.0, fail=False):
+        super().__init__(house)
+        self.urls = []
+        self.delay = delay
+        self.fail = fail
+
+    async def _get(self, url, endpoint=None):
+        self.urls.append(url)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError('indisponível')
+        return {'doc': [{'data': [{'id': 1}]}]}
+
+
+class TestAsyncSportRadarAPI:
+    """Testes do cliente assíncrono."""
+
+    @pytest.mark.parametrize('method, args', [
+        ('all_definitions', ()),
+        ('modal_data', ('1', 'categories')),
+        ('local_data', ('1', '42')),
+        ('league', ('7',)),
+        ('league_summary', ('7',)),
+        ('season_goals', ('7',)),
+        ('league_fixtures', ('7',)),
+        ('get_by_path', ('bet365/en/x',)),
+        ('get_info', ('Europe:Berlin', 'stats_season_meta', '7')),
+        ('get_sports_ids', ()),
+        ('modal_data_region', ('1', 'America:Sao_Paulo')),
+        ('league_fixtures_region', ('7', 'Europe:Berlin')),
+    ])
+    def test_same_surface_and_urls_as_sync_client(self, method, args):
+        sync, async_ = RecordingSync('bet365'), RecordingAsync('bet365')
+
+        expected = getattr(sync, method)(*args)
+        result = asyncio.run(getattr(async_, method)(*args))
+
+        assert result == expected
+        assert async_.urls == sync.urls
+
+    def test_fan_out_latency_is_the_slowest_bookmaker(self):
+        clients = {house: RecordingAsync(house, delay=0.2) for house in ('bet365', 'pinnacle', 'betfair', 'superodds')}
+
+        start = time.perf_counter()
+        results = asyncio.run(gather_bookmakers(clients, lambda api: api.modal_data('1')))
+        elapsed = time.perf_counter() - start
+
+        assert set(results) == set(clients)
+        assert all(results.values())
+        assert elapsed < 0.6
+
+    def test_fan_out_isolates_failures(self):
+        clients = {'bet365': RecordingAsync('bet365'), 'pinnacle': RecordingAsync('pinnacle', fail=True)}
+
+        results = asyncio.run(gather_bookmakers(clients, lambda api: api.league('7')))
+
+        assert results['pinnacle'] is None
+        assert results['bet365'] is not None
@@ -0,0 +1,212 @@
+"""Testes unitários para limite de taxa, novas tentativas e circuit breaker."""
+
+import os
+import sys
+import asyncio
+import threading
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.core import rate_limit
+from backend.core.rate_limit import (
+    CIRCUIT_CLOSED, CIRCUIT_OPEN, CircuitOpenError, FetchGuard, TokenBucket, get_guard, parse_retry_after
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def scripted(*outcomes):
+    """Função de envio que devolve (ou levanta) cada item em sequência."""
+    outcomes = list(outcomes)
+    calls = []
+
+    def send():
+        calls.append(1)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    send.calls = calls
+    return send
+
+
+def make_guard(clock=None, **options):
+    clock = clock or FakeClock()
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    options.setdefault('rate_limit', 0)
+    options.setdefault('max_retries', 3)
+    options.setdefault('backoff_base', 1.0)
+    options.setdefault('backoff_max', 10.0)
+    options.setdefault('breaker_threshold', 3)
+    options.setdefault('breaker_reset', 60)
+    guard = FetchGuard('teste', clock=clock, sleep=sleep, **options)
+    return guard, sleeps, clock
+
+
+class TestTokenBucket:
+    """Testes do token bucket."""
+
+    def test_burst_then_paced(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, burst=3, clock=clock)
+
+        waits = [bucket.reserve() for _ in range(5)]
+
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3:] == pytest.approx([0.5, 1.0])
+        clock.now += 10
+        assert bucket.reserve() == 0.0
+
+
+class TestFetchGuard:
+    """Testes das políticas por casa."""
+
+    def test_retries_server_errors_with_bounded_jitter(self):
+        guard, sleeps, _ = make_guard()
+        send = scripted(Response(503), Response(502), Response(200))
+
+        assert guard.call(send).status_code == 200
+        assert len(send.calls) == 3
+        backoffs = [s for s in sleeps if s]
+        assert 0 <= backoffs[0] <= 1.0 and 0 <= backoffs[1] <= 2.0
+        assert guard.breaker.state == CIRCUIT_CLOSED
+
+    def test_honours_retry_after(self):
+        guard, sleeps, _ = make_guard()
+        send = scripted(Response(429, {'Retry-After': '4'}), Response(200))
+
+        guard.call(send)
+
+        assert 4.0 in sleeps
+
+    def test_gives_up_after_max_retries(self):
+        guard, _, _ = make_guard(max_retries=1, breaker_threshold=10)
+        send = scripted(Response(500), Response(500))
+
+        assert guard.call(send).status_code == 500
+        assert len(send.calls) == 2
+
+    def test_network_errors_are_retried_then_raised(self):
+        guard, _, _ = make_guard(max_retries=1, breaker_threshold=10)
+        send = scripted(requests.ConnectionError('a'), requests.Timeout('b'))
+
+        with pytest.raises(requests.Timeout):
+            guard.call(send)
+        assert len(send.calls) == 2
+
+    def test_not_found_is_not_retried_but_opens_circuit(self):
+        guard, _, clock = make_guard(breaker_threshold=2)
+
+        for _ in range(2):
+            assert guard.call(scripted(Response(404))).status_code == 404
+        assert guard.breaker.state == CIRCUIT_OPEN
+        with pytest.raises(CircuitOpenError):
+            guard.call(scripted(Response(200)))
+
+        clock.now += 61
+        assert guard.call(scripted(Response(200))).status_code == 200
+        assert guard.breaker.state == CIRCUIT_CLOSED
+
+    def test_failed_half_open_trial_reopens(self):
+        guard, _, clock = make_guard(breaker_threshold=1, max_retries=0)
+        guard.call(scripted(Response(500)))
+        clock.now += 61
+
+        guard.call(scripted(Response(500)))
+
+        assert guard.breaker.state == CIRCUIT_OPEN
+
+    def test_half_open_lets_a_single_probe_through(self):
+        guard, _, clock = make_guard(breaker_threshold=1, max_retries=0)
+        guard.call(scripted(Response(500)))
+        clock.now += 61
+        entered = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_probe():
+            calls.append(1)
+            entered.set()
+            release.wait(2)
+            return Response(200)
+
+        probe = threading.Thread(target=lambda: guard.call(slow_probe))
+        probe.start()
+        assert entered.wait(2)
+
+        # Outra chamada durante a chamada de teste é rejeitada sem chegar à origem
+        rejected = []
+
+        def second():
+            try:
+                guard.call(slow_probe)
+            except CircuitOpenError:
+                rejected.append(1)
+
+        other = threading.Thread(target=second)
+        other.start()
+        other.join(2)
+        release.set()
+        probe.join(2)
+
+        assert calls == [1]
+        assert rejected == [1]
+        assert guard.breaker.state == CIRCUIT_CLOSED
+
+    def test_inconclusive_probe_is_released(self):
+        guard, _, clock = make_guard(breaker_threshold=1, max_retries=0)
+        guard.call(scripted(Response(500)))
+        clock.now += 61
+
+        assert guard.call(scripted(Response(429))).status_code == 429
+        assert guard.call(scripted(Response(200))).status_code == 200
+        assert guard.breaker.state == CIRCUIT_CLOSED
+
+    def test_async_call(self):
+        guard, _, _ = make_guard(backoff_base=0.001, backoff_max=0.001)
+        responses = [Response(500), Response(200)]
+
+        async def send():
+            return responses.pop(0)
+
+        assert asyncio.run(guard.acall(send)).status_code == 200
+
+
+def test_get_guard_applies_options_to_existing_guard(monkeypatch):
+    monkeypatch.setattr(rate_limit, '_guards', {})
+    # O cliente do catálogo cria a guarda sem opções antes do adaptador
+    guard = get_guard('casa')
+    configured = get_guard('casa', rate_limit=0.5, max_retries=2)
+
+    assert configured is guard
+    assert guard.bucket.rate == 0.5
+    assert guard.max_retries == 2
+    assert get_guard('casa').max_retries == 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('nonsense') is None
@@ -0,0 +1,168 @@
+"""Testes unitários para o motor de middles e value bets."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.services.arbitrage_index import ArbitrageIndex
+from backend.services.signals import SignalEngine, SIGNAL_MIDDLE, SIGNAL_SUREBET, SIGNAL_VALUE_BET
+
+
+def market(event_id, market_type, *quotes):
+    selections = [{'name': n, 'odds': o, 'bookmaker': b} for n, o, b in quotes]
+    return {'event_id': event_id, 'market': market_type, 'selections': selections}
+
+
+class TestValueBets:
+    """Testes de value bets contra a casa de referência."""
+
+    def test_detects_edge_over_fair_odds(self):
+        engine = SignalEngine.from_events([market(
+            'e1', '1X2',
+            ('Casa', 2.00, 'pinnacle'), ('Empate', 3.40, 'pinnacle'), ('Visitante', 4.00, 'pinnacle'),
+            ('Casa', 2.25, 'bet365'), ('Empate', 3.30, 'bet365'), ('Visitante', 3.80, 'bet365'),
+        )], min_edge=0.02)
+
+        value_bets = engine.scan()['value_bets']
+
+        assert len(value_bets) == 1
+        bet = value_bets[0]
+        assert bet['type'] == SIGNAL_VALUE_BET
+        assert (bet['selection'], bet['bookmaker'], bet['odds']) == ('Casa', 'bet365', 2.25)
+        overround = 1 / 2.00 + 1 / 3.40 + 1 / 4.00
+        assert bet['fair_odds'] == pytest.approx(2.00 * overround)
+        assert bet['edge_percent'] == pytest.approx((2.25 / (2.00 * overround) - 1) * 100)
+
+    def test_requires_complete_sharp_market(self):
+        engine = SignalEngine.from_events([market(
+            'e1', '1X2',
+            ('Casa', 2.00, 'pinnacle'), ('Empate', 3.40, 'pinnacle'),
+            ('Casa', 3.00, 'bet365'), ('Empate', 3.30, 'bet365'), ('Visitante', 3.80, 'bet365'),
+        )])
+
+        assert engine.scan()['value_bets'] == []
+
+    def test_totals_are_normalized_per_line(self):
+        engine = SignalEngine.from_events([market(
+            'e1', 'OU',
+            ('Mais de 2.5', 1.90, 'pinnacle'), ('Menos de 2.5', 1.90, 'pinnacle'),
+            ('Mais de 3.5', 3.00, 'pinnacle'), ('Menos de 3.5', 1.35, 'pinnacle'),
+            ('Mais de 2.5', 2.05, 'betfair'),
+        )], min_edge=0.02)
+
+        value_bets = engine.scan()['value_bets']
+
+        assert [(b['selection'], b['bookmaker']) for b in value_bets] == [('Mais de 2.5', 'betfair')]
+        assert value_bets[0]['fair_odds'] == pytest.approx(2.0)
+
+
+class TestMiddles:
+    """Testes de middles entre linhas de totais."""
+
+    def test_detects_overlapping_lines(self):
+        engine = SignalEngine.from_events([market(
+            'e1', 'OU',
+            ('Mais de 2.5', 2.00, 'bet365'), ('Menos de 3.5', 1.98, 'betfair'),
+        )], max_middle_loss=2.0)
+
+        middles = engine.scan()['middles']
+
+        assert len(middles) == 1
+        middle = middles[0]
+        assert middle['type'] == SIGNAL_MIDDLE
+        assert middle['middle_goals'] == [3]
+        assert {s['bookmaker'] for s in middle['selections']} == {'bet365', 'betfair'}
+        arb_index = 1 / 2.00 + 1 / 1.98
+        assert middle['loss_percent'] == pytest.approx((1 - 1 / arb_index) * 100)
+        assert middle['middle_profit_percent'] == pytest.approx((2 / arb_index - 1) * 100)
+
+    def test_same_line_and_expensive_middles_are_ignored(self):
+        engine = SignalEngine.from_events([
+            market('e1', 'OU', ('Mais de 2.5', 1.80, 'bet365'), ('Menos de 2.5', 1.80, 'betfair')),
+            market('e2', 'OU', ('Mais de 2.5', 1.60, 'bet365'), ('Menos de 3.5', 1.50, 'betfair')),
+        ], max_middle_loss=2.0)
+
+        assert engine.scan()['middles'] == []
+
+    def test_legs_use_distinct_bookmakers(self):
+        engine = SignalEngine.from_events([market(
+            'e1', 'OU',
+            ('Mais de 2.5', 2.10, 'bet365'), ('Menos de 3.5', 2.00, 'bet365'),
+            ('Mais de 2.5', 2.00, 'betfair'),
+        )])
+
+        middle = engine.scan()['middles'][0]
+
+        over, under = middle['selections']
+        assert (over['bookmaker'], over['odds']) == ('betfair', 2.00)
+        assert (under['bookmaker'], under['odds']) == ('bet365', 2.00)
+
+
+    def test_detects_handicap_middle(self):
+        engine = SignalEngine.from_events([market(
+            'e1', 'AH',
+            ('Casa -1.5', 2.05, 'bet365'), ('Visitante +2.5', 1.95, 'betfair'),
+            ('Casa -1.5', 1.80, 'pinnacle'), ('Visitante +1.5', 2.00, 'pinnacle'),
+        )], max_middle_loss=2.0)
+
+        middles = engine.scan()['middles']
+
+        assert len(middles) == 1
+        middle = middles[0]
+        assert middle['space'] == 'margin'
+        assert middle['middle_margins'] == [2]
+        home, away = middle['selections']
+        assert (home['name'], home['bookmaker']) == ('Casa -1.5', 'bet365')
+        assert (away['name'], away['bookmaker']) == ('Visitante +2.5', 'betfair')
+        assert middle['arbitrage_index'] == pytest.approx(1 / 2.05 + 1 / 1.95)
+
+    def test_handicap_same_line_is_not_a_middle(self):
+        engine = SignalEngine.from_events([market(
+            'e1', 'AH', ('Casa -1.5', 2.05, 'bet365'), ('Visitante +1.5', 2.00, 'betfair'),
+        )])
+
+        assert engine.scan()['middles'] == []
+
+    def test_handicap_lines_are_normalized_per_line(self):
+        engine = SignalEngine.from_events([market(
+            'e1', 'AH',
+            ('Casa -0.5', 1.90, 'pinnacle'), ('Visitante +0.5', 1.90, 'pinnacle'),
+            ('Casa -1.5', 3.00, 'pinnacle'), ('Visitante +1.5', 1.35, 'pinnacle'),
+            ('Casa -0.5', 2.05, 'betfair'),
+        )], min_edge=0.02)
+
+        value_bets = engine.scan()['value_bets']
+
+        assert [(b['selection'], b['bookmaker']) for b in value_bets] == [('Casa -0.5', 'betfair')]
+        assert value_bets[0]['fair_odds'] == pytest.approx(2.0)
+
+
+class TestSignalEngine:
+    """Testes da passada única sobre o índice."""
+
+    def test_single_scan_returns_all_signal_types(self):
+        index = ArbitrageIndex()
+        index.ingest([
+            market('e1', '1X2', ('Casa', 2.60, 'bet365'), ('Empate', 3.60, 'betfair'), ('Visitante', 4.20, 'pinnacle')),
+            market('e2', 'OU', ('Mais de 2.5', 2.00, 'bet365'), ('Menos de 3.5', 1.98, 'betfair')),
+        ])
+
+        signals = SignalEngine(index, min_edge=1.0).scan()
+
+        assert [s['type'] for s in signals['surebets']] == [SIGNAL_SUREBET]
+        assert signals['surebets'][0]['event_id'] == 'e1'
+        assert [m['event_id'] for m in signals['middles']] == ['e2']
+        assert signals['value_bets'] == []
+
+    def test_reflects_index_updates(self):
+        index = ArbitrageIndex()
+        engine = SignalEngine(index)
+        index.update('e1', 'OU', 'bet365', 'Mais de 2.5', 2.00)
+        index.update('e1', 'OU', 'betfair', 'Menos de 3.5', 1.98)
+        assert len(engine.scan()['middles']) == 1
+
+        index.update('e1', 'OU', 'betfair', 'Menos de 3.5', None)
+        assert engine.scan()['middles'] == []
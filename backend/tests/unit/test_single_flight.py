@@ -0,0 +1,132 @@
+"""Testes unitários para a coalescência de chamadas (single-flight)."""
+
+import os
+import sys
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+from backend.core.http_cache import ResponseCache
+from backend.core.rate_limit import FetchGuard
+from backend.core.single_flight import AsyncSingleFlight, SingleFlight
+from backend.apps.radar_api import AsyncSportRadarAPI, SportRadarAPI
+
+
+class SlowResponse:
+    status_code = 200
+    headers = {}
+    text = ''
+    content = b'{"doc": [{"id": 1}]}'
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {'doc': [{'id': 1}]}
+
+
+class SlowTransport:
+    session = None
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return SlowResponse()
+
+    async def aget(self, url, headers=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return SlowResponse()
+
+
+def client(cls, transport):
+    return cls('bet365', transport, ResponseCache(), guard=FetchGuard('teste', rate_limit=0))
+
+
+class TestSingleFlight:
+    """Testes da deduplicação entre threads."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        flights = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            # Segura a chamada até as outras 7 threads estarem esperando
+            deadline = time.monotonic() + 5
+            while flights.shared < 7 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: flights.do('k', slow), range(8)))
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert flights.in_flight() == 0
+        assert flights.executed == 1 and flights.shared == 7
+
+    def test_errors_reach_every_waiter_and_release_the_key(self):
+        flights = SingleFlight()
+
+        def failing():
+            time.sleep(0.05)
+            raise ValueError('falhou')
+
+        def call(_):
+            try:
+                flights.do('k', failing)
+            except ValueError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            assert list(pool.map(call, range(4))) == ['falhou'] * 4
+        assert flights.do('k', lambda: 'ok') == 'ok'
+
+    def test_async_calls_share_one_task(self):
+        flights = AsyncSingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return 42
+
+        async def main():
+            return await asyncio.gather(*(flights.do('k', fetch) for _ in range(5)))
+
+        assert asyncio.run(main()) == [42] * 5
+        assert len(calls) == 1
+
+
+class TestSportRadarCoalescing:
+    """Testes da coalescência no cliente da SportRadar."""
+
+    def test_thundering_herd_collapses_to_one_request(self):
+        transport = SlowTransport()
+        clients = [client(SportRadarAPI, transport) for _ in range(6)]
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(lambda api: api.modal_data('1'), clients))
+
+        assert transport.calls == 1
+        assert all(r is results[0] for r in results)
+
+    def test_async_clients_coalesce(self):
+        transport = SlowTransport()
+        clients = [client(AsyncSportRadarAPI, transport) for _ in range(4)]
+
+        async def main():
+            return await asyncio.gather(*(api.modal_data('1') for api in clients))
+
+        asyncio.run(main())
+        assert transport.calls == 1
@@ -27,6 +27,10 @@ WHATSAPP_PHONE = os.getenv("WHATSAPP_PHONE", "")
 
 # Configuração de cache
 CACHE_TIMEOUT = int(os.getenv("CACHE_TIMEOUT", 60))  # segundos
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", 512))  # respostas da SportRadar em memória
+
+# Codec JSON: auto (orjson se instalado), orjson ou json
+JSON_CODEC = os.getenv("JSON_CODEC", "auto").lower()
 
 # Configuração de banco de dados SQLite
 DATABASE_PATH = os.getenv("DATABASE_PATH", os.path.join(os.path.dirname(__file__), "..", "backend", "database", "surebets.db"))
@@ -60,12 +64,54 @@ ADMIN_PASSWORD_HASH = os.getenv("ADMIN_PASSWORD_HASH", "e3b0c44298fc1c149afbf4c8
 
 # Bookmakers
 MOCK_BOOKMAKER_DATA = os.getenv("MOCK_BOOKMAKER_DATA", "false").lower() == "true"
+# Grupo de entry points com configurações de casas extras (vazio desativa os plugins)
+BOOKMAKER_PLUGIN_GROUP = os.getenv("BOOKMAKER_PLUGIN_GROUP", "surebets.bookmakers")
+BOOKMAKER_BATCH_WORKERS = int(os.getenv("BOOKMAKER_BATCH_WORKERS", 8))  # buscas simultâneas de vários esportes
 BOOKMAKER_TIMEOUT = int(os.getenv("BOOKMAKER_TIMEOUT", 20))
 BOOKMAKER_MAX_RETRIES = int(os.getenv("BOOKMAKER_MAX_RETRIES", 5))
 BOOKMAKER_RATE_LIMIT = float(os.getenv("BOOKMAKER_RATE_LIMIT", 1.0))
+BOOKMAKER_RATE_BURST = float(os.getenv("BOOKMAKER_RATE_BURST", 5))
+BOOKMAKER_BACKOFF_BASE = float(os.getenv("BOOKMAKER_BACKOFF_BASE", 0.5))  # segundos
+BOOKMAKER_BACKOFF_MAX = float(os.getenv("BOOKMAKER_BACKOFF_MAX", 30))
+BOOKMAKER_BREAKER_THRESHOLD = int(os.getenv("BOOKMAKER_BREAKER_THRESHOLD", 5))  # falhas 404/5xx seguidas
+BOOKMAKER_BREAKER_RESET = float(os.getenv("BOOKMAKER_BREAKER_RESET", 60))
 GLOBAL_MIN_ODDS = float(os.getenv("GLOBAL_MIN_ODDS", 1.01))
 GLOBAL_MAX_ODDS = float(os.getenv("GLOBAL_MAX_ODDS", 1000))
 
+# Transporte HTTP compartilhado (pool por host, keep-alive)
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", 10))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 20))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5.0))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"  # requer o pacote h2
+
+# Coleta de odds em segundo plano (os handlers leem só o snapshot em memória)
+INGEST_ENABLED = os.getenv("INGEST_ENABLED", "true").lower() == "true"
+INGEST_SPORTS = [s.strip() for s in os.getenv("INGEST_SPORTS", "soccer").split(",") if s.strip()]
+INGEST_LIVE_INTERVAL = float(os.getenv("INGEST_LIVE_INTERVAL", 5))  # segundos
+INGEST_UPCOMING_INTERVAL = float(os.getenv("INGEST_UPCOMING_INTERVAL", 60))
+INGEST_EVENT_LIMIT = int(os.getenv("INGEST_EVENT_LIMIT", 50))  # eventos por casa/esporte/status
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", 4))
+INGEST_READ_DEADLINE = float(os.getenv("INGEST_READ_DEADLINE", 5))  # espera máxima por casa sem coleta numa leitura
+# Prioridade por evento: início próximo e odds voláteis encurtam o intervalo
+INGEST_MIN_INTERVAL = float(os.getenv("INGEST_MIN_INTERVAL", 1))
+INGEST_MAX_INTERVAL = float(os.getenv("INGEST_MAX_INTERVAL", 300))
+INGEST_KICKOFF_RATIO = float(os.getenv("INGEST_KICKOFF_RATIO", 60))  # 1h até o início -> 60s
+INGEST_VOLATILITY_REF = float(os.getenv("INGEST_VOLATILITY_REF", 5))  # variação média (%) que reduz o intervalo à metade
+INGEST_VOLATILITY_WINDOW = int(os.getenv("INGEST_VOLATILITY_WINDOW", 30))  # minutos de odds_history
+INGEST_VOLATILITY_REFRESH = float(os.getenv("INGEST_VOLATILITY_REFRESH", 60))  # segundos
+
+# Catálogo de esportes/categorias/torneios da SportRadar (cache em memória e em disco)
+CATALOG_CACHE_PATH = os.getenv("CATALOG_CACHE_PATH", os.path.join(os.path.dirname(__file__), "..", "backend", "data", "sportradar_catalog.json"))
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", 6 * 3600))  # segundos
+CATALOG_RETRY_INTERVAL = float(os.getenv("CATALOG_RETRY_INTERVAL", 60))
+CATALOG_BOOKMAKER = os.getenv("CATALOG_BOOKMAKER", "bet365")  # cliente usado para baixar a árvore
+
+# Detecção paralela de surebets (0 = um processo por núcleo)
+DETECTION_WORKERS = int(os.getenv("DETECTION_WORKERS", 0))
+DETECTION_PARALLEL_MIN_EVENTS = int(os.getenv("DETECTION_PARALLEL_MIN_EVENTS", 2000))
+# Nomes internados por geração no modelo compacto de odds (ao passar, começa uma geração nova)
+MODEL_NAME_TABLE_LIMIT = int(os.getenv("MODEL_NAME_TABLE_LIMIT", 100000))
+
 # APIs específicas
 BET365_API_KEY = os.getenv("BET365_API_KEY")
 PINNACLE_API_KEY = os.getenv("PINNACLE_API_KEY")